@@ -1,11 +1,17 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, mines, alerts, environment_data, equipment, maintenance
+from app.api.v1.endpoints import auth, mines, alerts, alert_stream, detections, environment_data, equipment, maintenance, exports, retention, threshold_rules
 
 api_router = APIRouter()
 
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(mines.router, prefix="/mines", tags=["mines"])
+# 推送路由需在 /alerts/{alert_id} 之前注册
+api_router.include_router(alert_stream.router, prefix="/alerts", tags=["alerts"])
 api_router.include_router(alerts.router, prefix="/alerts", tags=["alerts"])
+api_router.include_router(detections.router, prefix="/detections", tags=["detections"])
 api_router.include_router(environment_data.router, prefix="/environment-data", tags=["environment-data"])
 api_router.include_router(equipment.router, prefix="/equipment", tags=["equipment"])
-api_router.include_router(maintenance.router, prefix="/maintenance", tags=["maintenance"]) 
\ No newline at end of file
+api_router.include_router(maintenance.router, prefix="/maintenance", tags=["maintenance"])
+api_router.include_router(exports.router, prefix="/exports", tags=["exports"])
+api_router.include_router(retention.router, prefix="/retention", tags=["retention"])
+api_router.include_router(threshold_rules.router, prefix="/threshold-rules", tags=["threshold-rules"])
@@ -0,0 +1,131 @@
+import json
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from fastapi.security import OAuth2PasswordBearer
+from app.core.config import settings
+from app.core.deps import get_current_active_user, get_user_from_token
+from app.database.database import SessionLocal
+from app.models.alert import AlertSeverity, AlertType
+from app.services.alert_stream import AlertStreamFilter, Subscription, alert_stream_hub
+
+router = APIRouter()
+
+optional_oauth2 = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login", auto_error=False)
+
+def _authenticate(token: Optional[str]):
+    """校验令牌且用户可用，失败抛出 HTTPException"""
+    if not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    db = SessionLocal()
+    try:
+        return get_current_active_user(get_user_from_token(db, token))
+    finally:
+        db.close()
+
+def _stream_filter(
+    mine_id: Optional[List[int]],
+    monitoring_point_id: Optional[List[int]],
+    severity: Optional[List[AlertSeverity]],
+    alert_type: Optional[List[AlertType]]
+) -> AlertStreamFilter:
+    return AlertStreamFilter(
+        frozenset(mine_id or ()),
+        frozenset(monitoring_point_id or ()),
+        frozenset(item.value for item in severity or ()),
+        frozenset(item.value for item in alert_type or ())
+    )
+
+def _check_enabled() -> None:
+    if not settings.ALERT_STREAM_ENABLED or not alert_stream_hub.running:
+        raise HTTPException(status_code=503, detail="Alert stream is not available")
+
+@router.get("/stream")
+async def stream_alerts(
+    request: Request,
+    mine_id: Optional[List[int]] = Query(None),
+    monitoring_point_id: Optional[List[int]] = Query(None),
+    severity: Optional[List[AlertSeverity]] = Query(None),
+    alert_type: Optional[List[AlertType]] = Query(None),
+    last_event_id: Optional[int] = Query(None, description="Resume after this event id"),
+    last_event_id_header: Optional[int] = Header(None, alias="Last-Event-ID"),
+    token: Optional[str] = Query(None, description="Access token for clients that cannot set headers"),
+    header_token: Optional[str] = Depends(optional_oauth2)
+):
+    """
+    Server-Sent Events 推送报警新建、升级和状态变化
+    断线重连时浏览器自动带上 Last-Event-ID 续传；队列积压丢弃事件时发送 overflow 事件，客户端应重新查询报警列表
+    """
+    await run_in_threadpool(_authenticate, header_token or token)
+    _check_enabled()
+    subscription = Subscription(_stream_filter(mine_id, monitoring_point_id, severity, alert_type))
+    resume_after = last_event_id_header if last_event_id_header is not None else last_event_id
+    await run_in_threadpool(alert_stream_hub.subscribe, subscription, resume_after)
+
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                batch, dropped = await subscription.next_batch(settings.ALERT_STREAM_HEARTBEAT_SECONDS)
+                if dropped:
+                    yield f"event: overflow\ndata: {json.dumps({'dropped': dropped})}\n\n"
+                for event in batch:
+                    data = json.dumps(event.message(), ensure_ascii=False)
+                    yield f"id: {event.id}\nevent: {event.event_type}\ndata: {data}\n\n"
+                if not batch and not dropped:
+                    yield ": ping\n\n"
+        finally:
+            alert_stream_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/ws")
+async def alerts_websocket(
+    websocket: WebSocket,
+    mine_id: Optional[List[int]] = Query(None),
+    monitoring_point_id: Optional[List[int]] = Query(None),
+    severity: Optional[List[AlertSeverity]] = Query(None),
+    alert_type: Optional[List[AlertType]] = Query(None),
+    last_event_id: Optional[int] = Query(None),
+    token: Optional[str] = Query(None)
+):
+    """
+    WebSocket 推送报警新建、升级和状态变化，消息格式 {"id", "event", "alert"}
+    重连时用最后收到的 id 作为 last_event_id 续传；队列积压丢弃事件时发送 {"event": "overflow", "dropped": n}
+    """
+    try:
+        await run_in_threadpool(_authenticate, token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    if not settings.ALERT_STREAM_ENABLED or not alert_stream_hub.running:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+
+    await websocket.accept()
+    subscription = Subscription(_stream_filter(mine_id, monitoring_point_id, severity, alert_type))
+    await run_in_threadpool(alert_stream_hub.subscribe, subscription, last_event_id)
+    try:
+        while True:
+            batch, dropped = await subscription.next_batch(settings.ALERT_STREAM_HEARTBEAT_SECONDS)
+            if dropped:
+                await websocket.send_json({"event": "overflow", "dropped": dropped})
+            for event in batch:
+                await websocket.send_json(event.message())
+            if not batch and not dropped:
+                await websocket.send_json({"event": "ping"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        alert_stream_hub.unsubscribe(subscription)
+
+@router.get("/stream/stats")
+def get_alert_stream_stats(
+    current_user = Depends(get_current_active_user)
+):
+    """获取本进程的推送连接数、积压、合并与丢弃统计"""
+    return alert_stream_hub.stats()
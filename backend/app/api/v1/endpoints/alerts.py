@@ -1,20 +1,25 @@
-from typing import List
-from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
 from app.database.database import get_db
-from app.models.alert import Alert, AlertStatus, AlertSeverity
+from app.models.alert import AlertStatus, AlertSeverity
 from app.models.monitoring_point import MonitoringPoint
-from app.schemas.alert import Alert as AlertSchema, AlertCreate, AlertUpdate, AlertWithDetails, AlertSummary
+from app.schemas.alert import (
+    Alert as AlertSchema, AlertCreate, AlertUpdate, AlertWithDetails, AlertSummary, AlertBulkAction, AlertBulkResult
+)
 from app.core.deps import get_current_active_user
+from app.core.pagination import get_cursor, set_next_cursor
+from app.crud import alert as crud_alert
 
 router = APIRouter()
 
 @router.get("/", response_model=List[AlertWithDetails])
 def get_alerts(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    after: Optional[tuple] = Depends(get_cursor),
     status: AlertStatus = None,
     severity: AlertSeverity = None,
     mine_id: int = None,
@@ -23,22 +28,9 @@ def get_alerts(
     db: Session = Depends(get_db),
     current_user = Depends(get_current_active_user)
 ):
-    """获取报警列表"""
-    query = db.query(Alert)
-    
-    # 添加过滤条件
-    if status:
-        query = query.filter(Alert.status == status)
-    if severity:
-        query = query.filter(Alert.severity == severity)
-    if mine_id:
-        query = query.join(MonitoringPoint).filter(MonitoringPoint.mine_id == mine_id)
-    if start_date:
-        query = query.filter(Alert.detected_at >= start_date)
-    if end_date:
-        query = query.filter(Alert.detected_at <= end_date)
-    
-    alerts = query.offset(skip).limit(limit).all()
+    """获取报警列表（按发现时间倒序，下一页游标在响应头 X-Next-Cursor 中）"""
+    alerts = crud_alert.get_alerts(db, skip, limit, status, severity, mine_id, start_date, end_date, after)
+    set_next_cursor(response, alerts, ("detected_at", "id"), limit)
     return alerts
 
 @router.post("/", response_model=AlertSchema)
@@ -53,11 +45,25 @@ def create_alert(
     if monitoring_point is None:
         raise HTTPException(status_code=404, detail="Monitoring point not found")
     
-    db_alert = Alert(**alert.dict())
-    db.add(db_alert)
-    db.commit()
-    db.refresh(db_alert)
-    return db_alert
+    return crud_alert.create_alert(db, alert)
+
+@router.post("/bulk/acknowledge", response_model=AlertBulkResult)
+def acknowledge_alerts(
+    action: AlertBulkAction,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """批量确认活跃报警（ID列表或按煤矿/监控点/类型/发现时间筛选），返回已确认和跳过的报警"""
+    return crud_alert.acknowledge_alerts(db, action, current_user.id)
+
+@router.post("/bulk/resolve", response_model=AlertBulkResult)
+def resolve_alerts(
+    action: AlertBulkAction,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """批量解决报警（ID列表或按煤矿/监控点/类型/发现时间筛选），返回已解决和跳过的报警"""
+    return crud_alert.resolve_alerts(db, action, current_user.id)
 
 @router.get("/{alert_id}", response_model=AlertWithDetails)
 def get_alert(
@@ -66,7 +72,7 @@ def get_alert(
     current_user = Depends(get_current_active_user)
 ):
     """获取报警详情"""
-    alert = db.query(Alert).filter(Alert.id == alert_id).first()
+    alert = crud_alert.get_alert_with_details(db, alert_id)
     if alert is None:
         raise HTTPException(status_code=404, detail="Alert not found")
     return alert
@@ -79,63 +85,19 @@ def update_alert(
     current_user = Depends(get_current_active_user)
 ):
     """更新报警状态"""
-    db_alert = db.query(Alert).filter(Alert.id == alert_id).first()
+    db_alert = crud_alert.update_alert(db, alert_id, alert_update, current_user.id)
     if db_alert is None:
         raise HTTPException(status_code=404, detail="Alert not found")
-    
-    update_data = alert_update.dict(exclude_unset=True)
-    
-    # 处理状态变更的时间戳
-    if "status" in update_data:
-        if update_data["status"] == AlertStatus.ACKNOWLEDGED and db_alert.status == AlertStatus.ACTIVE:
-            update_data["acknowledged_at"] = datetime.utcnow()
-            update_data["acknowledged_by"] = current_user.id
-        elif update_data["status"] == AlertStatus.RESOLVED:
-            update_data["resolved_at"] = datetime.utcnow()
-            update_data["resolved_by"] = current_user.id
-    
-    for field, value in update_data.items():
-        setattr(db_alert, field, value)
-    
-    db.commit()
-    db.refresh(db_alert)
     return db_alert
 
 @router.get("/summary/overview", response_model=AlertSummary)
 def get_alert_summary(
+    mine_id: Optional[int] = None,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_active_user)
 ):
-    """获取报警统计概览"""
-    # 总报警数
-    total_alerts = db.query(Alert).count()
-    
-    # 活跃报警数
-    active_alerts = db.query(Alert).filter(Alert.status == AlertStatus.ACTIVE).count()
-    
-    # 紧急报警数
-    critical_alerts = db.query(Alert).filter(
-        and_(Alert.severity == AlertSeverity.CRITICAL, Alert.status == AlertStatus.ACTIVE)
-    ).count()
-    
-    # 按严重程度统计
-    alerts_by_severity = {}
-    for severity in AlertSeverity:
-        count = db.query(Alert).filter(Alert.severity == severity).count()
-        alerts_by_severity[severity.value] = count
-    
-    # 最近报警（最近24小时）
-    recent_alerts = db.query(Alert).filter(
-        Alert.detected_at >= datetime.utcnow() - timedelta(hours=24)
-    ).order_by(Alert.detected_at.desc()).limit(10).all()
-    
-    return AlertSummary(
-        total_alerts=total_alerts,
-        active_alerts=active_alerts,
-        critical_alerts=critical_alerts,
-        alerts_by_severity=alerts_by_severity,
-        recent_alerts=recent_alerts
-    )
+    """获取报警统计概览（含按煤矿分组的计数，短时缓存，报警状态变化时失效）"""
+    return crud_alert.get_alert_summary_cached(db, mine_id)
 
 @router.post("/{alert_id}/acknowledge")
 def acknowledge_alert(
@@ -144,18 +106,14 @@ def acknowledge_alert(
     current_user = Depends(get_current_active_user)
 ):
     """确认报警"""
-    db_alert = db.query(Alert).filter(Alert.id == alert_id).first()
+    db_alert = crud_alert.get_alert(db, alert_id)
     if db_alert is None:
         raise HTTPException(status_code=404, detail="Alert not found")
     
     if db_alert.status != AlertStatus.ACTIVE:
         raise HTTPException(status_code=400, detail="Alert is not active")
     
-    db_alert.status = AlertStatus.ACKNOWLEDGED
-    db_alert.acknowledged_at = datetime.utcnow()
-    db_alert.acknowledged_by = current_user.id
-    
-    db.commit()
+    crud_alert.acknowledge_alert(db, alert_id, current_user.id)
     return {"message": "Alert acknowledged successfully"}
 
 @router.post("/{alert_id}/resolve")
@@ -165,16 +123,12 @@ def resolve_alert(
     current_user = Depends(get_current_active_user)
 ):
     """解决报警"""
-    db_alert = db.query(Alert).filter(Alert.id == alert_id).first()
+    db_alert = crud_alert.get_alert(db, alert_id)
     if db_alert is None:
         raise HTTPException(status_code=404, detail="Alert not found")
     
     if db_alert.status == AlertStatus.RESOLVED:
         raise HTTPException(status_code=400, detail="Alert is already resolved")
     
-    db_alert.status = AlertStatus.RESOLVED
-    db_alert.resolved_at = datetime.utcnow()
-    db_alert.resolved_by = current_user.id
-    
-    db.commit()
+    crud_alert.resolve_alert(db, alert_id, current_user.id)
     return {"message": "Alert resolved successfully"} 
\ No newline at end of file
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from app.database.database import get_db
+from app.schemas.detection import DetectionBatchCreate, DetectionBatchResult
+from app.core.deps import get_current_active_user
+from app.services.detection_ingest import detection_ingestor
+
+router = APIRouter()
+
+@router.post("/batch", response_model=DetectionBatchResult)
+def ingest_detections(
+    batch: DetectionBatchCreate,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """
+    AI 检测器批量上报检测
+    丢弃低于置信度下限或监控点不存在的检测；同一监控点同一类型在合并窗口内的重复检测合并到未关闭的报警，
+    其余新建报警。合并的次数和最后出现时间每 DETECTION_FLUSH_SECONDS 秒写入一次
+    """
+    return detection_ingestor.ingest(db, batch.detections)
+
+@router.get("/stats")
+def get_detection_stats(
+    current_user = Depends(get_current_active_user)
+):
+    """获取检测接入的过滤、合并、新建计数与待写入的合并检测"""
+    return detection_ingestor.stats()
@@ -1,20 +1,36 @@
+import csv
+import io
+import json
 from typing import List, Optional
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from app.database.database import get_db
-from app.models.environment_data import EnvironmentData
+from app.database.database import SessionLocal, get_db
+from app.models.environment_data import EnvironmentData, ENVIRONMENT_FIELDS
 from app.models.monitoring_point import MonitoringPoint
-from app.schemas.environment_data import EnvironmentData as EnvironmentDataSchema, EnvironmentDataCreate, EnvironmentDataUpdate
+from app.schemas.environment_data import (
+    EnvironmentData as EnvironmentDataSchema, EnvironmentDataCreate, EnvironmentDataUpdate,
+    EnvironmentDataBatchCreate, EnvironmentDataBatchResult
+)
 from app.crud import environment_data as crud_environment_data
 from app.core.deps import get_current_active_user
+from app.core.pagination import get_cursor, set_next_cursor
+from app.core.config import settings
+from app.services.environment_buffer import environment_write_buffer, WriteBufferFullError
+from app.services.recent_store import recent_reading_store
+from app.services.ttl_cache import TTLCache
 
 router = APIRouter()
 
+mine_summary_cache = TTLCache(ttl_seconds=settings.MINE_SUMMARY_CACHE_TTL_SECONDS, max_entries=256)
+
 @router.get("/", response_model=List[EnvironmentDataSchema])
 def get_environment_data(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    after: Optional[tuple] = Depends(get_cursor),
     monitoring_point_id: Optional[int] = None,
     mine_id: Optional[int] = None,
     start_time: Optional[datetime] = None,
@@ -22,13 +38,15 @@ def get_environment_data(
     db: Session = Depends(get_db),
     current_user = Depends(get_current_active_user)
 ):
-    """获取环境数据列表"""
+    """获取环境数据列表（按监控点或煤矿分页时在响应头 X-Next-Cursor 返回下一页游标）"""
     if monitoring_point_id:
         data = crud_environment_data.get_environment_data_by_monitoring_point(
-            db, monitoring_point_id, skip, limit
+            db, monitoring_point_id, skip, limit, after
         )
+        set_next_cursor(response, data, ("recorded_at", "id"), limit)
     elif mine_id:
-        data = crud_environment_data.get_environment_data_by_mine(db, mine_id, skip, limit)
+        data = crud_environment_data.get_environment_data_by_mine(db, mine_id, skip, limit, after)
+        set_next_cursor(response, data, ("recorded_at", "id"), limit)
     elif start_time and end_time:
         if monitoring_point_id:
             data = crud_environment_data.get_environment_data_by_time_range(
@@ -48,11 +66,20 @@ def get_latest_environment_data(
     current_user = Depends(get_current_active_user)
 ):
     """获取指定监控点的最新环境数据"""
-    data = crud_environment_data.get_latest_environment_data(db, monitoring_point_id)
+    data = crud_environment_data.get_latest_environment_data_cached(db, monitoring_point_id)
     if not data:
         raise HTTPException(status_code=404, detail="No environment data found")
     return data
 
+@router.get("/latest/mine/{mine_id}", response_model=List[EnvironmentDataSchema])
+def get_latest_environment_data_by_mine(
+    mine_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """获取煤矿所有监控点的最新环境数据"""
+    return crud_environment_data.get_latest_environment_data_by_mine(db, mine_id)
+
 @router.post("/", response_model=EnvironmentDataSchema)
 def create_environment_data(
     data: EnvironmentDataCreate,
@@ -60,6 +87,18 @@ def create_environment_data(
     current_user = Depends(get_current_active_user)
 ):
     """创建新的环境数据"""
+    # 启用写缓冲时仅入队，监控点校验在批量刷写时完成
+    if environment_write_buffer.running:
+        try:
+            environment_write_buffer.enqueue(data)
+        except WriteBufferFullError:
+            raise HTTPException(
+                status_code=503,
+                detail="Environment data write buffer is full",
+                headers={"Retry-After": "1"}
+            )
+        return JSONResponse(status_code=202, content={"status": "queued"})
+
     # 检查监控点是否存在
     monitoring_point = db.query(MonitoringPoint).filter(MonitoringPoint.id == data.monitoring_point_id).first()
     if not monitoring_point:
@@ -67,6 +106,101 @@ def create_environment_data(
     
     return crud_environment_data.create_environment_data(db, data)
 
+@router.post("/batch", response_model=EnvironmentDataBatchResult)
+def create_environment_data_batch(
+    batch: EnvironmentDataBatchCreate,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """批量创建环境数据（网关批量上报）"""
+    return crud_environment_data.create_environment_data_batch(db, batch.items)
+
+@router.get("/buffer/stats")
+def get_write_buffer_stats(
+    current_user = Depends(get_current_active_user)
+):
+    """获取写缓冲队列深度与刷写延迟统计"""
+    return environment_write_buffer.stats()
+
+@router.get("/recent-store/stats")
+def get_recent_store_stats(
+    current_user = Depends(get_current_active_user)
+):
+    """获取最近读数环形缓冲的监控点数、行数与内存占用"""
+    return recent_reading_store.stats()
+
+EXPORT_FLUSH_ROWS = 1000  # 每积累多少行向客户端写出一次
+
+def _stream_export(export_format: str, columns: List[str], filters: dict):
+    """导出生成器：在自己的会话里用服务端游标逐块读取并编码"""
+    db = SessionLocal()
+    try:
+        rows = crud_environment_data.iter_environment_data_export(db, columns, **filters)
+        buffer = io.StringIO()
+        if export_format == "csv":
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+
+            def write_row(row):
+                writer.writerow([value.isoformat() if isinstance(value, datetime) else value for value in row])
+        else:
+            def write_row(row):
+                buffer.write(json.dumps(
+                    dict(zip(columns, row)), default=lambda value: value.isoformat(), ensure_ascii=False
+                ) + "\n")
+
+        pending = 0
+        for row in rows:
+            write_row(row)
+            pending += 1
+            if pending >= EXPORT_FLUSH_ROWS:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        db.close()
+
+@router.get("/export")
+def export_environment_data(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    mine_id: Optional[int] = None,
+    points: Optional[List[int]] = Query(None, description="监控点ID列表"),
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    columns: Optional[List[str]] = Query(None, description="导出的列，缺省为全部"),
+    current_user = Depends(get_current_active_user)
+):
+    """流式导出环境数据（NDJSON 或 CSV），用于整矿历史数据审计"""
+    if mine_id is None and not points:
+        raise HTTPException(status_code=400, detail="Please provide mine_id or points")
+    if start_time and end_time and start_time > end_time:
+        raise HTTPException(status_code=400, detail="start_time must be before end_time")
+
+    columns = columns or list(crud_environment_data.EXPORT_COLUMNS)
+    invalid = [column for column in columns if column not in crud_environment_data.EXPORT_COLUMNS]
+    if invalid:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid columns: {', '.join(invalid)}. Must be in {list(crud_environment_data.EXPORT_COLUMNS)}"
+        )
+
+    filters = {
+        "mine_id": mine_id,
+        "monitoring_point_ids": points,
+        "start_time": start_time,
+        "end_time": end_time
+    }
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"environment_data_{mine_id if mine_id is not None else 'points'}.{format}"
+    return StreamingResponse(
+        _stream_export(format, columns, filters),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @router.get("/{data_id}", response_model=EnvironmentDataSchema)
 def get_environment_data_by_id(
     data_id: int,
@@ -108,6 +242,7 @@ def delete_environment_data(
 def get_environment_statistics(
     monitoring_point_id: int,
     hours: int = Query(24, ge=1, le=168),  # 1小时到7天
+    percentiles: bool = Query(False, description="Include p50/p95 for each field"),
     db: Session = Depends(get_db),
     current_user = Depends(get_current_active_user)
 ):
@@ -117,12 +252,14 @@ def get_environment_statistics(
     if not monitoring_point:
         raise HTTPException(status_code=404, detail="Monitoring point not found")
     
-    stats = crud_environment_data.get_environment_data_statistics(db, monitoring_point_id, hours)
+    stats = crud_environment_data.get_environment_data_statistics(db, monitoring_point_id, hours, percentiles)
     return stats
 
 @router.get("/alerts/{monitoring_point_id}", response_model=List[EnvironmentDataSchema])
 def get_environment_alerts(
     monitoring_point_id: int,
+    hours: Optional[int] = Query(None, ge=1, le=8760, description="Only look back this many hours"),
+    limit: int = Query(100, ge=1, le=1000),
     db: Session = Depends(get_db),
     current_user = Depends(get_current_active_user)
 ):
@@ -132,7 +269,7 @@ def get_environment_alerts(
     if not monitoring_point:
         raise HTTPException(status_code=404, detail="Monitoring point not found")
     
-    alerts = crud_environment_data.get_environment_alerts(db, monitoring_point_id)
+    alerts = crud_environment_data.get_environment_alerts(db, monitoring_point_id, hours, limit)
     return alerts
 
 @router.get("/trends/{monitoring_point_id}")
@@ -140,6 +277,8 @@ def get_environment_trends(
     monitoring_point_id: int,
     field: str = Query(..., description="Field name to get trends for"),
     hours: int = Query(24, ge=1, le=168),
+    resolution: Optional[int] = Query(None, ge=1, le=86400, description="Bucket size in seconds"),
+    max_points: Optional[int] = Query(None, ge=3, le=20000, description="Downsample to at most this many points (LTTB)"),
     db: Session = Depends(get_db),
     current_user = Depends(get_current_active_user)
 ):
@@ -150,19 +289,18 @@ def get_environment_trends(
         raise HTTPException(status_code=404, detail="Monitoring point not found")
     
     # 检查字段是否有效
-    valid_fields = [
-        "methane_concentration", "carbon_monoxide", "carbon_dioxide", 
-        "oxygen_concentration", "hydrogen_sulfide", "temperature", 
-        "humidity", "pressure", "air_flow", "dust_concentration"
-    ]
+    valid_fields = list(ENVIRONMENT_FIELDS)
     if field not in valid_fields:
         raise HTTPException(status_code=400, detail=f"Invalid field. Must be one of: {valid_fields}")
     
-    trends = crud_environment_data.get_environment_data_trends(db, monitoring_point_id, field, hours)
+    trends = crud_environment_data.get_environment_data_trends(
+        db, monitoring_point_id, field, hours, resolution, max_points
+    )
     return {
         "monitoring_point_id": monitoring_point_id,
         "field": field,
         "hours": hours,
+        "resolution": resolution,
         "data_points": len(trends),
         "trends": trends
     }
@@ -171,29 +309,29 @@ def get_environment_trends(
 def get_mine_environment_summary(
     mine_id: int,
     hours: int = Query(24, ge=1, le=168),
+    points: Optional[List[int]] = Query(None, description="只汇总指定的监控点"),
     db: Session = Depends(get_db),
     current_user = Depends(get_current_active_user)
 ):
     """获取煤矿环境数据汇总"""
-    # 获取煤矿的所有监控点
-    monitoring_points = db.query(MonitoringPoint).filter(MonitoringPoint.mine_id == mine_id).all()
-    if not monitoring_points:
+    summary = crud_environment_data.get_mine_environment_summary(db, mine_id, hours, points)
+    if summary is None:
         raise HTTPException(status_code=404, detail="No monitoring points found for this mine")
-    
-    summary = {
-        "mine_id": mine_id,
-        "monitoring_points_count": len(monitoring_points),
-        "time_range_hours": hours,
-        "monitoring_points": []
-    }
-    
-    for point in monitoring_points:
-        stats = crud_environment_data.get_environment_data_statistics(db, point.id, hours)
-        summary["monitoring_points"].append({
-            "monitoring_point_id": point.id,
-            "name": point.name,
-            "location": point.location,
-            "statistics": stats
-        })
-    
-    return summary 
\ No newline at end of file
+    return summary
+
+@router.get("/summary/mine/{mine_id}/cached")
+def get_mine_environment_summary_cached(
+    mine_id: int,
+    hours: int = Query(24, ge=1, le=168),
+    points: Optional[List[int]] = Query(None, description="只汇总指定的监控点"),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """获取煤矿环境数据汇总（带短 TTL 缓存，供调度大屏轮询）"""
+    key = (mine_id, hours, tuple(sorted(set(points))) if points else None)
+    summary = mine_summary_cache.get_or_set(
+        key, lambda: crud_environment_data.get_mine_environment_summary(db, mine_id, hours, points)
+    )
+    if summary is None:
+        raise HTTPException(status_code=404, detail="No monitoring points found for this mine")
+    return summary
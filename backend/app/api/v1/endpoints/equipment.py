@@ -1,18 +1,21 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from app.database.database import get_db
 from app.models.equipment import Equipment
 from app.schemas.equipment import Equipment as EquipmentSchema, EquipmentCreate, EquipmentUpdate
 from app.crud import equipment as crud_equipment
 from app.core.deps import get_current_active_user
+from app.core.pagination import get_cursor, set_next_cursor
 
 router = APIRouter()
 
 @router.get("/", response_model=List[EquipmentSchema])
 def get_equipment(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    after: Optional[tuple] = Depends(get_cursor),
     mine_id: Optional[int] = None,
     equipment_type: Optional[str] = None,
     status: Optional[str] = None,
@@ -23,7 +26,8 @@ def get_equipment(
 ):
     """获取设备列表"""
     if mine_id:
-        equipment = crud_equipment.get_equipment_by_mine(db, mine_id, skip, limit)
+        equipment = crud_equipment.get_equipment_by_mine(db, mine_id, skip, limit, after)
+        set_next_cursor(response, equipment, ("id",), limit)
     elif equipment_type:
         equipment = crud_equipment.get_equipment_by_type(db, equipment_type, mine_id)
     elif status:
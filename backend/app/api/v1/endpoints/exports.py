@@ -0,0 +1,62 @@
+import tempfile
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.database.database import engine
+from app.core.deps import get_current_active_user
+from app.services import columnar_export
+
+router = APIRouter()
+
+PARQUET_SPOOL_BYTES = 64 * 1024 * 1024  # 超过后落盘，避免大导出占满内存
+STREAM_CHUNK_BYTES = 1024 * 1024
+
+def _stream_arrow(table: str, filters: dict):
+    with engine.connect() as conn:
+        yield from columnar_export.stream_arrow_ipc(conn, table, **filters)
+
+def _stream_parquet(table: str, filters: dict):
+    # Parquet 的元数据在文件尾部，需要先完整写出再发送
+    with tempfile.SpooledTemporaryFile(max_size=PARQUET_SPOOL_BYTES) as target:
+        with engine.connect() as conn:
+            columnar_export.write_parquet_file(conn, table, target, **filters)
+        target.seek(0)
+        while chunk := target.read(STREAM_CHUNK_BYTES):
+            yield chunk
+
+@router.get("/{table}")
+def export_columnar(
+    table: str,
+    format: str = Query("arrow", pattern="^(arrow|parquet)$"),
+    mine_id: Optional[int] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    since_id: Optional[int] = Query(None, description="只导出 id 大于此值的行（增量导出）"),
+    current_user = Depends(get_current_active_user)
+):
+    """
+    列式导出 environment_data 或 alerts，供 pandas/pyarrow 离线分析
+    arrow 为 Arrow IPC 流（pyarrow.ipc.open_stream），parquet 为单个 Parquet 文件；结果按 id 升序
+    """
+    if table not in columnar_export.EXPORT_TABLES:
+        raise HTTPException(
+            status_code=404, detail=f"Unknown table. Must be one of {list(columnar_export.EXPORT_TABLES)}"
+        )
+    try:
+        columnar_export.require_pyarrow()
+    except RuntimeError as exc:
+        raise HTTPException(status_code=501, detail=str(exc))
+
+    filters = {"mine_id": mine_id, "start_time": start_time, "end_time": end_time, "since_id": since_id}
+    if format == "parquet":
+        body = _stream_parquet(table, filters)
+        media_type = "application/vnd.apache.parquet"
+    else:
+        body = _stream_arrow(table, filters)
+        media_type = "application/vnd.apache.arrow.stream"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{table}.{format}"'}
+    )
@@ -1,19 +1,25 @@
 from typing import List, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from app.database.database import get_db
 from app.models.maintenance_record import MaintenanceRecord
 from app.schemas.maintenance_record import MaintenanceRecord as MaintenanceRecordSchema, MaintenanceRecordCreate, MaintenanceRecordUpdate
 from app.crud import maintenance_record as crud_maintenance
 from app.core.deps import get_current_active_user
+from app.core.pagination import get_cursor, set_next_cursor
 
 router = APIRouter()
 
+# 与 crud 中的排序 (start_time, id) 对应
+MAINTENANCE_CURSOR_FIELDS = ("start_time", "id")
+
 @router.get("/", response_model=List[MaintenanceRecordSchema])
 def get_maintenance_records(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    after: Optional[tuple] = Depends(get_cursor),
     equipment_id: Optional[int] = None,
     maintenance_type: Optional[str] = None,
     status: Optional[str] = None,
@@ -25,19 +31,21 @@ def get_maintenance_records(
 ):
     """获取维护记录列表"""
     if equipment_id:
-        records = crud_maintenance.get_maintenance_records_by_equipment(db, equipment_id, skip, limit)
+        records = crud_maintenance.get_maintenance_records_by_equipment(db, equipment_id, skip, limit, after)
     elif maintenance_type:
-        records = crud_maintenance.get_maintenance_records_by_type(db, maintenance_type, skip, limit)
+        records = crud_maintenance.get_maintenance_records_by_type(db, maintenance_type, skip, limit, after)
     elif status:
-        records = crud_maintenance.get_maintenance_records_by_status(db, status, skip, limit)
+        records = crud_maintenance.get_maintenance_records_by_status(db, status, skip, limit, after)
     elif performed_by:
-        records = crud_maintenance.get_maintenance_records_by_performer(db, performed_by, skip, limit)
+        records = crud_maintenance.get_maintenance_records_by_performer(db, performed_by, skip, limit, after)
     elif start_date and end_date:
-        records = crud_maintenance.get_maintenance_records_by_time_range(db, start_date, end_date, equipment_id)
+        # 时间范围查询不分页
+        return crud_maintenance.get_maintenance_records_by_time_range(db, start_date, end_date, equipment_id)
     else:
         # 如果没有指定过滤条件，返回最近的记录
-        records = crud_maintenance.get_maintenance_records_by_equipment(db, equipment_id or 0, skip, limit)
+        records = crud_maintenance.get_maintenance_records_by_equipment(db, equipment_id or 0, skip, limit, after)
     
+    set_next_cursor(response, records, MAINTENANCE_CURSOR_FIELDS, limit)
     return records
 
 @router.post("/", response_model=MaintenanceRecordSchema)
@@ -109,26 +117,32 @@ def get_upcoming_maintenance(
 
 @router.get("/by-equipment-type/", response_model=List[MaintenanceRecordSchema])
 def get_maintenance_by_equipment_type(
+    response: Response,
     equipment_type: str = Query(..., description="Equipment type to filter by"),
     skip: int = 0,
     limit: int = 100,
+    after: Optional[tuple] = Depends(get_cursor),
     db: Session = Depends(get_db),
     current_user = Depends(get_current_active_user)
 ):
     """根据设备类型获取维护记录"""
-    records = crud_maintenance.get_maintenance_records_by_equipment_type(db, equipment_type, skip, limit)
+    records = crud_maintenance.get_maintenance_records_by_equipment_type(db, equipment_type, skip, limit, after)
+    set_next_cursor(response, records, MAINTENANCE_CURSOR_FIELDS, limit)
     return records
 
 @router.get("/by-mine/", response_model=List[MaintenanceRecordSchema])
 def get_maintenance_by_mine(
+    response: Response,
     mine_id: int = Query(..., description="Mine ID to filter by"),
     skip: int = 0,
     limit: int = 100,
+    after: Optional[tuple] = Depends(get_cursor),
     db: Session = Depends(get_db),
     current_user = Depends(get_current_active_user)
 ):
     """获取指定煤矿的维护记录"""
-    records = crud_maintenance.get_maintenance_records_by_mine(db, mine_id, skip, limit)
+    records = crud_maintenance.get_maintenance_records_by_mine(db, mine_id, skip, limit, after)
+    set_next_cursor(response, records, MAINTENANCE_CURSOR_FIELDS, limit)
     return records
 
 @router.get("/cost-analysis/")
@@ -148,24 +162,30 @@ def get_maintenance_cost_analysis(
 
 @router.get("/equipment/{equipment_id}/history", response_model=List[MaintenanceRecordSchema])
 def get_equipment_maintenance_history(
+    response: Response,
     equipment_id: int,
     skip: int = 0,
     limit: int = 100,
+    after: Optional[tuple] = Depends(get_cursor),
     db: Session = Depends(get_db),
     current_user = Depends(get_current_active_user)
 ):
     """获取设备的维护历史"""
-    records = crud_maintenance.get_maintenance_records_by_equipment(db, equipment_id, skip, limit)
+    records = crud_maintenance.get_maintenance_records_by_equipment(db, equipment_id, skip, limit, after)
+    set_next_cursor(response, records, MAINTENANCE_CURSOR_FIELDS, limit)
     return records
 
 @router.get("/performer/{performer}/history", response_model=List[MaintenanceRecordSchema])
 def get_performer_maintenance_history(
+    response: Response,
     performer: str,
     skip: int = 0,
     limit: int = 100,
+    after: Optional[tuple] = Depends(get_cursor),
     db: Session = Depends(get_db),
     current_user = Depends(get_current_active_user)
 ):
     """获取执行人员的维护历史"""
-    records = crud_maintenance.get_maintenance_records_by_performer(db, performer, skip, limit)
+    records = crud_maintenance.get_maintenance_records_by_performer(db, performer, skip, limit, after)
+    set_next_cursor(response, records, MAINTENANCE_CURSOR_FIELDS, limit)
     return records 
\ No newline at end of file
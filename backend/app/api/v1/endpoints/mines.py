@@ -6,6 +6,7 @@ from app.models.mine import Mine
 from app.models.monitoring_point import MonitoringPoint
 from app.schemas.mine import Mine as MineSchema, MineCreate, MineUpdate, MonitoringPoint as MonitoringPointSchema, MonitoringPointCreate, MonitoringPointUpdate
 from app.core.deps import get_current_active_user
+from app.services.point_registry import monitoring_point_registry
 
 router = APIRouter()
 
@@ -108,4 +109,5 @@ def create_monitoring_point(
     db.add(db_monitoring_point)
     db.commit()
     db.refresh(db_monitoring_point)
+    monitoring_point_registry.add(db_monitoring_point.id)
     return db_monitoring_point 
\ No newline at end of file
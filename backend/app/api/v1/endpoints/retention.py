@@ -0,0 +1,72 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.database.database import get_db
+from app.models.mine import Mine
+from app.schemas.retention import RetentionPolicy as RetentionPolicySchema, RetentionPolicyCreate, RetentionPolicyUpdate, RetentionRun as RetentionRunSchema
+from app.crud import retention as crud_retention
+from app.core.deps import get_current_active_user, get_current_active_superuser
+
+router = APIRouter()
+
+@router.get("/policies", response_model=List[RetentionPolicySchema])
+def get_retention_policies(
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """获取数据保留策略"""
+    return crud_retention.get_retention_policies(db)
+
+@router.post("/policies", response_model=RetentionPolicySchema)
+def create_retention_policy(
+    policy: RetentionPolicyCreate,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_superuser)
+):
+    """创建数据保留策略（mine_id 为空为默认策略）"""
+    if policy.mine_id is not None and db.query(Mine).filter(Mine.id == policy.mine_id).first() is None:
+        raise HTTPException(status_code=404, detail="Mine not found")
+    if crud_retention.get_retention_policy_by_mine(db, policy.mine_id):
+        raise HTTPException(status_code=400, detail="Retention policy for this mine already exists")
+    return crud_retention.create_retention_policy(db, policy)
+
+@router.put("/policies/{policy_id}", response_model=RetentionPolicySchema)
+def update_retention_policy(
+    policy_id: int,
+    policy: RetentionPolicyUpdate,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_superuser)
+):
+    """更新数据保留策略"""
+    db_policy = crud_retention.update_retention_policy(db, policy_id, policy)
+    if db_policy is None:
+        raise HTTPException(status_code=404, detail="Retention policy not found")
+    return db_policy
+
+@router.delete("/policies/{policy_id}")
+def delete_retention_policy(
+    policy_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_superuser)
+):
+    """删除数据保留策略"""
+    if not crud_retention.delete_retention_policy(db, policy_id):
+        raise HTTPException(status_code=404, detail="Retention policy not found")
+    return {"message": "Retention policy deleted successfully"}
+
+@router.get("/report")
+def get_retention_report(
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_superuser)
+):
+    """试运行报告：按当前策略将被汇总和删除的行数"""
+    return crud_retention.get_retention_report(db)
+
+@router.get("/runs", response_model=List[RetentionRunSchema])
+def get_retention_runs(
+    limit: int = Query(20, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """获取最近的清理任务记录及指标"""
+    return crud_retention.get_retention_runs(db, limit)
@@ -0,0 +1,97 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.database.database import get_db
+from app.models.mine import Mine
+from app.models.monitoring_point import MonitoringPoint
+from app.models.threshold_rule import RuleType
+from app.schemas.threshold_rule import ThresholdRule as ThresholdRuleSchema, ThresholdRuleCreate, ThresholdRuleUpdate
+from app.crud import threshold_rule as crud_threshold_rule
+from app.services.rule_engine import threshold_rule_engine
+from app.core.deps import get_current_active_user, get_current_active_superuser
+
+router = APIRouter()
+
+@router.get("/", response_model=List[ThresholdRuleSchema])
+def get_threshold_rules(
+    mine_id: Optional[int] = Query(None),
+    monitoring_point_id: Optional[int] = Query(None),
+    rule_type: Optional[RuleType] = Query(None),
+    field: Optional[str] = Query(None),
+    is_active: Optional[bool] = Query(None),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """获取阈值规则列表"""
+    return crud_threshold_rule.get_threshold_rules(db, mine_id, monitoring_point_id, field, is_active, rule_type)
+
+@router.get("/effective/{monitoring_point_id}")
+def get_effective_threshold_rules(
+    monitoring_point_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """获取监控点当前生效的规则（每个类型和字段按 监控点 > 煤矿 > 全局 取一层）"""
+    if db.query(MonitoringPoint).filter(MonitoringPoint.id == monitoring_point_id).first() is None:
+        raise HTTPException(status_code=404, detail="Monitoring point not found")
+    return [
+        rule._asdict()
+        for rules in threshold_rule_engine.rules_for_point(monitoring_point_id).values()
+        for rule in rules
+    ]
+
+@router.get("/{rule_id}", response_model=ThresholdRuleSchema)
+def get_threshold_rule(
+    rule_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """获取阈值规则详情"""
+    db_rule = crud_threshold_rule.get_threshold_rule(db, rule_id)
+    if db_rule is None:
+        raise HTTPException(status_code=404, detail="Threshold rule not found")
+    return db_rule
+
+@router.post("/", response_model=ThresholdRuleSchema)
+def create_threshold_rule(
+    rule: ThresholdRuleCreate,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_superuser)
+):
+    """创建阈值规则（mine_id 与 monitoring_point_id 都为空为全局规则）"""
+    if rule.monitoring_point_id is not None:
+        point = db.query(MonitoringPoint).filter(MonitoringPoint.id == rule.monitoring_point_id).first()
+        if point is None:
+            raise HTTPException(status_code=404, detail="Monitoring point not found")
+        if rule.mine_id is not None and rule.mine_id != point.mine_id:
+            raise HTTPException(status_code=400, detail="Monitoring point does not belong to this mine")
+    elif rule.mine_id is not None and db.query(Mine).filter(Mine.id == rule.mine_id).first() is None:
+        raise HTTPException(status_code=404, detail="Mine not found")
+    return crud_threshold_rule.create_threshold_rule(db, rule)
+
+@router.put("/{rule_id}", response_model=ThresholdRuleSchema)
+def update_threshold_rule(
+    rule_id: int,
+    rule: ThresholdRuleUpdate,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_superuser)
+):
+    """更新阈值规则"""
+    try:
+        db_rule = crud_threshold_rule.update_threshold_rule(db, rule_id, rule)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if db_rule is None:
+        raise HTTPException(status_code=404, detail="Threshold rule not found")
+    return db_rule
+
+@router.delete("/{rule_id}")
+def delete_threshold_rule(
+    rule_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_superuser)
+):
+    """删除阈值规则"""
+    if not crud_threshold_rule.delete_threshold_rule(db, rule_id):
+        raise HTTPException(status_code=404, detail="Threshold rule not found")
+    return {"message": "Threshold rule deleted successfully"}
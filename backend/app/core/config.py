@@ -13,6 +13,10 @@ class Settings(BaseSettings):
     DATABASE_URL: Optional[str] = None
     SQLALCHEMY_DATABASE_URI: Optional[PostgresDsn] = None
     
+    @property
+    def database_url(self) -> str:
+        return str(self.SQLALCHEMY_DATABASE_URI)
+
     @validator("SQLALCHEMY_DATABASE_URI", pre=True, always=True)
     def assemble_db_connection(cls, v: Optional[str], values: Dict[str, Any]) -> Any:
         if v is not None:
@@ -30,6 +34,83 @@ class Settings(BaseSettings):
     DESCRIPTION: str = "AI-based dangerous action recognition alarm system for coal mining"
 
     DEBUG: bool = False
+    SQL_QUERY_COUNT_HEADER: bool = False  # 在响应头 X-SQL-Query-Count 中返回本次请求执行的 SQL 数
+
+    # 环境数据写缓冲（write-behind）配置
+    ENVIRONMENT_WRITE_BUFFER_ENABLED: bool = False
+    ENVIRONMENT_WRITE_BUFFER_MAX_SIZE: int = 20000  # 队列容量，满时返回503
+    ENVIRONMENT_WRITE_BUFFER_BATCH_SIZE: int = 500  # 累积到该行数立即提交
+    ENVIRONMENT_WRITE_BUFFER_FLUSH_INTERVAL_MS: int = 200  # 最长等待时间（毫秒）
+    ENVIRONMENT_WRITE_BUFFER_MAX_RETRIES: int = 5  # 数据库暂时不可用（断连、死锁）时一批的重试次数
+    ENVIRONMENT_WRITE_BUFFER_RETRY_BACKOFF_MS: int = 500  # 首次重试等待时间，之后每次翻倍，最长 30 秒
+
+    # environment_data 分区配置
+    ENVIRONMENT_DATA_PARTITION_INTERVAL: str = "week"  # day / week
+    ENVIRONMENT_DATA_PARTITIONS_AHEAD: int = 4  # 预建的未来分区数
+    ENVIRONMENT_DATA_PARTITION_RETENTION_DAYS: Optional[int] = None  # 为空表示不自动删除分区
+    ENVIRONMENT_DATA_PARTITION_MAINTENANCE_SECONDS: int = 3600
+
+    # 最新环境数据缓存的有效期（秒），0 表示只依赖写穿透与失效
+    LATEST_READING_CACHE_TTL_SECONDS: float = 5.0
+    MINE_SUMMARY_CACHE_TTL_SECONDS: float = 10.0  # 煤矿环境汇总缓存接口的有效期
+    ALERT_SUMMARY_CACHE_TTL_SECONDS: float = 5.0  # 报警统计概览缓存的有效期，报警状态变化时立即失效
+    ALERT_COUNTER_RECONCILE_SECONDS: int = 3600  # 按 alerts 校对报警计数表的间隔，0 表示不自动校对
+
+    # 报警推送（WebSocket / SSE）
+    ALERT_STREAM_ENABLED: bool = True
+    ALERT_STREAM_QUEUE_SIZE: int = 200  # 每个连接未发出的事件上限（按报警合并后），超出丢弃最早的
+    ALERT_STREAM_HISTORY_SIZE: int = 5000  # 内存中保留用于断线续传的最近事件数
+    ALERT_STREAM_POLL_SECONDS: float = 2.0  # 没有收到通知时读取新事件的间隔
+    ALERT_STREAM_HEARTBEAT_SECONDS: float = 15.0
+    ALERT_STREAM_GAP_SECONDS: float = 5.0  # 事件 id 出现空洞且写事务仍在运行时暂缓推送其后事件的最长时间，已回滚的空洞立即跳过
+    ALERT_STREAM_LATE_EVENT_SECONDS: float = 300.0  # 跳过的空洞在该时间内提交时仍补推给在线连接
+    ALERT_EVENT_RETENTION_HOURS: int = 24  # alert_events 表保留时间，超过后无法续传
+
+    # AI 检测批量接入：低于置信度下限的检测丢弃，同一 (监控点, 报警类型) 在窗口内的重复检测合并到未关闭的报警
+    DETECTION_CONFIDENCE_FLOORS: Dict[str, float] = {}  # 按报警类型值配置，如 {"dangerous_action": 0.6}
+    DETECTION_DEFAULT_CONFIDENCE_FLOOR: float = 0.5
+    DETECTION_MERGE_WINDOW_SECONDS: int = 60  # 距上次检测超过该时间视为新的事件，新建报警
+    DETECTION_FLUSH_SECONDS: float = 2.0  # 合并的重复检测写入报警（次数、最后出现时间）的间隔
+    MONITORING_POINT_REGISTRY_REFRESH_SECONDS: float = 60.0  # 内存监控点ID集合的重新加载间隔
+
+    # 最近读数环形缓冲：每个监控点保留最近 N 条，服务最新值、短时间窗统计和趋势
+    RECENT_STORE_ENABLED: bool = True
+    RECENT_STORE_CAPACITY: int = 2160  # 10 秒一条约 6 小时，每个监控点约 207 KB
+    RECENT_STORE_SYNC_SECONDS: float = 5.0  # 从数据库同步其他进程写入的间隔，0 表示只依赖本进程写入
+    RECENT_STORE_SYNC_LOOKBACK_SECONDS: float = 60.0  # 增量同步时回看的采集时间范围
+
+    # 环境数据汇总表（1 分钟 / 1 小时）
+    ENVIRONMENT_ROLLUP_ENABLED: bool = True
+    ENVIRONMENT_ROLLUP_REFRESH_SECONDS: int = 60
+    ENVIRONMENT_ROLLUP_BATCH_SIZE: int = 200000  # 每个事务处理的原始行数
+    ENVIRONMENT_ROLLUP_OVERLAP_IDS: int = 5000  # 回看的 id 数，覆盖刷新时尚未提交的写入
+    ENVIRONMENT_ROLLUP_LAG_SECONDS: int = 120  # 早于 now - lag 的桶才视为已完整汇总
+
+    # 数据保留：按 retention_policies 汇总并清理过期数据
+    RETENTION_ENABLED: bool = False
+    RETENTION_INTERVAL_SECONDS: int = 3600
+    RETENTION_BATCH_SIZE: int = 10000  # 每个删除事务的行数
+    RETENTION_BATCH_PAUSE_MS: int = 50  # 删除批次之间的停顿，平滑 WAL 写入
+    RETENTION_COMPACT_WINDOW_HOURS: int = 24  # 每个汇总事务覆盖的时间窗口
+
+    # 阈值规则引擎：写入环境数据时评估并生成报警
+    RULE_ENGINE_ENABLED: bool = True
+    RULE_ENGINE_RELOAD_SECONDS: float = 5.0  # 检查规则表是否变化的间隔，其他进程的修改最多延迟该时间生效
+
+    # 传感器报警防抖：滞回、最短持续时间和抑制窗口，规则未单独配置时使用
+    ALERT_HYSTERESIS_RATIO: float = 0.05  # 退出阈值 = 进入阈值 ∓ 阈值 × 该比例
+    ALERT_MIN_DURATION_SECONDS: int = 0  # 默认首次超限立即报警
+    ALERT_SUPPRESS_SECONDS: int = 300  # 解除后该时间内再次超限归入同一报警，不新建
+
+    # 在线异常检测（每个监控点每个字段的 EWMA 均值/方差 + CUSUM）
+    ANOMALY_DETECTION_ENABLED: bool = True
+    ANOMALY_EWMA_ALPHA: float = 0.05  # 平滑系数，约等于最近 2/alpha 个样本的窗口
+    ANOMALY_WARMUP_SAMPLES: int = 30  # 样本数达到后才开始判定
+    ANOMALY_Z_THRESHOLD: float = 5.0  # 单点突变的 z 分数阈值
+    ANOMALY_CUSUM_K: float = 0.5  # CUSUM 允许的漂移（以标准差计）
+    ANOMALY_CUSUM_H: float = 8.0  # CUSUM 报警阈值（以标准差计）
+    ANOMALY_ALERT_COOLDOWN_SECONDS: int = 600  # 同一监控点同一字段两次异常报警的最小间隔
+    ANOMALY_CHECKPOINT_SECONDS: int = 60
 
     class Config:
         case_sensitive = True
@@ -23,6 +23,10 @@ def get_db() -> Generator:
 def get_current_user(
     db: Session = Depends(get_db), token: str = Depends(reusable_oauth2)
 ) -> models.User:
+    return get_user_from_token(db, token)
+
+def get_user_from_token(db: Session, token: str) -> models.User:
+    """校验访问令牌并返回用户（WebSocket / SSE 无法设置请求头时从查询参数取令牌）"""
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
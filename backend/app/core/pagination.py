@@ -0,0 +1,56 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import tuple_
+
+# 列表接口仍返回数组，下一页游标放在响应头中，兼容旧客户端
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """把排序键编码为不透明的游标字符串"""
+    payload = [{"dt": value.isoformat()} if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    """解析游标，格式错误时抛出 ValueError"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(payload, list) or not payload:
+            raise ValueError("cursor payload must be a non-empty list")
+        return tuple(
+            datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value for value in payload
+        )
+    except (ValueError, TypeError, KeyError) as exc:
+        raise ValueError(f"Invalid cursor: {exc}") from exc
+
+def get_cursor(cursor: Optional[str] = Query(None, description=f"上一页响应头 {NEXT_CURSOR_HEADER} 中的游标")) -> Optional[tuple]:
+    """FastAPI 依赖：解析 cursor 查询参数"""
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def paginate(query, order_columns: Sequence, skip: int = 0, limit: int = 100, after: Optional[tuple] = None, descending: bool = True) -> List:
+    """
+    按 order_columns（最后一列须为唯一的 id）排序并分页
+    传入 after 时使用 keyset 条件 (sort, id) < after，耗时与页码无关；否则回退到 offset(skip)
+    """
+    if after is not None:
+        if len(after) != len(order_columns):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        key = tuple_(*order_columns)
+        query = query.filter(key < tuple_(*after) if descending else key > tuple_(*after))
+    elif skip:
+        query = query.offset(skip)
+    order_by = [column.desc() if descending else column.asc() for column in order_columns]
+    return query.order_by(*order_by).limit(limit).all()
+
+def set_next_cursor(response: Response, items: List, attributes: Sequence[str], limit: int) -> None:
+    """本页取满时把最后一行的排序键写入响应头"""
+    if items and len(items) >= limit:
+        last = items[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([getattr(last, name) for name in attributes])
@@ -0,0 +1,49 @@
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# 当前请求/代码块的计数器；线程池中执行的同步接口会复制上下文，计数对象是共享的
+_current: ContextVar[Optional["QueryCounter"]] = ContextVar("sql_query_counter", default=None)
+
+class QueryCounter:
+    """
+    统计代码块内执行的 SQL 语句数，用于发现 N+1 查询
+
+        with QueryCounter() as counter:
+            ...
+        counter.count
+
+    需要先对引擎调用 install()；计数器可以嵌套，内层语句同时计入外层
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+        self._parent: Optional[QueryCounter] = None
+        self._token = None
+
+    def __enter__(self) -> "QueryCounter":
+        self._parent = _current.get()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        _current.reset(self._token)
+
+    def record(self, statement: str) -> None:
+        counter = self
+        while counter is not None:
+            counter.count += 1
+            counter.statements.append(statement)
+            counter = counter._parent
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    counter = _current.get()
+    if counter is not None:
+        counter.record(statement)
+
+def install(engine: Engine) -> None:
+    """为引擎注册计数监听，重复调用无副作用"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
@@ -1,18 +1,29 @@
 from . import user
 from . import mine
 from . import alert
+from . import alert_counter
+from . import alert_event
 from . import environment_data
+from . import environment_rollup
 from . import equipment
 from . import maintenance_record
+from . import retention
+from . import threshold_rule
 
 from .user import crud_user
 from .mine import crud_mine
 from .alert import crud_alert
+from .alert_counter import crud_alert_counter
+from .alert_event import crud_alert_event
 from .environment_data import crud_environment_data
+from .environment_rollup import crud_environment_rollup
 from .equipment import crud_equipment
 from .maintenance_record import crud_maintenance_record
+from .retention import crud_retention
+from .threshold_rule import crud_threshold_rule
 
 __all__ = [
-    "crud_user", "crud_mine", "crud_alert", 
-    "crud_environment_data", "crud_equipment", "crud_maintenance_record"
+    "crud_user", "crud_mine", "crud_alert", "crud_alert_counter", "crud_alert_event",
+    "crud_environment_data", "crud_environment_rollup", "crud_equipment", "crud_maintenance_record", "crud_retention",
+    "crud_threshold_rule"
 ] 
\ No newline at end of file
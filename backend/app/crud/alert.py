@@ -1,15 +1,38 @@
 from typing import Optional, List, Dict
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import and_, insert, select, text, tuple_, update
 from app.models.alert import Alert, AlertStatus, AlertSeverity, AlertType
 from app.models.monitoring_point import MonitoringPoint
-from app.schemas.alert import AlertCreate, AlertUpdate
+from app.core.config import settings
+from app.core.pagination import paginate
+from app.crud.alert_counter import add_delta, apply_alert_counter_deltas, get_alert_counts
+from app.crud.alert_event import PAYLOAD_FIELDS, alert_event_payload, record_alert_events
+from app.schemas.alert import AlertBulkAction, AlertCreate, AlertUpdate, AlertSummary
+from app.services.ttl_cache import TTLCache
+
+# 列表按发现时间倒序，id 保证排序键唯一
+ALERT_ORDER = (Alert.detected_at, Alert.id)
+
+# AlertWithDetails 序列化的关联：监控点随主查询 JOIN，确认人/解决人各一条 IN 查询，
+# 一页报警固定 3 条 SQL，不随条数增加
+ALERT_DETAIL_OPTIONS = (
+    joinedload(Alert.monitoring_point, innerjoin=True),
+    selectinload(Alert.acknowledged_by_user),
+    selectinload(Alert.resolved_by_user),
+)
+
+# 报警统计概览缓存，键为 ("summary", mine_id)
+alert_summary_cache = TTLCache(ttl_seconds=settings.ALERT_SUMMARY_CACHE_TTL_SECONDS, max_entries=256)
 
 def get_alert(db: Session, alert_id: int) -> Optional[Alert]:
     """根据ID获取报警"""
     return db.query(Alert).filter(Alert.id == alert_id).first()
 
+def get_alert_with_details(db: Session, alert_id: int) -> Optional[Alert]:
+    """根据ID获取报警，同时加载监控点和确认人/解决人"""
+    return db.query(Alert).options(*ALERT_DETAIL_OPTIONS).filter(Alert.id == alert_id).first()
+
 def get_alerts(
     db: Session, 
     skip: int = 0, 
@@ -18,10 +41,11 @@ def get_alerts(
     severity: AlertSeverity = None,
     mine_id: int = None,
     start_date: datetime = None,
-    end_date: datetime = None
+    end_date: datetime = None,
+    after: Optional[tuple] = None
 ) -> List[Alert]:
-    """获取报警列表，支持多种过滤条件"""
-    query = db.query(Alert)
+    """获取报警列表，支持多种过滤条件，预加载 AlertWithDetails 需要的关联"""
+    query = db.query(Alert).options(*ALERT_DETAIL_OPTIONS)
     
     if status:
         query = query.filter(Alert.status == status)
@@ -34,7 +58,7 @@ def get_alerts(
     if end_date:
         query = query.filter(Alert.detected_at <= end_date)
     
-    return query.offset(skip).limit(limit).all()
+    return paginate(query, ALERT_ORDER, skip, limit, after)
 
 def get_active_alerts(db: Session, mine_id: int = None) -> List[Alert]:
     """获取活跃报警"""
@@ -56,22 +80,163 @@ def create_alert(db: Session, alert: AlertCreate) -> Alert:
     """创建新报警"""
     db_alert = Alert(**alert.dict())
     db.add(db_alert)
+    deltas = {}
+    add_delta(deltas, db_alert.monitoring_point_id, db_alert.severity, db_alert.status, 1)
+    apply_alert_counter_deltas(db, deltas)
+    db.flush()
+    record_alert_events(db, "created", [alert_event_payload(db_alert)])
     db.commit()
     db.refresh(db_alert)
+    invalidate_alert_summary()
     return db_alert
 
-def update_alert(db: Session, alert_id: int, alert_update: AlertUpdate) -> Optional[Alert]:
-    """更新报警信息"""
+def create_alerts_bulk(db: Session, alerts: List[dict]) -> List[int]:
+    """批量插入报警（一条多行 INSERT），不提交事务，由调用方与业务数据一起提交"""
+    if not alerts:
+        return []
+    alert_ids = list(db.execute(
+        insert(Alert).returning(Alert.id, sort_by_parameter_order=True), alerts
+    ).scalars())
+    deltas = {}
+    for alert in alerts:
+        add_delta(deltas, alert["monitoring_point_id"], alert["severity"], alert.get("status"), 1)
+    apply_alert_counter_deltas(db, deltas)
+    record_alert_events(db, "created", [
+        alert_event_payload({**alert, "id": alert_id}) for alert, alert_id in zip(alerts, alert_ids)
+    ])
+    invalidate_alert_summary()
+    return alert_ids
+
+# 合并到未关闭的报警：峰值按方向取极值，严重程度只升不降（枚举按定义顺序比较）
+# 先锁定并取出原严重程度，RETURNING 同时返回新旧严重程度用于更新计数
+EXTEND_OPEN_ALERT_SQL = """
+WITH v(id, peak_value, direction, last_seen_at, occurrence_count, severity, confidence_score) AS (
+    VALUES {values}
+), previous AS (
+    SELECT a.id, a.severity FROM alerts a JOIN v ON v.id = a.id
+    WHERE a.status IN ('ACTIVE', 'ACKNOWLEDGED')
+    FOR UPDATE OF a
+)
+UPDATE alerts AS a SET
+    peak_value = CASE WHEN v.direction = 'min' THEN LEAST(a.peak_value, v.peak_value)
+                      ELSE GREATEST(a.peak_value, v.peak_value) END,
+    last_seen_at = GREATEST(a.last_seen_at, v.last_seen_at),
+    occurrence_count = COALESCE(a.occurrence_count, 1) + v.occurrence_count,
+    severity = GREATEST(a.severity, v.severity),
+    confidence_score = GREATEST(a.confidence_score, v.confidence_score)
+FROM v, previous
+WHERE a.id = v.id AND previous.id = a.id
+RETURNING a.id, a.monitoring_point_id, a.alert_type, a.status, previous.severity AS previous_severity, a.severity,
+    a.title, a.alert_key, a.peak_value, a.last_seen_at, a.occurrence_count
+"""
+
+def get_open_alert_ids_by_key(db: Session, keys: List[tuple]) -> Dict[tuple, int]:
+    """按 (监控点ID, 报警键) 查找未关闭的传感器报警，同一键有多条时取最新的"""
+    if not keys:
+        return {}
+    rows = db.query(Alert.monitoring_point_id, Alert.alert_key, Alert.id).filter(
+        tuple_(Alert.monitoring_point_id, Alert.alert_key).in_(keys),
+        Alert.status.in_([AlertStatus.ACTIVE, AlertStatus.ACKNOWLEDGED])
+    ).order_by(Alert.detected_at.asc(), Alert.id.asc()).all()
+    return {(row.monitoring_point_id, row.alert_key): row.id for row in rows}
+
+def get_open_alerts_last_seen_by_key(db: Session, keys: List[tuple]) -> Dict[tuple, tuple]:
+    """按 (监控点ID, 报警键) 查找未关闭的报警，返回 {键: (报警ID, 最后出现时间)}，同一键有多条时取最新的"""
+    if not keys:
+        return {}
+    rows = db.query(Alert.monitoring_point_id, Alert.alert_key, Alert.id, Alert.last_seen_at, Alert.detected_at).filter(
+        tuple_(Alert.monitoring_point_id, Alert.alert_key).in_(keys),
+        Alert.status.in_([AlertStatus.ACTIVE, AlertStatus.ACKNOWLEDGED])
+    ).order_by(Alert.detected_at.asc(), Alert.id.asc()).all()
+    return {
+        (row.monitoring_point_id, row.alert_key): (row.id, row.last_seen_at or row.detected_at) for row in rows
+    }
+
+def extend_open_alerts(db: Session, updates: List[dict]) -> set:
+    """
+    把持续中的报警条件合并到已有报警（峰值、最后出现时间、次数），一条 UPDATE ... FROM (VALUES ...)
+    updates 每项包含 id、peak_value、direction（max/min）、last_seen_at、occurrence_count、severity、confidence_score。
+    不提交事务；返回实际更新（仍未关闭）的报警ID
+    """
+    if not updates:
+        return set()
+    values, params = [], {}
+    for index, item in enumerate(updates):
+        values.append(
+            f"(CAST(:id{index} AS INTEGER), CAST(:peak{index} AS DOUBLE PRECISION), CAST(:direction{index} AS TEXT), "
+            f"CAST(:seen{index} AS TIMESTAMPTZ), CAST(:count{index} AS INTEGER), CAST(:severity{index} AS alertseverity), "
+            f"CAST(:confidence{index} AS DOUBLE PRECISION))"
+        )
+        params.update({
+            f"id{index}": item["id"],
+            f"peak{index}": item["peak_value"],
+            f"direction{index}": item["direction"],
+            f"seen{index}": item["last_seen_at"],
+            f"count{index}": item["occurrence_count"],
+            f"severity{index}": item["severity"].name,
+            f"confidence{index}": item.get("confidence_score"),
+        })
+    rows = db.execute(text(EXTEND_OPEN_ALERT_SQL.format(values=", ".join(values))), params).all()
+    deltas, escalated = {}, []
+    for row in rows:
+        if row.previous_severity != row.severity:
+            add_delta(deltas, row.monitoring_point_id, AlertSeverity[row.previous_severity], AlertStatus[row.status], -1)
+            add_delta(deltas, row.monitoring_point_id, AlertSeverity[row.severity], AlertStatus[row.status], 1)
+            escalated.append({
+                **alert_event_payload({
+                    **row._mapping,
+                    "alert_type": AlertType[row.alert_type],
+                    "severity": AlertSeverity[row.severity],
+                    "status": AlertStatus[row.status],
+                }),
+                "previous_severity": AlertSeverity[row.previous_severity].value,
+            })
+    if deltas:
+        # 严重程度升级
+        apply_alert_counter_deltas(db, deltas)
+        record_alert_events(db, "escalated", escalated)
+        invalidate_alert_summary()
+    return {row.id for row in rows}
+
+def _move_counter(db: Session, db_alert: Alert, previous_status: AlertStatus) -> None:
+    """报警状态变化：旧状态计数减一、新状态加一，并写入状态变化事件，与状态变更同一事务提交"""
+    deltas = {}
+    add_delta(deltas, db_alert.monitoring_point_id, db_alert.severity, previous_status, -1)
+    add_delta(deltas, db_alert.monitoring_point_id, db_alert.severity, db_alert.status, 1)
+    apply_alert_counter_deltas(db, deltas)
+    event_type = {AlertStatus.ACKNOWLEDGED: "acknowledged", AlertStatus.RESOLVED: "resolved"}.get(db_alert.status, "updated")
+    record_alert_events(db, event_type, [alert_event_payload(db_alert)])
+
+def update_alert(
+    db: Session, alert_id: int, alert_update: AlertUpdate, user_id: Optional[int] = None
+) -> Optional[Alert]:
+    """更新报警信息，状态变为已确认/已解决时记录时间和操作人"""
     db_alert = get_alert(db, alert_id)
     if not db_alert:
         return None
     
     update_data = alert_update.dict(exclude_unset=True)
+    previous_status = db_alert.status
+
+    # 处理状态变更的时间戳
+    if "status" in update_data:
+        if update_data["status"] == AlertStatus.ACKNOWLEDGED and db_alert.status == AlertStatus.ACTIVE:
+            update_data["acknowledged_at"] = datetime.utcnow()
+            update_data["acknowledged_by"] = user_id
+        elif update_data["status"] == AlertStatus.RESOLVED:
+            update_data["resolved_at"] = datetime.utcnow()
+            update_data["resolved_by"] = user_id
+
     for field, value in update_data.items():
         setattr(db_alert, field, value)
     
+    status_changed = db_alert.status != previous_status
+    if status_changed:
+        _move_counter(db, db_alert, previous_status)
     db.commit()
     db.refresh(db_alert)
+    if status_changed:
+        invalidate_alert_summary()
     return db_alert
 
 def acknowledge_alert(db: Session, alert_id: int, user_id: int) -> Optional[Alert]:
@@ -84,8 +249,10 @@ def acknowledge_alert(db: Session, alert_id: int, user_id: int) -> Optional[Aler
     db_alert.acknowledged_at = datetime.utcnow()
     db_alert.acknowledged_by = user_id
     
+    _move_counter(db, db_alert, AlertStatus.ACTIVE)
     db.commit()
     db.refresh(db_alert)
+    invalidate_alert_summary()
     return db_alert
 
 def resolve_alert(db: Session, alert_id: int, user_id: int) -> Optional[Alert]:
@@ -94,56 +261,166 @@ def resolve_alert(db: Session, alert_id: int, user_id: int) -> Optional[Alert]:
     if not db_alert or db_alert.status == AlertStatus.RESOLVED:
         return None
     
+    previous_status = db_alert.status
     db_alert.status = AlertStatus.RESOLVED
     db_alert.resolved_at = datetime.utcnow()
     db_alert.resolved_by = user_id
     
+    _move_counter(db, db_alert, previous_status)
     db.commit()
     db.refresh(db_alert)
+    invalidate_alert_summary()
     return db_alert
 
+# 批量变更返回的报警字段，用于计数增量和事件
+BULK_RETURNING = tuple(
+    column for column in Alert.__table__.columns if column.name in PAYLOAD_FIELDS
+)
+
+def _bulk_change_status(
+    db: Session, action: AlertBulkAction, eligible, values: dict, new_status: AlertStatus, event_type: str
+) -> dict:
+    """
+    一条 UPDATE ... RETURNING 批量变更报警状态
+    CTE 按 id 顺序锁定符合条件的行并保留旧状态；READ COMMITTED 下等待并发事务提交后会按最新状态重新判断条件，
+    已被其他请求确认/解决的报警不会重复变更。计数增量、事件与状态变更同一事务提交
+    """
+    conditions = [eligible]
+    if action.alert_ids is not None:
+        conditions.append(Alert.id.in_(set(action.alert_ids)))
+    if action.monitoring_point_id is not None:
+        conditions.append(Alert.monitoring_point_id == action.monitoring_point_id)
+    if action.mine_id is not None:
+        conditions.append(Alert.monitoring_point_id.in_(
+            select(MonitoringPoint.id).where(MonitoringPoint.mine_id == action.mine_id)
+        ))
+    if action.alert_type is not None:
+        conditions.append(Alert.alert_type == action.alert_type)
+    if action.detected_before is not None:
+        conditions.append(Alert.detected_at < action.detected_before)
+
+    target = select(Alert.id, Alert.status.label("previous_status")).where(*conditions).order_by(
+        Alert.id
+    ).with_for_update(of=Alert).cte("target")
+    table = Alert.__table__
+    rows = db.execute(
+        update(table).where(table.c.id == target.c.id).values(status=new_status, **values).returning(
+            target.c.previous_status, *BULK_RETURNING
+        )
+    ).all()
+
+    deltas = {}
+    events = []
+    for row in rows:
+        add_delta(deltas, row.monitoring_point_id, row.severity, row.previous_status, -1)
+        add_delta(deltas, row.monitoring_point_id, row.severity, new_status, 1)
+        events.append(alert_event_payload(row._mapping))
+    apply_alert_counter_deltas(db, deltas)
+    record_alert_events(db, event_type, sorted(events, key=lambda event: event["id"]))
+    db.commit()
+    if rows:
+        invalidate_alert_summary()
+
+    updated = sorted(row.id for row in rows)
+    skipped = []
+    if action.alert_ids is not None:
+        missing = set(action.alert_ids) - set(updated)
+        current = dict(db.query(Alert.id, Alert.status).filter(Alert.id.in_(missing)).all()) if missing else {}
+        skipped = [
+            {"id": alert_id, "reason": current[alert_id].value if current.get(alert_id) else "not_found"}
+            for alert_id in sorted(missing)
+        ]
+    return {"updated": updated, "skipped": skipped}
+
+def acknowledge_alerts(db: Session, action: AlertBulkAction, user_id: int) -> dict:
+    """批量确认活跃报警，返回 {"updated": [...], "skipped": [...]}"""
+    return _bulk_change_status(
+        db, action, Alert.status == AlertStatus.ACTIVE,
+        {"acknowledged_at": datetime.utcnow(), "acknowledged_by": user_id},
+        AlertStatus.ACKNOWLEDGED, "acknowledged"
+    )
+
+def resolve_alerts(db: Session, action: AlertBulkAction, user_id: int) -> dict:
+    """批量解决未解决的报警，返回 {"updated": [...], "skipped": [...]}"""
+    return _bulk_change_status(
+        db, action, Alert.status.is_distinct_from(AlertStatus.RESOLVED),
+        {"resolved_at": datetime.utcnow(), "resolved_by": user_id},
+        AlertStatus.RESOLVED, "resolved"
+    )
+
+def _empty_counts() -> dict:
+    return {
+        "total_alerts": 0,
+        "active_alerts": 0,
+        "critical_alerts": 0,
+        "alerts_by_severity": {severity.value: 0 for severity in AlertSeverity},
+        "alerts_by_status": {status.value: 0 for status in AlertStatus},
+    }
+
+def _add_counts(counts: dict, severity: AlertSeverity, status: AlertStatus, count: int) -> None:
+    counts["total_alerts"] += count
+    counts["alerts_by_severity"][severity.value] += count
+    counts["alerts_by_status"][status.value] += count
+    if status == AlertStatus.ACTIVE:
+        counts["active_alerts"] += count
+        if severity == AlertSeverity.CRITICAL:
+            counts["critical_alerts"] += count
+
 def get_alert_summary(db: Session, mine_id: int = None) -> Dict:
-    """获取报警统计概览"""
-    query = db.query(Alert)
-    if mine_id:
-        query = query.join(MonitoringPoint).filter(MonitoringPoint.mine_id == mine_id)
-    
-    total_alerts = query.count()
-    active_alerts = query.filter(Alert.status == AlertStatus.ACTIVE).count()
-    critical_alerts = query.filter(
-        and_(Alert.severity == AlertSeverity.CRITICAL, Alert.status == AlertStatus.ACTIVE)
-    ).count()
-    
-    # 按严重程度统计
-    alerts_by_severity = {}
-    for severity in AlertSeverity:
-        count = query.filter(Alert.severity == severity).count()
-        alerts_by_severity[severity.value] = count
-    
+    """
+    获取报警统计概览
+    计数读 alert_counters（按煤矿/严重程度/状态汇总，行数与报警历史无关），
+    另一条查询取最近 24 小时的 10 条报警
+    """
+    totals = _empty_counts()
+    by_mine: Dict[int, dict] = {}
+    for row in get_alert_counts(db, mine_id):
+        _add_counts(totals, row.severity, row.status, row.count)
+        mine_counts = by_mine.get(row.mine_id)
+        if mine_counts is None:
+            mine_counts = by_mine[row.mine_id] = {"mine_id": row.mine_id, **_empty_counts()}
+        _add_counts(mine_counts, row.severity, row.status, row.count)
+
     # 最近报警（最近24小时）
-    recent_alerts = query.filter(
+    recent_query = db.query(Alert)
+    if mine_id:
+        recent_query = recent_query.join(MonitoringPoint).filter(MonitoringPoint.mine_id == mine_id)
+    recent_alerts = recent_query.filter(
         Alert.detected_at >= datetime.utcnow() - timedelta(hours=24)
     ).order_by(Alert.detected_at.desc()).limit(10).all()
-    
+
     return {
-        "total_alerts": total_alerts,
-        "active_alerts": active_alerts,
-        "critical_alerts": critical_alerts,
-        "alerts_by_severity": alerts_by_severity,
+        **totals,
+        "alerts_by_mine": [by_mine[key] for key in sorted(by_mine)],
         "recent_alerts": recent_alerts
     }
 
-def get_alerts_by_monitoring_point(db: Session, monitoring_point_id: int, skip: int = 0, limit: int = 100) -> List[Alert]:
+def get_alert_summary_cached(db: Session, mine_id: int = None) -> AlertSummary:
+    """获取报警统计概览，结果缓存 ALERT_SUMMARY_CACHE_TTL_SECONDS 秒，报警新建或状态变化时失效"""
+    return alert_summary_cache.get_or_set(
+        ("summary", mine_id), lambda: AlertSummary.model_validate(get_alert_summary(db, mine_id))
+    )
+
+def invalidate_alert_summary() -> None:
+    """报警新建、状态或严重程度变化后调用。
+    不提交事务的写入在提交前就会失效缓存，提交前被并发读取重新缓存的旧值最多保留一个 TTL"""
+    alert_summary_cache.invalidate()
+
+def get_alerts_by_monitoring_point(
+    db: Session, monitoring_point_id: int, skip: int = 0, limit: int = 100, after: Optional[tuple] = None
+) -> List[Alert]:
     """获取指定监控点的报警"""
-    return db.query(Alert).filter(
+    return paginate(db.query(Alert).filter(
         Alert.monitoring_point_id == monitoring_point_id
-    ).order_by(Alert.detected_at.desc()).offset(skip).limit(limit).all()
+    ), ALERT_ORDER, skip, limit, after)
 
-def get_alerts_by_type(db: Session, alert_type: AlertType, skip: int = 0, limit: int = 100) -> List[Alert]:
+def get_alerts_by_type(
+    db: Session, alert_type: AlertType, skip: int = 0, limit: int = 100, after: Optional[tuple] = None
+) -> List[Alert]:
     """根据报警类型获取报警"""
-    return db.query(Alert).filter(
+    return paginate(db.query(Alert).filter(
         Alert.alert_type == alert_type
-    ).order_by(Alert.detected_at.desc()).offset(skip).limit(limit).all()
+    ), ALERT_ORDER, skip, limit, after)
 
 def delete_alert(db: Session, alert_id: int) -> bool:
     """删除报警"""
@@ -151,20 +428,34 @@ def delete_alert(db: Session, alert_id: int) -> bool:
     if not db_alert:
         return False
     
+    deltas = {}
+    add_delta(deltas, db_alert.monitoring_point_id, db_alert.severity, db_alert.status, -1)
+    apply_alert_counter_deltas(db, deltas)
+    record_alert_events(db, "deleted", [alert_event_payload(db_alert)])
     db.delete(db_alert)
     db.commit()
+    invalidate_alert_summary()
     return True
 
 class CRUDAlert:
     get_alert = staticmethod(get_alert)
+    get_alert_with_details = staticmethod(get_alert_with_details)
     get_alerts = staticmethod(get_alerts)
     get_active_alerts = staticmethod(get_active_alerts)
     get_critical_alerts = staticmethod(get_critical_alerts)
     create_alert = staticmethod(create_alert)
+    create_alerts_bulk = staticmethod(create_alerts_bulk)
+    get_open_alert_ids_by_key = staticmethod(get_open_alert_ids_by_key)
+    get_open_alerts_last_seen_by_key = staticmethod(get_open_alerts_last_seen_by_key)
+    extend_open_alerts = staticmethod(extend_open_alerts)
     update_alert = staticmethod(update_alert)
     acknowledge_alert = staticmethod(acknowledge_alert)
     resolve_alert = staticmethod(resolve_alert)
+    acknowledge_alerts = staticmethod(acknowledge_alerts)
+    resolve_alerts = staticmethod(resolve_alerts)
     get_alert_summary = staticmethod(get_alert_summary)
+    get_alert_summary_cached = staticmethod(get_alert_summary_cached)
+    invalidate_alert_summary = staticmethod(invalidate_alert_summary)
     get_alerts_by_monitoring_point = staticmethod(get_alerts_by_monitoring_point)
     get_alerts_by_type = staticmethod(get_alerts_by_type)
     delete_alert = staticmethod(delete_alert)
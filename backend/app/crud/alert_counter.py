@@ -0,0 +1,128 @@
+from typing import Dict, List, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import func, text
+from app.models.alert import AlertSeverity, AlertStatus
+from app.models.alert_counter import AlertCounter
+
+# (监控点ID, 严重程度, 状态) -> 增量
+CounterKey = Tuple[int, AlertSeverity, AlertStatus]
+
+# 按监控点所属煤矿写入，已有行直接累加
+APPLY_DELTAS_SQL = """
+INSERT INTO alert_counters (mine_id, monitoring_point_id, severity, status, count, updated_at)
+SELECT mp.mine_id, v.monitoring_point_id, v.severity, v.status, v.delta, now()
+FROM (VALUES {values}) AS v(monitoring_point_id, severity, status, delta)
+JOIN monitoring_points mp ON mp.id = v.monitoring_point_id
+ON CONFLICT (monitoring_point_id, severity, status) DO UPDATE SET
+    count = alert_counters.count + EXCLUDED.count,
+    mine_id = EXCLUDED.mine_id,
+    updated_at = EXCLUDED.updated_at
+"""
+
+EXPECTED_COUNTS_SQL = """
+SELECT monitoring_point_id, severity, COALESCE(status, 'ACTIVE') AS status, count(*) AS count
+FROM alerts
+GROUP BY monitoring_point_id, severity, COALESCE(status, 'ACTIVE')
+"""
+
+# 监控点调整了所属煤矿
+FIX_MINE_SQL = """
+UPDATE alert_counters AS c SET mine_id = mp.mine_id, updated_at = now()
+FROM monitoring_points mp
+WHERE mp.id = c.monitoring_point_id AND c.mine_id <> mp.mine_id
+"""
+
+def add_delta(deltas: Dict[CounterKey, int], monitoring_point_id: int, severity, status, delta: int) -> None:
+    """累加一个计数增量，severity/status 可以是枚举或枚举值"""
+    key = (monitoring_point_id, AlertSeverity(severity), AlertStatus(status or AlertStatus.ACTIVE))
+    deltas[key] = deltas.get(key, 0) + delta
+
+def apply_alert_counter_deltas(db: Session, deltas: Dict[CounterKey, int]) -> None:
+    """
+    把计数增量写入 alert_counters，一条 INSERT ... ON CONFLICT DO UPDATE，不提交事务，
+    由调用方与报警的变更一起提交。按主键顺序加锁，避免并发事务互相死锁
+    """
+    items = sorted(
+        ((key, delta) for key, delta in deltas.items() if delta),
+        key=lambda item: (item[0][0], item[0][1].name, item[0][2].name)
+    )
+    if not items:
+        return
+    values, params = [], {}
+    for index, ((monitoring_point_id, severity, status), delta) in enumerate(items):
+        values.append(
+            f"(CAST(:point{index} AS INTEGER), CAST(:severity{index} AS alertseverity), "
+            f"CAST(:status{index} AS alertstatus), CAST(:delta{index} AS INTEGER))"
+        )
+        params.update({
+            f"point{index}": monitoring_point_id,
+            f"severity{index}": severity.name,
+            f"status{index}": status.name,
+            f"delta{index}": delta,
+        })
+    db.execute(text(APPLY_DELTAS_SQL.format(values=", ".join(values))), params)
+
+def get_alert_counts(db: Session, mine_id: int = None) -> List[tuple]:
+    """按 (煤矿, 严重程度, 状态) 汇总的计数行"""
+    query = db.query(
+        AlertCounter.mine_id, AlertCounter.severity, AlertCounter.status, func.sum(AlertCounter.count).label("count")
+    )
+    if mine_id:
+        query = query.filter(AlertCounter.mine_id == mine_id)
+    return query.group_by(AlertCounter.mine_id, AlertCounter.severity, AlertCounter.status).having(
+        func.sum(AlertCounter.count) != 0
+    ).all()
+
+def reconcile_alert_counters(db: Session, fix: bool = True) -> dict:
+    """
+    用 alerts 重新计算计数并与 alert_counters 对比，返回偏差；fix 时写入修正
+    两边在同一个 REPEATABLE READ 快照中读取，计数与报警的变更同事务提交，因此快照内应完全一致；
+    修正以增量方式写入，与期间并发的计数更新可以叠加，不需要锁表。
+    多个 worker 同时校对会重复写入同一修正，整个过程持有事务级咨询锁（在单独的连接上），
+    后执行的校对在前一个提交之后才取快照
+    """
+    with db.get_bind().begin() as lock_connection:
+        lock_connection.execute(text("SELECT pg_advisory_xact_lock(hashtext('alert_counters_reconcile'))"))
+        return _reconcile(db, fix)
+
+def _reconcile(db: Session, fix: bool) -> dict:
+    db.rollback()
+    connection = db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    expected = {
+        (row.monitoring_point_id, AlertSeverity[row.severity], AlertStatus[row.status]): row.count
+        for row in connection.execute(text(EXPECTED_COUNTS_SQL))
+    }
+    counted = {
+        (row.monitoring_point_id, row.severity, row.status): row.count
+        for row in db.query(AlertCounter.monitoring_point_id, AlertCounter.severity, AlertCounter.status, AlertCounter.count)
+    }
+    db.rollback()
+
+    deltas: Dict[CounterKey, int] = {}
+    drift = []
+    for key in sorted(set(expected) | set(counted), key=lambda key: (key[0], key[1].name, key[2].name)):
+        difference = expected.get(key, 0) - counted.get(key, 0)
+        if difference:
+            deltas[key] = difference
+            drift.append({
+                "monitoring_point_id": key[0],
+                "severity": key[1].value,
+                "status": key[2].value,
+                "expected": expected.get(key, 0),
+                "counted": counted.get(key, 0),
+            })
+
+    mines_fixed = 0
+    if fix:
+        apply_alert_counter_deltas(db, deltas)
+        mines_fixed = db.execute(text(FIX_MINE_SQL)).rowcount
+        db.commit()
+    return {"counters": len(expected), "drift": drift, "mines_fixed": mines_fixed}
+
+class CRUDAlertCounter:
+    add_delta = staticmethod(add_delta)
+    apply_alert_counter_deltas = staticmethod(apply_alert_counter_deltas)
+    get_alert_counts = staticmethod(get_alert_counts)
+    reconcile_alert_counters = staticmethod(reconcile_alert_counters)
+
+crud_alert_counter = CRUDAlertCounter()
@@ -0,0 +1,94 @@
+import enum
+from datetime import datetime, timedelta, timezone
+from typing import List, Mapping, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import insert, text
+from app.models.alert import AlertSeverity, AlertStatus, AlertType
+from app.models.alert_event import AlertEvent
+from app.models.monitoring_point import MonitoringPoint
+
+# 事件写入后通知各进程的推送通道读取新事件，NOTIFY 在事务提交时才送达
+ALERT_EVENTS_CHANNEL = "alert_events"
+
+PAYLOAD_FIELDS = (
+    "id", "monitoring_point_id", "alert_type", "severity", "status", "title", "detected_at",
+    "confidence_score", "alert_key", "peak_value", "last_seen_at", "occurrence_count",
+    "acknowledged_at", "acknowledged_by", "resolved_at", "resolved_by",
+)
+
+def _json_value(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def alert_event_payload(alert) -> dict:
+    """报警（ORM 对象或字典）的主要字段快照，枚举取值、时间转为 ISO 字符串"""
+    if isinstance(alert, Mapping):
+        return {field: _json_value(alert[field]) for field in PAYLOAD_FIELDS if field in alert}
+    return {field: _json_value(getattr(alert, field, None)) for field in PAYLOAD_FIELDS}
+
+def record_alert_events(db: Session, event_type: str, alerts: List[Mapping]) -> None:
+    """
+    为一批报警写入同一类型的事件，alerts 每项至少包含 id、monitoring_point_id、alert_type、severity、status
+    （可用 alert_event_payload 生成）。不提交事务，由调用方与报警的变更一起提交
+    """
+    if not alerts:
+        return
+    # 并发事务的事件不一定按 id 顺序提交，推送通道遇到 id 空洞时等待写入事务结束（见 AlertStreamHub）；
+    # 调用方总是先修改报警再记录事件，取得事件 id 时事务已分配事务ID
+    point_ids = {alert["monitoring_point_id"] for alert in alerts}
+    mines = dict(db.query(MonitoringPoint.id, MonitoringPoint.mine_id).filter(MonitoringPoint.id.in_(point_ids)).all())
+    db.execute(insert(AlertEvent), [
+        {
+            "alert_id": alert["id"],
+            "event_type": event_type,
+            "mine_id": mines.get(alert["monitoring_point_id"]),
+            "monitoring_point_id": alert["monitoring_point_id"],
+            "alert_type": AlertType(alert["alert_type"]),
+            "severity": AlertSeverity(alert["severity"]),
+            "status": AlertStatus(alert.get("status") or AlertStatus.ACTIVE),
+            "payload": {**alert, "mine_id": mines.get(alert["monitoring_point_id"])},
+        }
+        for alert in alerts
+    ])
+    db.execute(text("SELECT pg_notify(:channel, '')"), {"channel": ALERT_EVENTS_CHANNEL})
+
+def get_alert_events_after(db: Session, after_id: int, limit: int = 1000) -> List[AlertEvent]:
+    """按 id 顺序获取 after_id 之后的事件"""
+    return db.query(AlertEvent).filter(AlertEvent.id > after_id).order_by(AlertEvent.id.asc()).limit(limit).all()
+
+def get_snapshot_xid_bounds(db: Session) -> Tuple[int, int]:
+    """当前快照的 (xmin, xmax)：早于 xmin 的事务都已结束，xmax 之后的事务在快照时尚未开始"""
+    return tuple(db.execute(text(
+        "SELECT pg_snapshot_xmin(s)::text::bigint, pg_snapshot_xmax(s)::text::bigint FROM pg_current_snapshot() s"
+    )).one())
+
+def get_alert_events_by_ids(db: Session, event_ids: List[int]) -> List[AlertEvent]:
+    """按 id 获取事件（已提交的），按 id 排序"""
+    if not event_ids:
+        return []
+    return db.query(AlertEvent).filter(AlertEvent.id.in_(event_ids)).order_by(AlertEvent.id.asc()).all()
+
+def get_latest_alert_event_id(db: Session) -> int:
+    """最新事件的 id，没有事件时为 0"""
+    return db.query(AlertEvent.id).order_by(AlertEvent.id.desc()).limit(1).scalar() or 0
+
+def prune_alert_events(db: Session, retention_hours: float) -> int:
+    """删除早于保留时间的事件，返回删除行数"""
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=retention_hours)
+    deleted = db.query(AlertEvent).filter(AlertEvent.created_at < cutoff).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+class CRUDAlertEvent:
+    alert_event_payload = staticmethod(alert_event_payload)
+    record_alert_events = staticmethod(record_alert_events)
+    get_alert_events_after = staticmethod(get_alert_events_after)
+    get_alert_events_by_ids = staticmethod(get_alert_events_by_ids)
+    get_snapshot_xid_bounds = staticmethod(get_snapshot_xid_bounds)
+    get_latest_alert_event_id = staticmethod(get_latest_alert_event_id)
+    prune_alert_events = staticmethod(prune_alert_events)
+
+crud_alert_event = CRUDAlertEvent()
@@ -1,10 +1,22 @@
-from typing import Optional, List
-from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, or_
-from app.models.environment_data import EnvironmentData
+from typing import Dict, Iterator, Optional, List, Sequence, Tuple
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import DateTime, Integer, and_, column, func, or_, insert, select, true, values
+from app.models.environment_data import EnvironmentData, ENVIRONMENT_FIELDS
 from app.models.monitoring_point import MonitoringPoint
-from app.schemas.environment_data import EnvironmentDataCreate, EnvironmentDataUpdate
+from app.models.threshold_rule import RuleType
+from app.schemas.environment_data import EnvironmentData as EnvironmentDataSchema, EnvironmentDataCreate, EnvironmentDataUpdate
+from app.core.pagination import paginate
+from app.crud.environment_rollup import aggregate_statistics, aggregate_trend_buckets, refresh_rollup_bucket
+from app.services.downsampling import largest_triangle_three_buckets
+from app.services.rule_engine import threshold_rule_engine
+from app.core.config import settings
+from app.services.latest_cache import latest_reading_cache
+from app.services.recent_store import Window, recent_reading_store
+
+# 列表按采集时间倒序，id 保证排序键唯一
+ENVIRONMENT_DATA_ORDER = (EnvironmentData.recorded_at, EnvironmentData.id)
 
 def get_environment_data(db: Session, data_id: int) -> Optional[EnvironmentData]:
     """根据ID获取环境数据"""
@@ -14,12 +26,13 @@ def get_environment_data_by_monitoring_point(
     db: Session, 
     monitoring_point_id: int, 
     skip: int = 0, 
-    limit: int = 100
+    limit: int = 100,
+    after: Optional[tuple] = None
 ) -> List[EnvironmentData]:
     """获取指定监控点的环境数据"""
-    return db.query(EnvironmentData).filter(
+    return paginate(db.query(EnvironmentData).filter(
         EnvironmentData.monitoring_point_id == monitoring_point_id
-    ).order_by(EnvironmentData.recorded_at.desc()).offset(skip).limit(limit).all()
+    ), ENVIRONMENT_DATA_ORDER, skip, limit, after)
 
 def get_latest_environment_data(db: Session, monitoring_point_id: int) -> Optional[EnvironmentData]:
     """获取指定监控点的最新环境数据"""
@@ -27,16 +40,73 @@ def get_latest_environment_data(db: Session, monitoring_point_id: int) -> Option
         EnvironmentData.monitoring_point_id == monitoring_point_id
     ).order_by(EnvironmentData.recorded_at.desc()).first()
 
+def get_latest_environment_data_cached(db: Session, monitoring_point_id: int) -> Optional[EnvironmentDataSchema]:
+    """获取最新环境数据，优先读缓存，未命中时读最近读数缓冲或查库并回填"""
+    reading = latest_reading_cache.get(monitoring_point_id)
+    if reading is not None:
+        return reading
+    if settings.RECENT_STORE_ENABLED:
+        reading = recent_reading_store.latest(db, monitoring_point_id)
+    else:
+        db_data = get_latest_environment_data(db, monitoring_point_id)
+        reading = EnvironmentDataSchema.model_validate(db_data) if db_data is not None else None
+    if reading is None:
+        return None
+    latest_reading_cache.put(reading)
+    return reading
+
+def get_latest_environment_data_by_mine(db: Session, mine_id: int) -> List[EnvironmentDataSchema]:
+    """获取煤矿所有监控点的最新环境数据，未命中缓存的监控点一次查询补齐"""
+    point_ids = [row[0] for row in db.query(MonitoringPoint.id).filter(MonitoringPoint.mine_id == mine_id).all()]
+    readings, missing = latest_reading_cache.get_many(point_ids)
+    if missing:
+        # LATERAL 子查询让每个监控点只走一次 (monitoring_point_id, recorded_at) 索引取一行
+        points = select(MonitoringPoint.id).where(MonitoringPoint.id.in_(missing)).subquery()
+        latest = (
+            select(EnvironmentData)
+            .where(EnvironmentData.monitoring_point_id == points.c.id)
+            .order_by(EnvironmentData.recorded_at.desc())
+            .limit(1)
+            .lateral()
+        )
+        latest_data = aliased(EnvironmentData, latest)
+        rows = db.execute(select(latest_data).select_from(points).join(latest, true())).scalars().all()
+        loaded = [EnvironmentDataSchema.model_validate(row) for row in rows]
+        latest_reading_cache.put_many(loaded)
+        readings.extend(loaded)
+    return sorted(readings, key=lambda reading: reading.monitoring_point_id)
+
+def get_readings_before(db: Session, before: Dict[int, datetime]) -> List[EnvironmentData]:
+    """每个监控点取采集时间早于给定时间的最近一条读数，一次 LATERAL 查询"""
+    if not before:
+        return []
+    bounds = values(
+        column("monitoring_point_id", Integer), column("before", DateTime(timezone=True)), name="bounds"
+    ).data(list(before.items()))
+    previous = (
+        select(EnvironmentData)
+        .where(
+            EnvironmentData.monitoring_point_id == bounds.c.monitoring_point_id,
+            EnvironmentData.recorded_at < bounds.c.before
+        )
+        .order_by(EnvironmentData.recorded_at.desc())
+        .limit(1)
+        .lateral()
+    )
+    previous_data = aliased(EnvironmentData, previous)
+    return db.execute(select(previous_data).select_from(bounds).join(previous, true())).scalars().all()
+
 def get_environment_data_by_mine(
     db: Session, 
     mine_id: int, 
     skip: int = 0, 
-    limit: int = 100
+    limit: int = 100,
+    after: Optional[tuple] = None
 ) -> List[EnvironmentData]:
     """获取指定煤矿的环境数据"""
-    return db.query(EnvironmentData).join(MonitoringPoint).filter(
+    return paginate(db.query(EnvironmentData).join(MonitoringPoint).filter(
         MonitoringPoint.mine_id == mine_id
-    ).order_by(EnvironmentData.recorded_at.desc()).offset(skip).limit(limit).all()
+    ), ENVIRONMENT_DATA_ORDER, skip, limit, after)
 
 def get_environment_data_by_time_range(
     db: Session, 
@@ -45,6 +115,7 @@ def get_environment_data_by_time_range(
     end_time: datetime
 ) -> List[EnvironmentData]:
     """获取指定时间范围内的环境数据"""
+    # recorded_at 上下界使分区表只扫描命中的分区
     return db.query(EnvironmentData).filter(
         and_(
             EnvironmentData.monitoring_point_id == monitoring_point_id,
@@ -53,14 +124,142 @@ def get_environment_data_by_time_range(
         )
     ).order_by(EnvironmentData.recorded_at.asc()).all()
 
+EXPORT_COLUMNS = ("id", "monitoring_point_id", "recorded_at") + ENVIRONMENT_FIELDS + (
+    "ventilation_status", "emergency_system_status"
+)
+
+def iter_environment_data_export(
+    db: Session,
+    columns: Sequence[str] = EXPORT_COLUMNS,
+    mine_id: Optional[int] = None,
+    monitoring_point_ids: Optional[List[int]] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    chunk_size: int = 5000
+) -> Iterator[tuple]:
+    """
+    按 (recorded_at, id) 顺序逐行导出环境数据
+    使用服务端游标（stream_results + yield_per），内存占用与导出范围无关；调用方需在迭代期间保持会话打开
+    """
+    query = select(*[getattr(EnvironmentData, column) for column in columns])
+    if mine_id is not None:
+        point_ids = select(MonitoringPoint.id).where(MonitoringPoint.mine_id == mine_id)
+        query = query.where(EnvironmentData.monitoring_point_id.in_(point_ids))
+    if monitoring_point_ids:
+        query = query.where(EnvironmentData.monitoring_point_id.in_(monitoring_point_ids))
+    if start_time is not None:
+        query = query.where(EnvironmentData.recorded_at >= start_time)
+    if end_time is not None:
+        query = query.where(EnvironmentData.recorded_at <= end_time)
+    query = query.order_by(EnvironmentData.recorded_at.asc(), EnvironmentData.id.asc())
+
+    result = db.execute(query.execution_options(stream_results=True, yield_per=chunk_size))
+    try:
+        for row in result:
+            yield tuple(row)
+    finally:
+        result.close()
+
 def create_environment_data(db: Session, data: EnvironmentDataCreate) -> EnvironmentData:
     """创建新的环境数据"""
-    db_data = EnvironmentData(**data.dict())
+    values = data.dict()
+    # 未提供采集时间时使用数据库默认值
+    if values.get("recorded_at") is None:
+        values.pop("recorded_at", None)
+    db_data = EnvironmentData(**values)
     db.add(db_data)
+    db.flush()
+    # 延迟导入：ingest 依赖 crud 包
+    from app.services import ingest
+    ingest.process_ingested_readings(db, [{
+        "monitoring_point_id": db_data.monitoring_point_id,
+        "recorded_at": db_data.recorded_at,
+        **{field: getattr(db_data, field) for field in ENVIRONMENT_FIELDS},
+    }])
+    recent_reading_store.mark_stale(db, recent_reading_store.late_points([db_data]))
     db.commit()
     db.refresh(db_data)
+    latest_reading_cache.put(EnvironmentDataSchema.model_validate(db_data))
+    recent_reading_store.append_many([db_data])
     return db_data
 
+def insert_environment_data_batch(db: Session, items: List[EnvironmentDataCreate]) -> Tuple[dict, List[dict]]:
+    """
+    一次校验监控点、在当前事务内多行插入，不提交
+    返回 (逐行结果, 已插入的行)，行为带 id 和 recorded_at 的字段字典
+    """
+    # 一次查询校验所有监控点
+    point_ids = {item.monitoring_point_id for item in items}
+    existing_point_ids = set()
+    if point_ids:
+        existing_point_ids = {
+            row[0] for row in db.query(MonitoringPoint.id).filter(MonitoringPoint.id.in_(point_ids)).all()
+        }
+
+    results = [None] * len(items)
+    rows = []
+    row_indexes = []
+    now = datetime.now(timezone.utc)
+    for index, item in enumerate(items):
+        if item.monitoring_point_id not in existing_point_ids:
+            results[index] = {
+                "index": index,
+                "status": "rejected",
+                "id": None,
+                "error": "Monitoring point not found"
+            }
+            continue
+        values = item.dict()
+        if values.get("recorded_at") is None:
+            values["recorded_at"] = now
+        rows.append(values)
+        row_indexes.append(index)
+
+    inserted_rows = []
+    if rows:
+        # executemany + RETURNING 会被合并为多行 INSERT ... VALUES 语句
+        inserted = db.execute(
+            insert(EnvironmentData).returning(
+                EnvironmentData.id, EnvironmentData.recorded_at, sort_by_parameter_order=True
+            ),
+            rows
+        ).all()
+        inserted_rows = [{**values, "id": row.id, "recorded_at": row.recorded_at} for values, row in zip(rows, inserted)]
+        for index, row in zip(row_indexes, inserted):
+            results[index] = {"index": index, "status": "created", "id": row.id, "error": None}
+
+    return {
+        "total": len(items),
+        "created": len(rows),
+        "rejected": len(items) - len(rows),
+        "results": results
+    }, inserted_rows
+
+def commit_environment_data_batch(db: Session, rows: List[dict]) -> None:
+    """提交 insert_environment_data_batch 插入的行，并写入最新读数缓存和最近读数缓冲"""
+    # 补传的旧读数其他进程增量同步不到，通知其丢弃缓冲
+    recent_reading_store.mark_stale(db, recent_reading_store.late_points(rows))
+    db.commit()
+    if not rows:
+        return
+    # 每个监控点只把本批最新的一行写入缓存
+    newest = {}
+    for row in rows:
+        current = newest.get(row["monitoring_point_id"])
+        if current is None or row["recorded_at"] >= current["recorded_at"]:
+            newest[row["monitoring_point_id"]] = row
+    latest_reading_cache.put_many(EnvironmentDataSchema(**row) for row in newest.values())
+    recent_reading_store.append_many(rows)
+
+def create_environment_data_batch(db: Session, items: List[EnvironmentDataCreate]) -> dict:
+    """批量创建环境数据，一次校验监控点、一个事务内多行插入并评估报警，返回逐行结果"""
+    result, rows = insert_environment_data_batch(db, items)
+    if rows:
+        from app.services import ingest
+        ingest.process_ingested_readings(db, rows)
+        commit_environment_data_batch(db, rows)
+    return result
+
 def update_environment_data(db: Session, data_id: int, data_update: EnvironmentDataUpdate) -> Optional[EnvironmentData]:
     """更新环境数据"""
     db_data = get_environment_data(db, data_id)
@@ -71,8 +270,13 @@ def update_environment_data(db: Session, data_id: int, data_update: EnvironmentD
     for field, value in update_data.items():
         setattr(db_data, field, value)
     
+    db.flush()
+    refresh_rollup_bucket(db, db_data.monitoring_point_id, db_data.recorded_at)
+    recent_reading_store.mark_stale(db, [db_data.monitoring_point_id])
     db.commit()
     db.refresh(db_data)
+    latest_reading_cache.refresh_record(EnvironmentDataSchema.model_validate(db_data))
+    recent_reading_store.refresh_record(db_data)
     return db_data
 
 def delete_environment_data(db: Session, data_id: int) -> bool:
@@ -81,100 +285,265 @@ def delete_environment_data(db: Session, data_id: int) -> bool:
     if not db_data:
         return False
     
+    monitoring_point_id = db_data.monitoring_point_id
+    recorded_at = db_data.recorded_at
     db.delete(db_data)
+    db.flush()
+    refresh_rollup_bucket(db, monitoring_point_id, recorded_at)
+    recent_reading_store.mark_stale(db, [monitoring_point_id])
     db.commit()
+    latest_reading_cache.invalidate_record(monitoring_point_id, data_id)
+    recent_reading_store.remove_record(monitoring_point_id, data_id)
     return True
 
-def get_environment_data_statistics(
-    db: Session, 
-    monitoring_point_id: int, 
-    hours: int = 24
-) -> dict:
-    """获取环境数据统计信息"""
-    start_time = datetime.utcnow() - timedelta(hours=hours)
-    
-    # 获取指定时间范围内的数据
-    data_list = get_environment_data_by_time_range(db, monitoring_point_id, start_time, datetime.utcnow())
-    
-    if not data_list:
+def _format_statistics(row, start_time: datetime, end_time: datetime, percentiles: bool = False) -> dict:
+    """把聚合结果行整理成按字段分组的统计信息"""
+    if not row or not row["count"]:
         return {}
-    
-    # 计算统计数据
+
     stats = {
-        "count": len(data_list),
+        "count": row["count"],
         "time_range": {
             "start": start_time,
-            "end": datetime.utcnow()
+            "end": end_time
         }
     }
-    
-    # 计算各字段的统计信息
-    fields = [
-        "methane_concentration", "carbon_monoxide", "carbon_dioxide", 
-        "oxygen_concentration", "hydrogen_sulfide", "temperature", 
-        "humidity", "pressure", "air_flow", "dust_concentration"
-    ]
-    
-    for field in fields:
-        values = [getattr(data, field) for data in data_list if getattr(data, field) is not None]
-        if values:
+
+    for field in ENVIRONMENT_FIELDS:
+        count = row[f"{field}_count"]
+        if count:
             stats[field] = {
-                "min": min(values),
-                "max": max(values),
-                "avg": sum(values) / len(values),
-                "count": len(values)
+                "min": row[f"{field}_min"],
+                "max": row[f"{field}_max"],
+                "avg": row[f"{field}_avg"],
+                "count": count,
+                "stddev": row[f"{field}_stddev"]
             }
-    
+            if percentiles:
+                stats[field]["p50"] = row[f"{field}_p50"]
+                stats[field]["p95"] = row[f"{field}_p95"]
+
     return stats
 
-def get_environment_alerts(db: Session, monitoring_point_id: int) -> List[EnvironmentData]:
-    """获取环境异常数据（超过阈值的）"""
-    # 这里可以根据具体的阈值来判断异常
-    # 例如：甲烷浓度超过1%，温度超过40度等
-    return db.query(EnvironmentData).filter(
-        and_(
-            EnvironmentData.monitoring_point_id == monitoring_point_id,
-            or_(
-                EnvironmentData.methane_concentration > 1.0,  # 甲烷浓度超过1%
-                EnvironmentData.temperature > 40.0,  # 温度超过40度
-                EnvironmentData.oxygen_concentration < 19.5,  # 氧气浓度低于19.5%
-                EnvironmentData.carbon_monoxide > 50.0  # 一氧化碳超过50ppm
-            )
+def _recent_window(db: Session, monitoring_point_id: int, start_time: datetime, end_time: datetime) -> Optional[Window]:
+    """时间窗在最近读数缓冲的覆盖范围内时从缓冲取数据，否则返回 None"""
+    if not settings.RECENT_STORE_ENABLED:
+        return None
+    return recent_reading_store.window(db, monitoring_point_id, start_time, end_time)
+
+def _window_statistics(window: Window, percentiles: bool = False) -> dict:
+    """按聚合 SQL 的列名计算缓冲中读数的统计行"""
+    row = {"count": len(window.recorded_at)}
+    for index, field in enumerate(ENVIRONMENT_FIELDS):
+        column = window.values[:, index]
+        column = column[~np.isnan(column)]
+        row[f"{field}_count"] = len(column)
+        if not len(column):
+            continue
+        row[f"{field}_min"] = float(column.min())
+        row[f"{field}_max"] = float(column.max())
+        row[f"{field}_avg"] = float(column.mean())
+        row[f"{field}_stddev"] = float(column.std(ddof=1)) if len(column) > 1 else None
+        if percentiles:
+            # 线性插值，与 percentile_cont 一致
+            row[f"{field}_p50"] = float(np.percentile(column, 50))
+            row[f"{field}_p95"] = float(np.percentile(column, 95))
+    return row
+
+def _window_trends(window: Window, field: str, resolution: Optional[int] = None) -> List[dict]:
+    """用缓冲中的读数计算趋势，格式与数据库查询一致"""
+    column = window.values[:, ENVIRONMENT_FIELDS.index(field)]
+    measured = ~np.isnan(column)
+    recorded_at, column = window.recorded_at[measured], column[measured]
+    if not resolution:
+        return [
+            {"timestamp": datetime.fromtimestamp(timestamp, tz=timezone.utc), "value": value}
+            for timestamp, value in zip(recorded_at.tolist(), column.tolist())
+        ]
+    if not len(column):
+        return []
+    # 读数按时间升序，同一桶的行是连续的
+    buckets, starts, counts = np.unique(np.floor(recorded_at / resolution) * resolution, return_index=True, return_counts=True)
+    totals = np.add.reduceat(column, starts)
+    minimums = np.minimum.reduceat(column, starts)
+    maximums = np.maximum.reduceat(column, starts)
+    return [
+        {
+            "timestamp": datetime.fromtimestamp(bucket, tz=timezone.utc),
+            "value": total / count,
+            "min": minimum,
+            "max": maximum,
+            "count": count
+        }
+        for bucket, total, minimum, maximum, count in zip(
+            buckets.tolist(), totals.tolist(), minimums.tolist(), maximums.tolist(), counts.tolist()
         )
-    ).order_by(EnvironmentData.recorded_at.desc()).all()
+    ]
+
+def get_environment_data_statistics(
+    db: Session, 
+    monitoring_point_id: int, 
+    hours: int = 24,
+    percentiles: bool = False
+) -> dict:
+    """
+    获取环境数据统计信息
+    时间窗在最近读数缓冲内时直接在内存中计算；
+    否则 count/min/max/avg/stddev 优先读汇总表，分位数无法由汇总表合成，需要时用单条聚合 SQL 扫描原始数据
+    """
+    end_time = datetime.utcnow()
+    start_time = end_time - timedelta(hours=hours)
+
+    window = _recent_window(db, monitoring_point_id, start_time, end_time)
+    if window is not None:
+        row = _window_statistics(window, percentiles)
+    elif not percentiles:
+        row = aggregate_statistics(db, [monitoring_point_id], start_time, end_time).get(monitoring_point_id)
+    else:
+        columns = [func.count().label("count")]
+        for field in ENVIRONMENT_FIELDS:
+            column = getattr(EnvironmentData, field)
+            columns += [
+                func.min(column).label(f"{field}_min"),
+                func.max(column).label(f"{field}_max"),
+                func.avg(column).label(f"{field}_avg"),
+                func.count(column).label(f"{field}_count"),
+                func.stddev_samp(column).label(f"{field}_stddev"),
+                func.percentile_cont(0.5).within_group(column).label(f"{field}_p50"),
+                func.percentile_cont(0.95).within_group(column).label(f"{field}_p95")
+            ]
+
+        row = db.query(*columns).filter(
+            and_(
+                EnvironmentData.monitoring_point_id == monitoring_point_id,
+                EnvironmentData.recorded_at >= start_time,
+                EnvironmentData.recorded_at <= end_time
+            )
+        ).one()._mapping
+
+    return _format_statistics(row, start_time, end_time, percentiles)
+
+def get_mine_environment_summary(
+    db: Session,
+    mine_id: int,
+    hours: int = 24,
+    monitoring_point_ids: Optional[List[int]] = None
+) -> Optional[dict]:
+    """获取煤矿环境数据汇总（所有监控点一条 GROUP BY monitoring_point_id 聚合），煤矿没有监控点时返回 None"""
+    query = db.query(MonitoringPoint.id, MonitoringPoint.name, MonitoringPoint.location).filter(
+        MonitoringPoint.mine_id == mine_id
+    )
+    if monitoring_point_ids:
+        query = query.filter(MonitoringPoint.id.in_(monitoring_point_ids))
+    monitoring_points = query.order_by(MonitoringPoint.id).all()
+    if not monitoring_points:
+        return None
+
+    end_time = datetime.utcnow()
+    start_time = end_time - timedelta(hours=hours)
+    rows = aggregate_statistics(db, [point.id for point in monitoring_points], start_time, end_time)
+
+    return {
+        "mine_id": mine_id,
+        "monitoring_points_count": len(monitoring_points),
+        "time_range_hours": hours,
+        "monitoring_points": [
+            {
+                "monitoring_point_id": point.id,
+                "name": point.name,
+                "location": point.location,
+                "statistics": _format_statistics(rows.get(point.id), start_time, end_time)
+            }
+            for point in monitoring_points
+        ]
+    }
+
+def get_environment_alerts(
+    db: Session, monitoring_point_id: int, hours: Optional[int] = None, limit: int = 100
+) -> List[EnvironmentData]:
+    """获取超过阈值规则的环境数据，条件取自该监控点当前生效的阈值规则"""
+    conditions = []
+    for (rule_type, field), rules in threshold_rule_engine.rules_for_point(monitoring_point_id).items():
+        if rule_type != RuleType.THRESHOLD:
+            continue
+        column = getattr(EnvironmentData, field)
+        for rule in rules:
+            if rule.max_value is not None:
+                conditions.append(column > rule.max_value)
+            if rule.min_value is not None:
+                conditions.append(column < rule.min_value)
+    if not conditions:
+        return []
+
+    query = db.query(EnvironmentData).filter(
+        and_(EnvironmentData.monitoring_point_id == monitoring_point_id, or_(*conditions))
+    )
+    if hours is not None:
+        query = query.filter(EnvironmentData.recorded_at >= datetime.now(timezone.utc) - timedelta(hours=hours))
+    return query.order_by(EnvironmentData.recorded_at.desc()).limit(limit).all()
 
 def get_environment_data_trends(
     db: Session, 
     monitoring_point_id: int, 
     field: str, 
-    hours: int = 24
+    hours: int = 24,
+    resolution: Optional[int] = None,
+    max_points: Optional[int] = None
 ) -> List[dict]:
-    """获取环境数据趋势"""
-    start_time = datetime.utcnow() - timedelta(hours=hours)
-    
-    data_list = get_environment_data_by_time_range(db, monitoring_point_id, start_time, datetime.utcnow())
-    
-    trends = []
-    for data in data_list:
-        value = getattr(data, field)
-        if value is not None:
-            trends.append({
-                "timestamp": data.recorded_at,
-                "value": value
-            })
-    
+    """
+    获取环境数据趋势
+    resolution 为分桶秒数，在 SQL 中按桶聚合 avg/min/max（整分钟/整小时的桶直接读汇总表）；
+    时间窗在最近读数缓冲内时直接在内存中计算。
+    max_points 限制返回点数，超出时用 LTTB 降采样保留曲线形状
+    """
+    end_time = datetime.utcnow()
+    start_time = end_time - timedelta(hours=hours)
+    column = getattr(EnvironmentData, field)
+    filters = and_(
+        EnvironmentData.monitoring_point_id == monitoring_point_id,
+        EnvironmentData.recorded_at >= start_time,
+        EnvironmentData.recorded_at <= end_time,
+        column.isnot(None)
+    )
+
+    window = _recent_window(db, monitoring_point_id, start_time, end_time)
+    if window is not None:
+        trends = _window_trends(window, field, resolution)
+    elif resolution:
+        # 能整除 resolution 的整桶部分读汇总表，其余读原始数据
+        trends = aggregate_trend_buckets(db, monitoring_point_id, field, start_time, end_time, resolution)
+    else:
+        # 只查询时间和目标字段两列，不构造完整 ORM 对象
+        rows = db.query(EnvironmentData.recorded_at, column).filter(filters).order_by(
+            EnvironmentData.recorded_at.asc()
+        ).all()
+        trends = [{"timestamp": recorded_at, "value": value} for recorded_at, value in rows]
+
+    if max_points and len(trends) > max_points:
+        indexes = largest_triangle_three_buckets(
+            [(item["timestamp"].timestamp(), item["value"]) for item in trends], max_points
+        )
+        trends = [trends[i] for i in indexes]
+
     return trends
 
 class CRUDEnvironmentData:
     get_environment_data = staticmethod(get_environment_data)
     get_environment_data_by_monitoring_point = staticmethod(get_environment_data_by_monitoring_point)
     get_latest_environment_data = staticmethod(get_latest_environment_data)
+    get_latest_environment_data_cached = staticmethod(get_latest_environment_data_cached)
+    get_latest_environment_data_by_mine = staticmethod(get_latest_environment_data_by_mine)
     get_environment_data_by_mine = staticmethod(get_environment_data_by_mine)
     get_environment_data_by_time_range = staticmethod(get_environment_data_by_time_range)
+    iter_environment_data_export = staticmethod(iter_environment_data_export)
     create_environment_data = staticmethod(create_environment_data)
+    insert_environment_data_batch = staticmethod(insert_environment_data_batch)
+    commit_environment_data_batch = staticmethod(commit_environment_data_batch)
+    create_environment_data_batch = staticmethod(create_environment_data_batch)
     update_environment_data = staticmethod(update_environment_data)
     delete_environment_data = staticmethod(delete_environment_data)
     get_environment_data_statistics = staticmethod(get_environment_data_statistics)
+    get_mine_environment_summary = staticmethod(get_mine_environment_summary)
     get_environment_alerts = staticmethod(get_environment_alerts)
     get_environment_data_trends = staticmethod(get_environment_data_trends)
 
@@ -0,0 +1,348 @@
+import math
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, literal, select, text, union_all
+from app.core.config import settings
+from app.models.environment_data import EnvironmentData, ENVIRONMENT_FIELDS
+from app.models.environment_rollup import EnvironmentRollupMinute, EnvironmentRollupHour, RollupWatermark
+
+WATERMARK_NAME = "environment_data"
+
+# 从粗到细
+ROLLUP_LEVELS = (EnvironmentRollupHour, EnvironmentRollupMinute)
+
+STAT_COLUMNS = ["sample_count"] + [
+    f"{field}_{stat}" for field in ENVIRONMENT_FIELDS for stat in ("count", "sum", "min", "max", "sumsq")
+]
+
+def bucket_sql(column: str, seconds: int) -> str:
+    return f"to_timestamp(floor(extract(epoch FROM {column}) / {seconds}) * {seconds})"
+
+def minute_upsert_sql(touched_sql: str) -> str:
+    """按受影响的分钟桶从原始数据整桶重算（幂等，可安全重复执行）"""
+    aggregates = ["count(*)"]
+    for field in ENVIRONMENT_FIELDS:
+        aggregates += [
+            f"count(e.{field})", f"sum(e.{field})", f"min(e.{field})",
+            f"max(e.{field})", f"sum(e.{field} * e.{field})"
+        ]
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in STAT_COLUMNS)
+    return f"""
+        WITH touched AS ({touched_sql})
+        INSERT INTO environment_rollup_1m (monitoring_point_id, bucket_start, {", ".join(STAT_COLUMNS)}, updated_at)
+        SELECT e.monitoring_point_id, t.bucket_start, {", ".join(aggregates)}, now()
+        FROM touched t
+        JOIN environment_data e ON e.monitoring_point_id = t.monitoring_point_id
+            AND e.recorded_at >= t.bucket_start AND e.recorded_at < t.bucket_start + interval '60 seconds'
+        GROUP BY e.monitoring_point_id, t.bucket_start
+        ON CONFLICT (monitoring_point_id, bucket_start) DO UPDATE SET {updates}, updated_at = now()
+    """
+
+def hour_upsert_sql(touched_sql: str) -> str:
+    """按受影响的小时桶从分钟汇总重算"""
+    aggregates = ["sum(m.sample_count)"]
+    for field in ENVIRONMENT_FIELDS:
+        aggregates += [
+            f"sum(m.{field}_count)", f"sum(m.{field}_sum)", f"min(m.{field}_min)",
+            f"max(m.{field}_max)", f"sum(m.{field}_sumsq)"
+        ]
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in STAT_COLUMNS)
+    return f"""
+        WITH touched AS ({touched_sql})
+        INSERT INTO environment_rollup_1h (monitoring_point_id, bucket_start, {", ".join(STAT_COLUMNS)}, updated_at)
+        SELECT m.monitoring_point_id, t.bucket_start, {", ".join(aggregates)}, now()
+        FROM touched t
+        JOIN environment_rollup_1m m ON m.monitoring_point_id = t.monitoring_point_id
+            AND m.bucket_start >= t.bucket_start AND m.bucket_start < t.bucket_start + interval '3600 seconds'
+        GROUP BY m.monitoring_point_id, t.bucket_start
+        ON CONFLICT (monitoring_point_id, bucket_start) DO UPDATE SET {updates}, updated_at = now()
+    """
+
+def not_compacted_sql(point_column: str, time_column: str) -> str:
+    """排除已被保留策略汇总并清理的时间段，迟到数据不能用残缺的原始数据覆盖已有汇总"""
+    return (
+        "NOT EXISTS (SELECT 1 FROM monitoring_points mp "
+        "JOIN retention_progress rp ON rp.mine_id = mp.mine_id "
+        f"WHERE mp.id = {point_column} AND {time_column} < rp.raw_compacted_before)"
+    )
+
+def _touched_by_ids_sql(seconds: int) -> str:
+    return (
+        f"SELECT DISTINCT monitoring_point_id, {bucket_sql('recorded_at', seconds)} AS bucket_start "
+        "FROM environment_data WHERE id > :start_id AND id <= :end_id "
+        f"AND {not_compacted_sql('environment_data.monitoring_point_id', 'environment_data.recorded_at')}"
+    )
+
+def _touched_single_sql(seconds: int) -> str:
+    return (
+        f"SELECT CAST(:monitoring_point_id AS integer) AS monitoring_point_id, "
+        f"{bucket_sql('CAST(:recorded_at AS timestamptz)', seconds)} AS bucket_start "
+        f"WHERE {not_compacted_sql('CAST(:monitoring_point_id AS integer)', 'CAST(:recorded_at AS timestamptz)')}"
+    )
+
+MINUTE_UPSERT_BY_IDS = text(minute_upsert_sql(_touched_by_ids_sql(60)))
+HOUR_UPSERT_BY_IDS = text(hour_upsert_sql(_touched_by_ids_sql(3600)))
+MINUTE_UPSERT_SINGLE = text(minute_upsert_sql(_touched_single_sql(60)))
+HOUR_UPSERT_SINGLE = text(hour_upsert_sql(_touched_single_sql(3600)))
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+def _floor(value: datetime, seconds: int) -> datetime:
+    return datetime.fromtimestamp(math.floor(value.timestamp() / seconds) * seconds, tz=timezone.utc)
+
+def _ceil(value: datetime, seconds: int) -> datetime:
+    return datetime.fromtimestamp(math.ceil(value.timestamp() / seconds) * seconds, tz=timezone.utc)
+
+def get_covered_until(db: Session) -> Optional[datetime]:
+    """汇总表完整覆盖到的时间点"""
+    return db.query(RollupWatermark.covered_until).filter(RollupWatermark.name == WATERMARK_NAME).scalar()
+
+def refresh_environment_rollups(db: Session, max_batches: Optional[int] = None) -> dict:
+    """
+    从水位线开始增量刷新 1 分钟 / 1 小时汇总
+    新写入行（包括时间戳落在过去的迟到数据）所在的桶会被整桶重算，因此迟到数据会重新打开并更新对应桶。
+    每次先回看 ENVIRONMENT_ROLLUP_OVERLAP_IDS 个 id，覆盖上次运行时仍未提交的事务。
+    """
+    started_at = datetime.now(timezone.utc)
+    batch_size = settings.ENVIRONMENT_ROLLUP_BATCH_SIZE
+    totals = {"batches": 0, "rows": 0, "minute_buckets": 0, "hour_buckets": 0, "last_id": None}
+
+    while max_batches is None or totals["batches"] < max_batches:
+        db.execute(text(
+            "INSERT INTO rollup_watermarks (name, last_id) VALUES (:name, 0) ON CONFLICT (name) DO NOTHING"
+        ), {"name": WATERMARK_NAME})
+        # 行锁保证多个 worker 不会并发刷新
+        watermark = db.execute(text(
+            "SELECT last_id, covered_until FROM rollup_watermarks WHERE name = :name FOR UPDATE"
+        ), {"name": WATERMARK_NAME}).one()
+
+        start_id = watermark.last_id
+        if totals["batches"] == 0:
+            start_id = max(0, start_id - settings.ENVIRONMENT_ROLLUP_OVERLAP_IDS)
+        end_id, rows = db.execute(text(
+            "SELECT max(id), count(*) FROM "
+            "(SELECT id FROM environment_data WHERE id > :start_id ORDER BY id LIMIT :limit) s"
+        ), {"start_id": start_id, "limit": batch_size}).one()
+
+        caught_up = rows < batch_size
+        if rows:
+            params = {"start_id": start_id, "end_id": end_id}
+            totals["minute_buckets"] += db.execute(MINUTE_UPSERT_BY_IDS, params).rowcount
+            totals["hour_buckets"] += db.execute(HOUR_UPSERT_BY_IDS, params).rowcount
+            totals["rows"] += rows
+
+        covered_until = watermark.covered_until
+        if caught_up:
+            horizon = _floor(started_at - timedelta(seconds=settings.ENVIRONMENT_ROLLUP_LAG_SECONDS), 60)
+            if covered_until is None or horizon > covered_until:
+                covered_until = horizon
+        last_id = max(watermark.last_id, end_id or 0)
+        db.execute(text(
+            "UPDATE rollup_watermarks SET last_id = :last_id, covered_until = :covered_until, updated_at = now() "
+            "WHERE name = :name"
+        ), {"last_id": last_id, "covered_until": covered_until, "name": WATERMARK_NAME})
+        db.commit()
+
+        totals["batches"] += 1
+        totals["last_id"] = last_id
+        if caught_up:
+            break
+
+    return totals
+
+def refresh_rollup_bucket(db: Session, monitoring_point_id: int, recorded_at: datetime) -> None:
+    """原始数据被修改或删除后重算其所在的分钟桶和小时桶（不提交）"""
+    params = {"monitoring_point_id": monitoring_point_id, "recorded_at": recorded_at}
+    for model, upsert in ((EnvironmentRollupMinute, MINUTE_UPSERT_SINGLE), (EnvironmentRollupHour, HOUR_UPSERT_SINGLE)):
+        # 桶内数据可能已全部删除，先删再重算
+        db.execute(text(
+            f"DELETE FROM {model.__tablename__} WHERE monitoring_point_id = :monitoring_point_id "
+            f"AND bucket_start = {bucket_sql('CAST(:recorded_at AS timestamptz)', model.bucket_seconds)} "
+            f"AND {not_compacted_sql('CAST(:monitoring_point_id AS integer)', 'CAST(:recorded_at AS timestamptz)')}"
+        ), params)
+        db.execute(upsert, params)
+
+def _plan_ranges(start: datetime, end: datetime, limit: datetime, levels) -> List[Tuple[Optional[type], datetime, datetime]]:
+    """把 [start, end) 切分为 (汇总级别, 起, 止)，只有 limit 之前的完整桶走汇总表，级别为 None 表示原始数据"""
+    if start >= end:
+        return []
+    if not levels:
+        return [(None, start, end)]
+    level, finer = levels[0], levels[1:]
+    aligned_start = _ceil(start, level.bucket_seconds)
+    aligned_end = _floor(min(end, limit), level.bucket_seconds)
+    if aligned_start >= aligned_end:
+        return _plan_ranges(start, end, limit, finer)
+    return (
+        _plan_ranges(start, aligned_start, aligned_start, finer)
+        + [(level, aligned_start, aligned_end)]
+        + _plan_ranges(aligned_end, end, limit, finer)
+    )
+
+def plan_ranges(db: Session, start: datetime, end: datetime, levels=ROLLUP_LEVELS) -> list:
+    """选择能满足查询的最粗汇总级别，未汇总的部分回落到原始数据；end 为闭区间"""
+    start = _utc(start)
+    end = _utc(end) + timedelta(microseconds=1)
+    covered_until = get_covered_until(db) if settings.ENVIRONMENT_ROLLUP_ENABLED else None
+    if covered_until is None:
+        return [(None, start, end)]
+    return _plan_ranges(start, end, covered_until, list(levels))
+
+def aggregate_statistics(
+    db: Session,
+    monitoring_point_ids: List[int],
+    start_time: datetime,
+    end_time: datetime
+) -> Dict[int, dict]:
+    """
+    按监控点汇总统计（count/min/max/avg/stddev），返回 {monitoring_point_id: 统计行}
+    整小时/整分钟部分读汇总表，其余部分读原始数据，全部在一条 UNION ALL 聚合 SQL 中完成
+    """
+    if not monitoring_point_ids:
+        return {}
+
+    parts = []
+    for level, range_start, range_end in plan_ranges(db, start_time, end_time):
+        if level is None:
+            columns = [EnvironmentData.monitoring_point_id.label("monitoring_point_id"), func.count().label("sample_count")]
+            for field in ENVIRONMENT_FIELDS:
+                column = getattr(EnvironmentData, field)
+                columns += [
+                    func.count(column).label(f"{field}_count"),
+                    func.sum(column).label(f"{field}_sum"),
+                    func.min(column).label(f"{field}_min"),
+                    func.max(column).label(f"{field}_max"),
+                    func.sum(column * column).label(f"{field}_sumsq")
+                ]
+            parts.append(select(*columns).where(and_(
+                EnvironmentData.monitoring_point_id.in_(monitoring_point_ids),
+                EnvironmentData.recorded_at >= range_start,
+                EnvironmentData.recorded_at < range_end
+            )).group_by(EnvironmentData.monitoring_point_id))
+        else:
+            columns = [level.monitoring_point_id.label("monitoring_point_id"),
+                       func.sum(level.sample_count).label("sample_count")]
+            for field in ENVIRONMENT_FIELDS:
+                columns += [
+                    func.sum(getattr(level, f"{field}_count")).label(f"{field}_count"),
+                    func.sum(getattr(level, f"{field}_sum")).label(f"{field}_sum"),
+                    func.min(getattr(level, f"{field}_min")).label(f"{field}_min"),
+                    func.max(getattr(level, f"{field}_max")).label(f"{field}_max"),
+                    func.sum(getattr(level, f"{field}_sumsq")).label(f"{field}_sumsq")
+                ]
+            parts.append(select(*columns).where(and_(
+                level.monitoring_point_id.in_(monitoring_point_ids),
+                level.bucket_start >= range_start,
+                level.bucket_start < range_end
+            )).group_by(level.monitoring_point_id))
+
+    combined = union_all(*parts).subquery() if len(parts) > 1 else parts[0].subquery()
+    columns = [combined.c.monitoring_point_id, func.sum(combined.c.sample_count).label("sample_count")]
+    for field in ENVIRONMENT_FIELDS:
+        columns += [
+            func.sum(combined.c[f"{field}_count"]).label(f"{field}_count"),
+            func.sum(combined.c[f"{field}_sum"]).label(f"{field}_sum"),
+            func.min(combined.c[f"{field}_min"]).label(f"{field}_min"),
+            func.max(combined.c[f"{field}_max"]).label(f"{field}_max"),
+            func.sum(combined.c[f"{field}_sumsq"]).label(f"{field}_sumsq")
+        ]
+    rows = db.execute(select(*columns).group_by(combined.c.monitoring_point_id)).all()
+
+    results = {}
+    for row in rows:
+        row = row._mapping
+        stats = {"count": int(row["sample_count"] or 0)}
+        for field in ENVIRONMENT_FIELDS:
+            count = int(row[f"{field}_count"] or 0)
+            total = row[f"{field}_sum"]
+            sumsq = row[f"{field}_sumsq"]
+            stddev = None
+            if count > 1:
+                variance = (sumsq - total * total / count) / (count - 1)
+                stddev = math.sqrt(max(variance, 0.0))
+            stats[f"{field}_count"] = count
+            stats[f"{field}_min"] = row[f"{field}_min"]
+            stats[f"{field}_max"] = row[f"{field}_max"]
+            stats[f"{field}_avg"] = total / count if count else None
+            stats[f"{field}_stddev"] = stddev
+        results[row["monitoring_point_id"]] = stats
+    return results
+
+def aggregate_trend_buckets(
+    db: Session,
+    monitoring_point_id: int,
+    field: str,
+    start_time: datetime,
+    end_time: datetime,
+    resolution: int
+) -> List[dict]:
+    """按 resolution 秒分桶的 avg/min/max/count，整桶部分读能整除 resolution 的最粗汇总表"""
+    levels = [level for level in ROLLUP_LEVELS if resolution % level.bucket_seconds == 0]
+    column = getattr(EnvironmentData, field)
+
+    parts = []
+    for level, range_start, range_end in plan_ranges(db, start_time, end_time, levels):
+        if level is None:
+            parts.append(select(
+                EnvironmentData.recorded_at.label("ts"),
+                literal(1).label("n"),
+                column.label("s"),
+                column.label("mn"),
+                column.label("mx")
+            ).where(and_(
+                EnvironmentData.monitoring_point_id == monitoring_point_id,
+                EnvironmentData.recorded_at >= range_start,
+                EnvironmentData.recorded_at < range_end,
+                column.isnot(None)
+            )))
+        else:
+            count_column = getattr(level, f"{field}_count")
+            parts.append(select(
+                level.bucket_start.label("ts"),
+                count_column.label("n"),
+                getattr(level, f"{field}_sum").label("s"),
+                getattr(level, f"{field}_min").label("mn"),
+                getattr(level, f"{field}_max").label("mx")
+            ).where(and_(
+                level.monitoring_point_id == monitoring_point_id,
+                level.bucket_start >= range_start,
+                level.bucket_start < range_end,
+                count_column > 0
+            )))
+
+    combined = union_all(*parts).subquery() if len(parts) > 1 else parts[0].subquery()
+    epoch = func.extract("epoch", combined.c.ts)
+    samples = select(
+        func.to_timestamp(func.floor(epoch / resolution) * resolution).label("bucket"),
+        combined.c.n, combined.c.s, combined.c.mn, combined.c.mx
+    ).subquery()
+    rows = db.execute(select(
+        samples.c.bucket,
+        func.sum(samples.c.n).label("count"),
+        func.sum(samples.c.s).label("total"),
+        func.min(samples.c.mn).label("min"),
+        func.max(samples.c.mx).label("max")
+    ).group_by(samples.c.bucket).order_by(samples.c.bucket)).all()
+
+    return [
+        {
+            "timestamp": row.bucket,
+            "value": row.total / row.count,
+            "min": row.min,
+            "max": row.max,
+            "count": int(row.count)
+        }
+        for row in rows if row.count
+    ]
+
+class CRUDEnvironmentRollup:
+    get_covered_until = staticmethod(get_covered_until)
+    refresh_environment_rollups = staticmethod(refresh_environment_rollups)
+    refresh_rollup_bucket = staticmethod(refresh_rollup_bucket)
+    plan_ranges = staticmethod(plan_ranges)
+    aggregate_statistics = staticmethod(aggregate_statistics)
+    aggregate_trend_buckets = staticmethod(aggregate_trend_buckets)
+
+crud_environment_rollup = CRUDEnvironmentRollup()
@@ -3,6 +3,7 @@ from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, func
 from app.models.equipment import Equipment
+from app.core.pagination import paginate
 from app.schemas.equipment import EquipmentCreate, EquipmentUpdate
 
 def get_equipment(db: Session, equipment_id: int) -> Optional[Equipment]:
@@ -13,9 +14,13 @@ def get_equipment_by_serial(db: Session, serial_number: str) -> Optional[Equipme
     """根据序列号获取设备"""
     return db.query(Equipment).filter(Equipment.serial_number == serial_number).first()
 
-def get_equipment_by_mine(db: Session, mine_id: int, skip: int = 0, limit: int = 100) -> List[Equipment]:
-    """获取指定煤矿的设备列表"""
-    return db.query(Equipment).filter(Equipment.mine_id == mine_id).offset(skip).limit(limit).all()
+def get_equipment_by_mine(
+    db: Session, mine_id: int, skip: int = 0, limit: int = 100, after: Optional[tuple] = None
+) -> List[Equipment]:
+    """获取指定煤矿的设备列表（按 id 升序）"""
+    return paginate(
+        db.query(Equipment).filter(Equipment.mine_id == mine_id), (Equipment.id,), skip, limit, after, descending=False
+    )
 
 def get_equipment_by_type(db: Session, equipment_type: str, mine_id: int = None) -> List[Equipment]:
     """根据设备类型获取设备列表"""
@@ -4,8 +4,12 @@ from sqlalchemy.orm import Session
 from sqlalchemy import and_, func
 from app.models.maintenance_record import MaintenanceRecord
 from app.models.equipment import Equipment
+from app.core.pagination import paginate
 from app.schemas.maintenance_record import MaintenanceRecordCreate, MaintenanceRecordUpdate
 
+# 列表按开始时间倒序，id 保证排序键唯一
+MAINTENANCE_ORDER = (MaintenanceRecord.start_time, MaintenanceRecord.id)
+
 def get_maintenance_record(db: Session, record_id: int) -> Optional[MaintenanceRecord]:
     """根据ID获取维护记录"""
     return db.query(MaintenanceRecord).filter(MaintenanceRecord.id == record_id).first()
@@ -14,45 +18,49 @@ def get_maintenance_records_by_equipment(
     db: Session, 
     equipment_id: int, 
     skip: int = 0, 
-    limit: int = 100
+    limit: int = 100,
+    after: Optional[tuple] = None
 ) -> List[MaintenanceRecord]:
     """获取指定设备的维护记录"""
-    return db.query(MaintenanceRecord).filter(
+    return paginate(db.query(MaintenanceRecord).filter(
         MaintenanceRecord.equipment_id == equipment_id
-    ).order_by(MaintenanceRecord.start_time.desc()).offset(skip).limit(limit).all()
+    ), MAINTENANCE_ORDER, skip, limit, after)
 
 def get_maintenance_records_by_type(
     db: Session, 
     maintenance_type: str, 
     skip: int = 0, 
-    limit: int = 100
+    limit: int = 100,
+    after: Optional[tuple] = None
 ) -> List[MaintenanceRecord]:
     """根据维护类型获取维护记录"""
-    return db.query(MaintenanceRecord).filter(
+    return paginate(db.query(MaintenanceRecord).filter(
         MaintenanceRecord.maintenance_type == maintenance_type
-    ).order_by(MaintenanceRecord.start_time.desc()).offset(skip).limit(limit).all()
+    ), MAINTENANCE_ORDER, skip, limit, after)
 
 def get_maintenance_records_by_status(
     db: Session, 
     status: str, 
     skip: int = 0, 
-    limit: int = 100
+    limit: int = 100,
+    after: Optional[tuple] = None
 ) -> List[MaintenanceRecord]:
     """根据状态获取维护记录"""
-    return db.query(MaintenanceRecord).filter(
+    return paginate(db.query(MaintenanceRecord).filter(
         MaintenanceRecord.status == status
-    ).order_by(MaintenanceRecord.start_time.desc()).offset(skip).limit(limit).all()
+    ), MAINTENANCE_ORDER, skip, limit, after)
 
 def get_maintenance_records_by_performer(
     db: Session, 
     performed_by: str, 
     skip: int = 0, 
-    limit: int = 100
+    limit: int = 100,
+    after: Optional[tuple] = None
 ) -> List[MaintenanceRecord]:
     """根据执行人员获取维护记录"""
-    return db.query(MaintenanceRecord).filter(
+    return paginate(db.query(MaintenanceRecord).filter(
         MaintenanceRecord.performed_by == performed_by
-    ).order_by(MaintenanceRecord.start_time.desc()).offset(skip).limit(limit).all()
+    ), MAINTENANCE_ORDER, skip, limit, after)
 
 def get_maintenance_records_by_time_range(
     db: Session, 
@@ -164,23 +172,25 @@ def get_maintenance_records_by_equipment_type(
     db: Session, 
     equipment_type: str, 
     skip: int = 0, 
-    limit: int = 100
+    limit: int = 100,
+    after: Optional[tuple] = None
 ) -> List[MaintenanceRecord]:
     """根据设备类型获取维护记录"""
-    return db.query(MaintenanceRecord).join(Equipment).filter(
+    return paginate(db.query(MaintenanceRecord).join(Equipment).filter(
         Equipment.equipment_type == equipment_type
-    ).order_by(MaintenanceRecord.start_time.desc()).offset(skip).limit(limit).all()
+    ), MAINTENANCE_ORDER, skip, limit, after)
 
 def get_maintenance_records_by_mine(
     db: Session, 
     mine_id: int, 
     skip: int = 0, 
-    limit: int = 100
+    limit: int = 100,
+    after: Optional[tuple] = None
 ) -> List[MaintenanceRecord]:
     """获取指定煤矿的维护记录"""
-    return db.query(MaintenanceRecord).join(Equipment).filter(
+    return paginate(db.query(MaintenanceRecord).join(Equipment).filter(
         Equipment.mine_id == mine_id
-    ).order_by(MaintenanceRecord.start_time.desc()).offset(skip).limit(limit).all()
+    ), MAINTENANCE_ORDER, skip, limit, after)
 
 def get_maintenance_cost_by_period(
     db: Session, 
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from app.models.mine import Mine
 from app.models.monitoring_point import MonitoringPoint
 from app.schemas.mine import MineCreate, MineUpdate, MonitoringPointCreate, MonitoringPointUpdate
+from app.services.point_registry import monitoring_point_registry
 
 # 煤矿相关CRUD操作
 def get_mine(db: Session, mine_id: int) -> Optional[Mine]:
@@ -71,6 +72,7 @@ def create_monitoring_point(db: Session, monitoring_point: MonitoringPointCreate
     db.add(db_monitoring_point)
     db.commit()
     db.refresh(db_monitoring_point)
+    monitoring_point_registry.add(db_monitoring_point.id)
     return db_monitoring_point
 
 def update_monitoring_point(db: Session, point_id: int, point_update: MonitoringPointUpdate) -> Optional[MonitoringPoint]:
@@ -0,0 +1,270 @@
+import logging
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from app.core.config import settings
+from app.crud.environment_rollup import bucket_sql, hour_upsert_sql, minute_upsert_sql
+from app.models.mine import Mine
+from app.models.retention import RetentionPolicy, RetentionProgress, RetentionRun
+from app.schemas.retention import RetentionPolicyCreate, RetentionPolicyUpdate
+
+logger = logging.getLogger(__name__)
+
+MINE_POINTS_SQL = "SELECT id FROM monitoring_points WHERE mine_id = :mine_id"
+
+def _touched_window_sql(seconds: int) -> str:
+    return (
+        f"SELECT DISTINCT monitoring_point_id, {bucket_sql('recorded_at', seconds)} AS bucket_start "
+        f"FROM environment_data WHERE monitoring_point_id IN ({MINE_POINTS_SQL}) "
+        "AND recorded_at >= :start AND recorded_at < :end"
+    )
+
+# 压缩窗口与小时对齐，窗口内的分钟桶和小时桶都是完整的
+COMPACT_MINUTES = text(minute_upsert_sql(_touched_window_sql(60)) + " RETURNING sample_count")
+COMPACT_HOURS = text(hour_upsert_sql(_touched_window_sql(3600)))
+
+# 分批删除，避免长事务锁表和 WAL 突增
+DELETE_RAW_BATCH = text(
+    "DELETE FROM environment_data WHERE (id, recorded_at) IN ("
+    "SELECT id, recorded_at FROM environment_data "
+    f"WHERE monitoring_point_id IN ({MINE_POINTS_SQL}) AND recorded_at < :before LIMIT :limit)"
+)
+DELETE_ROLLUP_BATCH = {
+    table: text(
+        f"DELETE FROM {table} WHERE (monitoring_point_id, bucket_start) IN ("
+        f"SELECT monitoring_point_id, bucket_start FROM {table} "
+        f"WHERE monitoring_point_id IN ({MINE_POINTS_SQL}) AND bucket_start < :before LIMIT :limit)"
+    )
+    for table in ("environment_rollup_1m", "environment_rollup_1h")
+}
+
+def get_retention_policy(db: Session, policy_id: int) -> Optional[RetentionPolicy]:
+    """根据ID获取保留策略"""
+    return db.query(RetentionPolicy).filter(RetentionPolicy.id == policy_id).first()
+
+def get_retention_policies(db: Session) -> List[RetentionPolicy]:
+    """获取全部保留策略"""
+    return db.query(RetentionPolicy).order_by(RetentionPolicy.mine_id.asc().nulls_first()).all()
+
+def get_retention_policy_by_mine(db: Session, mine_id: Optional[int]) -> Optional[RetentionPolicy]:
+    """获取煤矿的专属策略，mine_id 为空时获取默认策略"""
+    query = db.query(RetentionPolicy)
+    if mine_id is None:
+        return query.filter(RetentionPolicy.mine_id.is_(None)).first()
+    return query.filter(RetentionPolicy.mine_id == mine_id).first()
+
+def create_retention_policy(db: Session, policy: RetentionPolicyCreate) -> RetentionPolicy:
+    """创建保留策略"""
+    db_policy = RetentionPolicy(**policy.model_dump())
+    db.add(db_policy)
+    db.commit()
+    db.refresh(db_policy)
+    return db_policy
+
+def update_retention_policy(db: Session, policy_id: int, policy_update: RetentionPolicyUpdate) -> Optional[RetentionPolicy]:
+    """更新保留策略"""
+    db_policy = get_retention_policy(db, policy_id)
+    if not db_policy:
+        return None
+    for field, value in policy_update.model_dump(exclude_unset=True).items():
+        setattr(db_policy, field, value)
+    db.commit()
+    db.refresh(db_policy)
+    return db_policy
+
+def delete_retention_policy(db: Session, policy_id: int) -> bool:
+    """删除保留策略"""
+    db_policy = get_retention_policy(db, policy_id)
+    if not db_policy:
+        return False
+    db.delete(db_policy)
+    db.commit()
+    return True
+
+def get_retention_runs(db: Session, limit: int = 20) -> List[RetentionRun]:
+    """获取最近的清理记录"""
+    return db.query(RetentionRun).order_by(RetentionRun.id.desc()).limit(limit).all()
+
+def resolve_policies(db: Session) -> List[Tuple[int, RetentionPolicy]]:
+    """每个煤矿生效的策略：专属策略优先，其次默认策略；都没有的煤矿不清理"""
+    policies = {policy.mine_id: policy for policy in db.query(RetentionPolicy).filter(RetentionPolicy.is_active == True)}
+    default = policies.get(None)
+    resolved = []
+    for (mine_id,) in db.query(Mine.id).order_by(Mine.id):
+        policy = policies.get(mine_id, default)
+        if policy is not None:
+            resolved.append((mine_id, policy))
+    return resolved
+
+def _floor_hour(moment: datetime) -> datetime:
+    return datetime.fromtimestamp(math.floor(moment.timestamp() / 3600) * 3600, tz=timezone.utc)
+
+def _cutoff(now: datetime, days: Optional[int]) -> Optional[datetime]:
+    """保留期边界，向下对齐到整小时；days 为空表示永久保留"""
+    if not days:
+        return None
+    return _floor_hour(now - timedelta(days=days))
+
+def _delete_in_batches(db: Session, statement, params: dict) -> int:
+    batch_size = settings.RETENTION_BATCH_SIZE
+    deleted = 0
+    while True:
+        count = db.execute(statement, {**params, "limit": batch_size}).rowcount
+        db.commit()
+        deleted += count
+        if count < batch_size:
+            return deleted
+        if settings.RETENTION_BATCH_PAUSE_MS:
+            time.sleep(settings.RETENTION_BATCH_PAUSE_MS / 1000)
+
+def _lock_progress(db: Session, mine_id: int) -> RetentionProgress:
+    db.execute(text(
+        "INSERT INTO retention_progress (mine_id) VALUES (:mine_id) ON CONFLICT (mine_id) DO NOTHING"
+    ), {"mine_id": mine_id})
+    return db.query(RetentionProgress).filter(RetentionProgress.mine_id == mine_id).with_for_update().one()
+
+def _compact_raw(db: Session, run_id: int, mine_id: int, cutoff: datetime) -> int:
+    """
+    把 cutoff 之前尚未汇总的原始数据按窗口写入汇总表，并推进 raw_compacted_before
+    每个窗口一个事务，中断后从 raw_compacted_before 继续
+    """
+    compacted = 0
+    window = timedelta(hours=settings.RETENTION_COMPACT_WINDOW_HOURS)
+    while True:
+        progress = _lock_progress(db, mine_id)
+        start = progress.raw_compacted_before
+        if start is None:
+            oldest = db.execute(text(
+                f"SELECT min(recorded_at) FROM environment_data WHERE monitoring_point_id IN ({MINE_POINTS_SQL})"
+            ), {"mine_id": mine_id}).scalar()
+            if oldest is None or oldest >= cutoff:
+                db.rollback()
+                return compacted
+            start = _floor_hour(oldest)
+        if start >= cutoff:
+            db.rollback()
+            return compacted
+
+        end = min(start + window, cutoff)
+        params = {"mine_id": mine_id, "start": start, "end": end}
+        compacted += sum(row[0] for row in db.execute(COMPACT_MINUTES, params))
+        db.execute(COMPACT_HOURS, params)
+        progress.raw_compacted_before = end
+        progress.last_run_id = run_id
+        db.commit()
+
+def _apply_policy(db: Session, run: RetentionRun, mine_id: int, policy: RetentionPolicy, now: datetime) -> Dict[str, int]:
+    detail = {"raw_rows_compacted": 0, "raw_rows_deleted": 0, "minute_rollups_deleted": 0, "hour_rollups_deleted": 0}
+
+    raw_cutoff = _cutoff(now, policy.raw_retention_days)
+    if raw_cutoff is not None:
+        detail["raw_rows_compacted"] = _compact_raw(db, run.id, mine_id, raw_cutoff)
+    # 只删除已经汇总过的部分，包括上次中断时没删完的
+    compacted_before = db.query(RetentionProgress.raw_compacted_before).filter(
+        RetentionProgress.mine_id == mine_id
+    ).scalar()
+    if compacted_before is not None:
+        detail["raw_rows_deleted"] = _delete_in_batches(
+            db, DELETE_RAW_BATCH, {"mine_id": mine_id, "before": compacted_before}
+        )
+
+    for table, days, key in (
+        ("environment_rollup_1m", policy.minute_rollup_retention_days, "minute_rollups_deleted"),
+        ("environment_rollup_1h", policy.hour_rollup_retention_days, "hour_rollups_deleted"),
+    ):
+        cutoff = _cutoff(now, days)
+        if cutoff is not None:
+            detail[key] = _delete_in_batches(db, DELETE_ROLLUP_BATCH[table], {"mine_id": mine_id, "before": cutoff})
+    return detail
+
+def get_retention_report(db: Session, now: Optional[datetime] = None) -> dict:
+    """试运行：按当前策略统计每个煤矿将被汇总和删除的行数，不修改数据"""
+    now = now or datetime.now(timezone.utc)
+    mines = {}
+    for mine_id, policy in resolve_policies(db):
+        compacted_before = db.query(RetentionProgress.raw_compacted_before).filter(
+            RetentionProgress.mine_id == mine_id
+        ).scalar()
+        raw_cutoff = _cutoff(now, policy.raw_retention_days)
+        report = {
+            "policy_id": policy.id,
+            "raw_cutoff": raw_cutoff,
+            "raw_rows_to_compact": 0,
+            "raw_rows_to_delete": 0,
+            "minute_rollups_to_delete": 0,
+            "hour_rollups_to_delete": 0
+        }
+        delete_before = max(filter(None, (raw_cutoff, compacted_before)), default=None)
+        if delete_before is not None:
+            report["raw_rows_to_delete"] = db.execute(text(
+                f"SELECT count(*) FROM environment_data WHERE monitoring_point_id IN ({MINE_POINTS_SQL}) "
+                "AND recorded_at < :before"
+            ), {"mine_id": mine_id, "before": delete_before}).scalar()
+        if raw_cutoff is not None:
+            report["raw_rows_to_compact"] = db.execute(text(
+                f"SELECT count(*) FROM environment_data WHERE monitoring_point_id IN ({MINE_POINTS_SQL}) "
+                "AND recorded_at < :before AND (CAST(:after AS timestamptz) IS NULL OR recorded_at >= :after)"
+            ), {"mine_id": mine_id, "before": raw_cutoff, "after": compacted_before}).scalar()
+        for table, days, key in (
+            ("environment_rollup_1m", policy.minute_rollup_retention_days, "minute_rollups_to_delete"),
+            ("environment_rollup_1h", policy.hour_rollup_retention_days, "hour_rollups_to_delete"),
+        ):
+            cutoff = _cutoff(now, days)
+            if cutoff is not None:
+                report[key] = db.execute(text(
+                    f"SELECT count(*) FROM {table} WHERE monitoring_point_id IN ({MINE_POINTS_SQL}) "
+                    "AND bucket_start < :before"
+                ), {"mine_id": mine_id, "before": cutoff}).scalar()
+        mines[str(mine_id)] = report
+    db.rollback()
+    return {"dry_run": True, "generated_at": now, "mines": mines}
+
+def run_retention(db: Session, now: Optional[datetime] = None) -> RetentionRun:
+    """
+    按策略执行清理：先把过期原始数据汇总到 1 分钟 / 1 小时表，再分批删除原始数据和过期汇总
+    每个窗口和每个删除批次单独提交，可随时中断后重跑；执行指标记录在 retention_runs
+    """
+    now = now or datetime.now(timezone.utc)
+    run = RetentionRun(dry_run=False, status="running", details={})
+    db.add(run)
+    db.commit()
+
+    totals = {"raw_rows_compacted": 0, "raw_rows_deleted": 0, "minute_rollups_deleted": 0, "hour_rollups_deleted": 0}
+    details = {}
+    try:
+        for mine_id, policy in resolve_policies(db):
+            detail = _apply_policy(db, run, mine_id, policy, now)
+            details[str(mine_id)] = detail
+            for key, value in detail.items():
+                totals[key] += value
+            for key, value in totals.items():
+                setattr(run, key, value)
+            run.details = dict(details)
+            db.commit()
+        run.status = "completed"
+    except Exception as exc:
+        db.rollback()
+        run.status = "failed"
+        run.error = str(exc)[:500]
+        logger.exception("Retention run %s failed", run.id)
+    run.finished_at = datetime.now(timezone.utc)
+    db.commit()
+    db.refresh(run)
+    return run
+
+class CRUDRetention:
+    get_retention_policy = staticmethod(get_retention_policy)
+    get_retention_policies = staticmethod(get_retention_policies)
+    get_retention_policy_by_mine = staticmethod(get_retention_policy_by_mine)
+    create_retention_policy = staticmethod(create_retention_policy)
+    update_retention_policy = staticmethod(update_retention_policy)
+    delete_retention_policy = staticmethod(delete_retention_policy)
+    get_retention_runs = staticmethod(get_retention_runs)
+    resolve_policies = staticmethod(resolve_policies)
+    get_retention_report = staticmethod(get_retention_report)
+    run_retention = staticmethod(run_retention)
+
+crud_retention = CRUDRetention()
@@ -0,0 +1,106 @@
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from app.models.alert import AlertSeverity
+from app.models.threshold_rule import RuleType, ThresholdRule
+from app.schemas.threshold_rule import ThresholdRuleCreate, ThresholdRuleUpdate, validate_rule_definition
+from app.services.rule_engine import threshold_rule_engine
+
+# 默认全局规则，与迁移 0005 写入的一致：(字段, 下限, 上限, 说明)
+DEFAULT_THRESHOLD_RULES = [
+    ("methane_concentration", None, 1.0, "甲烷浓度超过1%"),
+    ("temperature", None, 40.0, "温度超过40度"),
+    ("oxygen_concentration", 19.5, None, "氧气浓度低于19.5%"),
+    ("carbon_monoxide", None, 50.0, "一氧化碳超过50ppm"),
+]
+
+def get_threshold_rule(db: Session, rule_id: int) -> Optional[ThresholdRule]:
+    """根据ID获取阈值规则"""
+    return db.query(ThresholdRule).filter(ThresholdRule.id == rule_id).first()
+
+def get_threshold_rules(
+    db: Session,
+    mine_id: Optional[int] = None,
+    monitoring_point_id: Optional[int] = None,
+    field: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    rule_type: Optional[RuleType] = None
+) -> List[ThresholdRule]:
+    """获取阈值规则列表"""
+    query = db.query(ThresholdRule)
+    if mine_id is not None:
+        query = query.filter(ThresholdRule.mine_id == mine_id)
+    if monitoring_point_id is not None:
+        query = query.filter(ThresholdRule.monitoring_point_id == monitoring_point_id)
+    if field is not None:
+        query = query.filter(ThresholdRule.field == field)
+    if is_active is not None:
+        query = query.filter(ThresholdRule.is_active == is_active)
+    if rule_type is not None:
+        query = query.filter(ThresholdRule.rule_type == rule_type)
+    return query.order_by(ThresholdRule.field, ThresholdRule.id).all()
+
+def create_threshold_rule(db: Session, rule: ThresholdRuleCreate) -> ThresholdRule:
+    """创建阈值规则"""
+    db_rule = ThresholdRule(**rule.model_dump())
+    db.add(db_rule)
+    db.commit()
+    db.refresh(db_rule)
+    threshold_rule_engine.invalidate()
+    return db_rule
+
+def update_threshold_rule(db: Session, rule_id: int, rule_update: ThresholdRuleUpdate) -> Optional[ThresholdRule]:
+    """更新阈值规则，更新后的规则参数仍须有效，否则抛出 ValueError"""
+    db_rule = get_threshold_rule(db, rule_id)
+    if not db_rule:
+        return None
+
+    update_data = rule_update.model_dump(exclude_unset=True)
+    validate_rule_definition(
+        db_rule.rule_type,
+        update_data.get("min_value", db_rule.min_value),
+        update_data.get("max_value", db_rule.max_value),
+        update_data.get("max_rate", db_rule.max_rate),
+        update_data.get("conditions", db_rule.conditions)
+    )
+
+    for field, value in update_data.items():
+        setattr(db_rule, field, value)
+    db.commit()
+    db.refresh(db_rule)
+    threshold_rule_engine.invalidate()
+    return db_rule
+
+def delete_threshold_rule(db: Session, rule_id: int) -> bool:
+    """删除阈值规则"""
+    db_rule = get_threshold_rule(db, rule_id)
+    if not db_rule:
+        return False
+    db.delete(db_rule)
+    db.commit()
+    threshold_rule_engine.invalidate()
+    return True
+
+def seed_default_threshold_rules(db: Session) -> int:
+    """规则表为空时写入默认全局规则（create_all 建表的安装不经过迁移 0005），返回写入条数"""
+    if db.query(ThresholdRule.id).first() is not None:
+        return 0
+    db.add_all([
+        ThresholdRule(
+            rule_type=RuleType.THRESHOLD, field=field, min_value=min_value, max_value=max_value,
+            severity=AlertSeverity.HIGH, description=description
+        )
+        for field, min_value, max_value, description in DEFAULT_THRESHOLD_RULES
+    ])
+    db.commit()
+    threshold_rule_engine.invalidate()
+    return len(DEFAULT_THRESHOLD_RULES)
+
+class CRUDThresholdRule:
+    get_threshold_rule = staticmethod(get_threshold_rule)
+    get_threshold_rules = staticmethod(get_threshold_rules)
+    create_threshold_rule = staticmethod(create_threshold_rule)
+    update_threshold_rule = staticmethod(update_threshold_rule)
+    delete_threshold_rule = staticmethod(delete_threshold_rule)
+    seed_default_threshold_rules = staticmethod(seed_default_threshold_rules)
+
+crud_threshold_rule = CRUDThresholdRule()
@@ -0,0 +1,118 @@
+"""
+environment_data 按 recorded_at 的范围分区维护
+分区按天或按周（周一开始，UTC）划分，命名为 environment_data_pYYYYMMDD
+"""
+
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from sqlalchemy import text
+from app.core.config import settings
+
+PARENT_TABLE = "environment_data"
+DEFAULT_PARTITION = "environment_data_default"
+
+_BOUND_PATTERN = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+def _parse_bound(value: str) -> datetime:
+    # PostgreSQL 输出的时区偏移形如 +08，补全为 +08:00 以兼容 fromisoformat
+    if re.search(r"[+-]\d{2}$", value):
+        value += ":00"
+    return datetime.fromisoformat(value)
+
+def partition_bounds(day: date, interval: Optional[str] = None) -> Tuple[date, date]:
+    """返回包含指定日期的分区范围 [start, end)"""
+    interval = interval or settings.ENVIRONMENT_DATA_PARTITION_INTERVAL
+    if interval == "day":
+        return day, day + timedelta(days=1)
+    if interval == "week":
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=7)
+    raise ValueError(f"Unsupported partition interval: {interval}")
+
+def partition_name(start: date) -> str:
+    return f"{PARENT_TABLE}_p{start:%Y%m%d}"
+
+def is_partitioned(conn) -> bool:
+    """environment_data 是否已是分区表（未执行迁移时为普通表）"""
+    return bool(conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = :name"
+    ), {"name": PARENT_TABLE}).scalar())
+
+def list_partitions(conn) -> List[dict]:
+    """列出现有分区及其范围，默认分区的范围为 None"""
+    rows = conn.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+        "FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :name ORDER BY c.relname"
+    ), {"name": PARENT_TABLE}).all()
+
+    partitions = []
+    for name, bound in rows:
+        match = _BOUND_PATTERN.search(bound or "")
+        if match:
+            start = _parse_bound(match.group(1))
+            end = _parse_bound(match.group(2))
+        else:
+            start = end = None
+        partitions.append({"name": name, "start": start, "end": end})
+    return partitions
+
+def create_partition(conn, start: date, end: date) -> str:
+    name = partition_name(start)
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{start.isoformat()} 00:00:00+00') TO ('{end.isoformat()} 00:00:00+00')"
+    ))
+    return name
+
+def ensure_partitions(
+    conn, since: Optional[date] = None, ahead: Optional[int] = None, until: Optional[date] = None
+) -> List[str]:
+    """创建从 since 到未来 ahead 个周期（until 更晚时到 until）的分区，以及兜底的默认分区"""
+    ahead = settings.ENVIRONMENT_DATA_PARTITIONS_AHEAD if ahead is None else ahead
+    today = datetime.now(timezone.utc).date()
+    start, _ = partition_bounds(min(since or today, today))
+    _, last_end = partition_bounds(today)
+    for _ in range(ahead):
+        _, last_end = partition_bounds(last_end)
+    if until is not None:
+        last_end = max(last_end, partition_bounds(until)[1])
+
+    existing = {p["name"] for p in list_partitions(conn)}
+    created = []
+    while start < last_end:
+        _, end = partition_bounds(start)
+        name = partition_name(start)
+        if name not in existing:
+            create_partition(conn, start, end)
+            created.append(name)
+        start = end
+
+    if DEFAULT_PARTITION not in existing:
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"))
+        created.append(DEFAULT_PARTITION)
+    return created
+
+def drop_expired_partitions(conn, retention_days: int, dry_run: bool = False) -> List[str]:
+    """分离并删除上界早于保留期的分区，替代大范围 DELETE"""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    expired = [p["name"] for p in list_partitions(conn) if p["end"] is not None and p["end"] <= cutoff]
+    if not dry_run:
+        for name in expired:
+            conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+            conn.execute(text(f"DROP TABLE {name}"))
+    return expired
+
+def maintain_partitions(conn) -> dict:
+    """周期维护：预建未来分区，按配置清理过期分区"""
+    if not is_partitioned(conn):
+        return {"partitioned": False, "created": [], "dropped": []}
+    created = ensure_partitions(conn)
+    dropped = []
+    if settings.ENVIRONMENT_DATA_PARTITION_RETENTION_DAYS:
+        dropped = drop_expired_partitions(conn, settings.ENVIRONMENT_DATA_PARTITION_RETENTION_DAYS)
+    return {"partitioned": True, "created": created, "dropped": dropped}
@@ -0,0 +1,100 @@
+"""partition environment_data by recorded_at
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.database import partitioning
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+DATA_COLUMNS = (
+    "id, monitoring_point_id, methane_concentration, carbon_monoxide, carbon_dioxide, "
+    "oxygen_concentration, hydrogen_sulfide, temperature, humidity, pressure, air_flow, "
+    "dust_concentration, ventilation_status, emergency_system_status"
+)
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+
+    # 旧表改名保留，复用原有的 id 序列
+    op.execute("ALTER TABLE environment_data RENAME TO environment_data_legacy")
+    op.execute("ALTER INDEX IF EXISTS environment_data_pkey RENAME TO environment_data_legacy_pkey")
+    op.execute("ALTER INDEX IF EXISTS ix_environment_data_id RENAME TO ix_environment_data_legacy_id")
+    op.execute("ALTER SEQUENCE environment_data_id_seq OWNED BY NONE")
+
+    op.execute("""
+        CREATE TABLE environment_data (
+            id INTEGER NOT NULL DEFAULT nextval('environment_data_id_seq'),
+            monitoring_point_id INTEGER NOT NULL REFERENCES monitoring_points (id),
+            methane_concentration DOUBLE PRECISION,
+            carbon_monoxide DOUBLE PRECISION,
+            carbon_dioxide DOUBLE PRECISION,
+            oxygen_concentration DOUBLE PRECISION,
+            hydrogen_sulfide DOUBLE PRECISION,
+            temperature DOUBLE PRECISION,
+            humidity DOUBLE PRECISION,
+            pressure DOUBLE PRECISION,
+            air_flow DOUBLE PRECISION,
+            dust_concentration DOUBLE PRECISION,
+            ventilation_status BOOLEAN,
+            emergency_system_status BOOLEAN,
+            recorded_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, recorded_at)
+        ) PARTITION BY RANGE (recorded_at)
+    """)
+    op.execute("ALTER SEQUENCE environment_data_id_seq OWNED BY environment_data.id")
+    op.execute("CREATE INDEX ix_environment_data_id ON environment_data (id)")
+
+    # 为已有数据的整个时间范围以及未来若干周期建分区
+    oldest = conn.execute(sa.text("SELECT min(recorded_at) FROM environment_data_legacy")).scalar()
+    partitioning.ensure_partitions(conn, since=oldest.date() if oldest else None)
+
+    op.execute(f"""
+        INSERT INTO environment_data ({DATA_COLUMNS}, recorded_at)
+        SELECT {DATA_COLUMNS}, COALESCE(recorded_at, now()) FROM environment_data_legacy
+    """)
+    op.execute("DROP TABLE environment_data_legacy")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE environment_data RENAME TO environment_data_partitioned")
+    op.execute("ALTER INDEX IF EXISTS environment_data_pkey RENAME TO environment_data_partitioned_pkey")
+    op.execute("ALTER INDEX IF EXISTS ix_environment_data_id RENAME TO ix_environment_data_partitioned_id")
+    op.execute("ALTER SEQUENCE environment_data_id_seq OWNED BY NONE")
+
+    op.execute("""
+        CREATE TABLE environment_data (
+            id INTEGER NOT NULL DEFAULT nextval('environment_data_id_seq') PRIMARY KEY,
+            monitoring_point_id INTEGER NOT NULL REFERENCES monitoring_points (id),
+            methane_concentration DOUBLE PRECISION,
+            carbon_monoxide DOUBLE PRECISION,
+            carbon_dioxide DOUBLE PRECISION,
+            oxygen_concentration DOUBLE PRECISION,
+            hydrogen_sulfide DOUBLE PRECISION,
+            temperature DOUBLE PRECISION,
+            humidity DOUBLE PRECISION,
+            pressure DOUBLE PRECISION,
+            air_flow DOUBLE PRECISION,
+            dust_concentration DOUBLE PRECISION,
+            ventilation_status BOOLEAN,
+            emergency_system_status BOOLEAN,
+            recorded_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+        )
+    """)
+    op.execute("ALTER SEQUENCE environment_data_id_seq OWNED BY environment_data.id")
+    op.execute("CREATE INDEX ix_environment_data_id ON environment_data (id)")
+    op.execute(f"""
+        INSERT INTO environment_data ({DATA_COLUMNS}, recorded_at)
+        SELECT {DATA_COLUMNS}, recorded_at FROM environment_data_partitioned
+    """)
+    op.execute("DROP TABLE environment_data_partitioned CASCADE")
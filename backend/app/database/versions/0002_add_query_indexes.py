@@ -0,0 +1,75 @@
+"""add composite and partial indexes for hot queries
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+HAZARD_PREDICATE = (
+    "methane_concentration > 1.0 OR temperature > 40.0 "
+    "OR oxygen_concentration < 19.5 OR carbon_monoxide > 50.0"
+)
+
+# (索引名, 表名, 列, 部分索引条件)
+CONCURRENT_INDEXES = [
+    ("ix_alerts_point_detected_at", "alerts", ["monitoring_point_id", "detected_at"], None),
+    ("ix_alerts_type_detected_at", "alerts", ["alert_type", "detected_at"], None),
+    ("ix_alerts_status_detected_at", "alerts", ["status", "detected_at"], None),
+    ("ix_alerts_detected_at", "alerts", ["detected_at"], None),
+    ("ix_alerts_active_severity", "alerts", ["severity", "detected_at"], "status = 'ACTIVE'"),
+    ("ix_maintenance_records_equipment_start_time", "maintenance_records", ["equipment_id", "start_time"], None),
+    ("ix_maintenance_records_type_start_time", "maintenance_records", ["maintenance_type", "start_time"], None),
+    ("ix_maintenance_records_status_start_time", "maintenance_records", ["status", "start_time"], None),
+    ("ix_maintenance_records_start_time", "maintenance_records", ["start_time"], None),
+    ("ix_equipment_mine_id", "equipment", ["mine_id"], None),
+    ("ix_monitoring_points_mine_id", "monitoring_points", ["mine_id"], None),
+    ("ix_monitoring_points_camera_id", "monitoring_points", ["camera_id"], None),
+]
+
+# 分区表的父表不支持 CONCURRENTLY，索引会自动建到每个分区上
+PARTITIONED_INDEXES = [
+    ("ix_environment_data_point_recorded_at", "environment_data", ["monitoring_point_id", "recorded_at"], None),
+    ("ix_environment_data_recorded_at", "environment_data", ["recorded_at"], None),
+    ("ix_environment_data_point_hazard", "environment_data", ["monitoring_point_id", "recorded_at"], HAZARD_PREDICATE),
+]
+
+
+def _create(name, table, columns, where, concurrently):
+    op.create_index(
+        name, table, columns,
+        if_not_exists=True,
+        postgresql_where=sa.text(where) if where else None,
+        postgresql_concurrently=concurrently,
+    )
+
+
+def upgrade() -> None:
+    for name, table, columns, where in PARTITIONED_INDEXES:
+        _create(name, table, columns, where, concurrently=False)
+
+    # 普通表在线建索引，避免长时间锁表
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in CONCURRENT_INDEXES:
+            _create(name, table, columns, where, concurrently=True)
+
+    op.execute("ANALYZE environment_data")
+    op.execute("ANALYZE alerts")
+    op.execute("ANALYZE maintenance_records")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(CONCURRENT_INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+    for name, table, _, _ in reversed(PARTITIONED_INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
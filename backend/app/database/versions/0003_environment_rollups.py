@@ -0,0 +1,67 @@
+"""add environment rollup tables
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 12:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+# 与 app.models.environment_data.ENVIRONMENT_FIELDS 保持一致
+ENVIRONMENT_FIELDS = (
+    "methane_concentration", "carbon_monoxide", "carbon_dioxide",
+    "oxygen_concentration", "hydrogen_sulfide", "temperature",
+    "humidity", "pressure", "air_flow", "dust_concentration"
+)
+
+ROLLUP_TABLES = ("environment_rollup_1m", "environment_rollup_1h")
+
+
+def _rollup_columns():
+    columns = [
+        sa.Column('monitoring_point_id', sa.Integer(), sa.ForeignKey('monitoring_points.id'), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('sample_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    ]
+    for field in ENVIRONMENT_FIELDS:
+        columns += [
+            sa.Column(f'{field}_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column(f'{field}_sum', sa.Float()),
+            sa.Column(f'{field}_min', sa.Float()),
+            sa.Column(f'{field}_max', sa.Float()),
+            sa.Column(f'{field}_sumsq', sa.Float()),
+        ]
+    return columns
+
+
+def upgrade() -> None:
+    for table in ROLLUP_TABLES:
+        op.create_table(
+            table,
+            *_rollup_columns(),
+            sa.PrimaryKeyConstraint('monitoring_point_id', 'bucket_start'),
+        )
+
+    # 水位线从 0 开始，后台任务会按批次回填历史数据
+    op.create_table(
+        'rollup_watermarks',
+        sa.Column('name', sa.String(50), primary_key=True),
+        sa.Column('last_id', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('covered_until', sa.DateTime(timezone=True)),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('rollup_watermarks')
+    for table in reversed(ROLLUP_TABLES):
+        op.drop_table(table)
@@ -0,0 +1,69 @@
+"""add retention policies, progress and run history
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 14:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'retention_policies',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('mine_id', sa.Integer(), sa.ForeignKey('mines.id'), unique=True),
+        sa.Column('raw_retention_days', sa.Integer()),
+        sa.Column('minute_rollup_retention_days', sa.Integer()),
+        sa.Column('hour_rollup_retention_days', sa.Integer()),
+        sa.Column('is_active', sa.Boolean(), server_default=sa.true()),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True)),
+    )
+    op.create_index('ix_retention_policies_id', 'retention_policies', ['id'])
+    # 默认策略（mine_id 为空）只能有一条
+    op.create_index(
+        'uq_retention_policies_default', 'retention_policies', [sa.text('(mine_id IS NULL)')],
+        unique=True, postgresql_where=sa.text('mine_id IS NULL')
+    )
+
+    op.create_table(
+        'retention_progress',
+        sa.Column('mine_id', sa.Integer(), sa.ForeignKey('mines.id'), primary_key=True),
+        sa.Column('raw_compacted_before', sa.DateTime(timezone=True)),
+        sa.Column('last_run_id', sa.Integer()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+    op.create_table(
+        'retention_runs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('dry_run', sa.Boolean(), server_default=sa.false()),
+        sa.Column('status', sa.String(20), server_default='running'),
+        sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('finished_at', sa.DateTime(timezone=True)),
+        sa.Column('raw_rows_compacted', sa.BigInteger(), server_default='0'),
+        sa.Column('raw_rows_deleted', sa.BigInteger(), server_default='0'),
+        sa.Column('minute_rollups_deleted', sa.BigInteger(), server_default='0'),
+        sa.Column('hour_rollups_deleted', sa.BigInteger(), server_default='0'),
+        sa.Column('details', sa.JSON()),
+        sa.Column('error', sa.String(500)),
+    )
+    op.create_index('ix_retention_runs_id', 'retention_runs', ['id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_retention_runs_id', table_name='retention_runs')
+    op.drop_table('retention_runs')
+    op.drop_table('retention_progress')
+    op.drop_index('uq_retention_policies_default', table_name='retention_policies')
+    op.drop_index('ix_retention_policies_id', table_name='retention_policies')
+    op.drop_table('retention_policies')
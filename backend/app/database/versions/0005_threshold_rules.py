@@ -0,0 +1,57 @@
+"""add threshold rules and seed the previous hardcoded thresholds as global rules
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 16:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+# 与原 get_environment_alerts 中写死的阈值一致
+DEFAULT_RULES = [
+    ('methane_concentration', None, 1.0, '甲烷浓度超过1%'),
+    ('temperature', None, 40.0, '温度超过40度'),
+    ('oxygen_concentration', 19.5, None, '氧气浓度低于19.5%'),
+    ('carbon_monoxide', None, 50.0, '一氧化碳超过50ppm'),
+]
+
+
+def upgrade() -> None:
+    # alertseverity 枚举类型已随 alerts 表创建
+    severity = postgresql.ENUM('LOW', 'MEDIUM', 'HIGH', 'CRITICAL', name='alertseverity', create_type=False)
+    threshold_rules = op.create_table(
+        'threshold_rules',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('mine_id', sa.Integer(), sa.ForeignKey('mines.id')),
+        sa.Column('monitoring_point_id', sa.Integer(), sa.ForeignKey('monitoring_points.id')),
+        sa.Column('field', sa.String(50), nullable=False),
+        sa.Column('min_value', sa.Float()),
+        sa.Column('max_value', sa.Float()),
+        sa.Column('severity', severity, nullable=False, server_default='HIGH'),
+        sa.Column('description', sa.String(200)),
+        sa.Column('is_active', sa.Boolean(), server_default=sa.true()),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_threshold_rules_id', 'threshold_rules', ['id'])
+    op.create_index('ix_threshold_rules_scope', 'threshold_rules', ['mine_id', 'monitoring_point_id'])
+
+    op.bulk_insert(threshold_rules, [
+        {'field': field, 'min_value': min_value, 'max_value': max_value, 'severity': 'HIGH', 'description': description}
+        for field, min_value, max_value, description in DEFAULT_RULES
+    ])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_threshold_rules_scope', table_name='threshold_rules')
+    op.drop_index('ix_threshold_rules_id', table_name='threshold_rules')
+    op.drop_table('threshold_rules')
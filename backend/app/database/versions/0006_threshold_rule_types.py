@@ -0,0 +1,36 @@
+"""add rate-of-change and combination rule types
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 17:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+rule_type = postgresql.ENUM('THRESHOLD', 'RATE_OF_CHANGE', 'COMBINATION', name='ruletype')
+
+
+def upgrade() -> None:
+    rule_type.create(op.get_bind(), checkfirst=True)
+    op.add_column(
+        'threshold_rules',
+        sa.Column('rule_type', postgresql.ENUM(name='ruletype', create_type=False), nullable=False, server_default='THRESHOLD')
+    )
+    op.add_column('threshold_rules', sa.Column('max_rate', sa.Float()))
+    op.add_column('threshold_rules', sa.Column('conditions', sa.JSON()))
+
+
+def downgrade() -> None:
+    op.drop_column('threshold_rules', 'conditions')
+    op.drop_column('threshold_rules', 'max_rate')
+    op.drop_column('threshold_rules', 'rule_type')
+    rule_type.drop(op.get_bind(), checkfirst=True)
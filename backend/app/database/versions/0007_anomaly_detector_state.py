@@ -0,0 +1,38 @@
+"""add anomaly detector checkpoint table
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 18:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'anomaly_detector_state',
+        sa.Column('monitoring_point_id', sa.Integer(), sa.ForeignKey('monitoring_points.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('field', sa.String(50), nullable=False),
+        sa.Column('sample_count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('ewma_mean', sa.Float()),
+        sa.Column('ewma_variance', sa.Float()),
+        sa.Column('ewma_baseline', sa.Float()),
+        sa.Column('cusum_positive', sa.Float(), server_default='0'),
+        sa.Column('cusum_negative', sa.Float(), server_default='0'),
+        sa.Column('last_recorded_at', sa.DateTime(timezone=True)),
+        sa.Column('last_alert_at', sa.DateTime(timezone=True)),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('monitoring_point_id', 'field'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('anomaly_detector_state')
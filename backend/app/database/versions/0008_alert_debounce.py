@@ -0,0 +1,42 @@
+"""add alert debounce columns to alerts and threshold rules
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 19:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('alerts', sa.Column('alert_key', sa.String(100)))
+    op.add_column('alerts', sa.Column('peak_value', sa.Float()))
+    op.add_column('alerts', sa.Column('last_seen_at', sa.DateTime(timezone=True)))
+    op.add_column('alerts', sa.Column('occurrence_count', sa.Integer(), server_default='1'))
+    op.create_index(
+        'ix_alerts_open_key', 'alerts', ['monitoring_point_id', 'alert_key'],
+        postgresql_where=sa.text("alert_key IS NOT NULL AND status IN ('ACTIVE', 'ACKNOWLEDGED')")
+    )
+
+    op.add_column('threshold_rules', sa.Column('hysteresis', sa.Float()))
+    op.add_column('threshold_rules', sa.Column('min_duration_seconds', sa.Integer()))
+    op.add_column('threshold_rules', sa.Column('suppress_seconds', sa.Integer()))
+
+
+def downgrade() -> None:
+    op.drop_column('threshold_rules', 'suppress_seconds')
+    op.drop_column('threshold_rules', 'min_duration_seconds')
+    op.drop_column('threshold_rules', 'hysteresis')
+    op.drop_index('ix_alerts_open_key', table_name='alerts')
+    op.drop_column('alerts', 'occurrence_count')
+    op.drop_column('alerts', 'last_seen_at')
+    op.drop_column('alerts', 'peak_value')
+    op.drop_column('alerts', 'alert_key')
@@ -0,0 +1,44 @@
+"""add alert counters table
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 20:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'alert_counters',
+        sa.Column('mine_id', sa.Integer(), sa.ForeignKey('mines.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('monitoring_point_id', sa.Integer(), sa.ForeignKey('monitoring_points.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('severity', postgresql.ENUM(name='alertseverity', create_type=False), nullable=False),
+        sa.Column('status', postgresql.ENUM(name='alertstatus', create_type=False), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('monitoring_point_id', 'severity', 'status'),
+    )
+    op.create_index('ix_alert_counters_mine', 'alert_counters', ['mine_id'])
+
+    # 用现有报警初始化计数
+    op.execute("""
+        INSERT INTO alert_counters (mine_id, monitoring_point_id, severity, status, count)
+        SELECT mp.mine_id, a.monitoring_point_id, a.severity, COALESCE(a.status, 'ACTIVE'), count(*)
+        FROM alerts a JOIN monitoring_points mp ON mp.id = a.monitoring_point_id
+        GROUP BY mp.mine_id, a.monitoring_point_id, a.severity, COALESCE(a.status, 'ACTIVE')
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_alert_counters_mine', table_name='alert_counters')
+    op.drop_table('alert_counters')
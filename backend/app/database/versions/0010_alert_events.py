@@ -0,0 +1,39 @@
+"""add alert events table for push delivery
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17 21:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'alert_events',
+        sa.Column('id', sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column('alert_id', sa.Integer(), nullable=False),
+        sa.Column('event_type', sa.String(20), nullable=False),
+        sa.Column('mine_id', sa.Integer()),
+        sa.Column('monitoring_point_id', sa.Integer(), nullable=False),
+        sa.Column('alert_type', postgresql.ENUM(name='alerttype', create_type=False), nullable=False),
+        sa.Column('severity', postgresql.ENUM(name='alertseverity', create_type=False), nullable=False),
+        sa.Column('status', postgresql.ENUM(name='alertstatus', create_type=False), nullable=False),
+        sa.Column('payload', sa.JSON()),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_alert_events_created_at', 'alert_events', ['created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_alert_events_created_at', table_name='alert_events')
+    op.drop_table('alert_events')
@@ -0,0 +1,45 @@
+"""drop the hardcoded-threshold partial index on environment_data
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.database import partitioning
+
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+# 0002 曾创建的部分索引条件；异常数据查询已改为按 threshold_rules 生成条件，规划器用不上该索引
+HAZARD_PREDICATE = (
+    "methane_concentration > 1.0 OR temperature > 40.0 "
+    "OR oxygen_concentration < 19.5 OR carbon_monoxide > 50.0"
+)
+
+
+def upgrade() -> None:
+    # 异常数据查询使用 ix_environment_data_point_recorded_at
+    conn = op.get_bind()
+    with op.get_context().autocommit_block():
+        if partitioning.is_partitioned(conn):
+            # 分区表上的索引不支持 CONCURRENTLY；删除父索引只删除目录项和各分区的索引文件，不扫描数据，持锁时间很短
+            op.drop_index("ix_environment_data_point_hazard", table_name="environment_data", if_exists=True)
+        else:
+            op.drop_index(
+                "ix_environment_data_point_hazard", table_name="environment_data",
+                if_exists=True, postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_environment_data_point_hazard", "environment_data", ["monitoring_point_id", "recorded_at"],
+        if_not_exists=True,
+        postgresql_where=sa.text(HAZARD_PREDICATE),
+    )
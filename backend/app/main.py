@@ -1,7 +1,20 @@
-from fastapi import FastAPI
+import logging
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.query_counter import QueryCounter, install as install_query_counter
+from app.database.database import engine
+from app.services.alert_stream import alert_stream_hub
+from app.services.environment_buffer import environment_write_buffer
+from app.services.jobs import checkpoint_anomaly_state, flush_detections, register_jobs, restore_anomaly_state
+from app.services.recent_store import recent_reading_store
+from app.services.scheduler import scheduler
+
+logger = logging.getLogger(__name__)
+
+SQL_QUERY_COUNT_HEADER = "X-SQL-Query-Count"
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -18,10 +31,59 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, SQL_QUERY_COUNT_HEADER],
     )
 
+if settings.SQL_QUERY_COUNT_HEADER:
+    install_query_counter(engine)
+
+    @app.middleware("http")
+    async def count_sql_queries(request: Request, call_next):
+        with QueryCounter() as counter:
+            response = await call_next(request)
+        response.headers[SQL_QUERY_COUNT_HEADER] = str(counter.count)
+        return response
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+register_jobs(scheduler)
+
+@app.on_event("startup")
+def start_background_services():
+    if settings.ANOMALY_DETECTION_ENABLED:
+        # 先恢复检测状态再接收写入
+        try:
+            restore_anomaly_state()
+        except Exception:
+            logger.exception("Failed to restore anomaly detector state")
+    if settings.ENVIRONMENT_WRITE_BUFFER_ENABLED:
+        environment_write_buffer.start()
+    if settings.RECENT_STORE_ENABLED:
+        recent_reading_store.start()
+    if settings.ALERT_STREAM_ENABLED:
+        try:
+            alert_stream_hub.start()
+        except Exception:
+            logger.exception("Failed to start alert stream")
+    scheduler.start()
+
+@app.on_event("shutdown")
+def stop_background_services():
+    # 停机前刷写写缓冲，避免重新部署时丢失数据
+    environment_write_buffer.stop()
+    alert_stream_hub.stop()
+    recent_reading_store.stop()
+    scheduler.stop()
+    try:
+        flush_detections()
+    except Exception:
+        logger.exception("Failed to flush merged detections")
+    if settings.ANOMALY_DETECTION_ENABLED:
+        try:
+            checkpoint_anomaly_state()
+        except Exception:
+            logger.exception("Failed to checkpoint anomaly detector state")
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to AI Mine Guard API", "version": settings.VERSION}
@@ -5,6 +5,12 @@ from . import alert
 from . import environment_data
 from . import equipment
 from . import maintenance_record
+from . import environment_rollup
+from . import retention
+from . import threshold_rule
+from . import anomaly_state
+from . import alert_counter
+from . import alert_event
 
 from .user import User, UserRole
 from .mine import Mine
@@ -13,7 +19,13 @@ from .alert import Alert
 from .environment_data import EnvironmentData
 from .equipment import Equipment
 from .maintenance_record import MaintenanceRecord
+from .environment_rollup import EnvironmentRollupMinute, EnvironmentRollupHour, RollupWatermark
+from .retention import RetentionPolicy, RetentionProgress, RetentionRun
+from .threshold_rule import ThresholdRule, RuleType
+from .anomaly_state import AnomalyDetectorState
+from .alert_counter import AlertCounter
+from .alert_event import AlertEvent
 
 from app.database.database import Base
 
-__all__ = ["Base", "User", "UserRole", "Mine", "MonitoringPoint", "EnvironmentData", "Alert", "Equipment", "MaintenanceRecord"] 
\ No newline at end of file
+__all__ = ["Base", "User", "UserRole", "Mine", "MonitoringPoint", "EnvironmentData", "Alert", "Equipment", "MaintenanceRecord", "EnvironmentRollupMinute", "EnvironmentRollupHour", "RollupWatermark", "RetentionPolicy", "RetentionProgress", "RetentionRun", "ThresholdRule", "RuleType", "AnomalyDetectorState", "AlertCounter", "AlertEvent"] 
\ No newline at end of file
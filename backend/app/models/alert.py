@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Float, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database.database import Base
@@ -25,6 +25,24 @@ class AlertType(str, enum.Enum):
 
 class Alert(Base):
     __tablename__ = "alerts"
+    __table_args__ = (
+        Index("ix_alerts_point_detected_at", "monitoring_point_id", "detected_at"),
+        Index("ix_alerts_type_detected_at", "alert_type", "detected_at"),
+        Index("ix_alerts_status_detected_at", "status", "detected_at"),
+        Index("ix_alerts_detected_at", "detected_at"),
+        # 活跃/紧急报警只占很小一部分
+        Index(
+            "ix_alerts_active_severity",
+            "severity", "detected_at",
+            postgresql_where=text("status = 'ACTIVE'")
+        ),
+        # 传感器报警防抖按 (监控点, 报警键) 查找未关闭的报警
+        Index(
+            "ix_alerts_open_key",
+            "monitoring_point_id", "alert_key",
+            postgresql_where=text("alert_key IS NOT NULL AND status IN ('ACTIVE', 'ACKNOWLEDGED')")
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     monitoring_point_id = Column(Integer, ForeignKey("monitoring_points.id"), nullable=False)
@@ -44,6 +62,10 @@ class Alert(Base):
     location_details = Column(String(200))  # 具体位置信息
     equipment_id = Column(String(100))  # 相关设备ID
     notes = Column(Text)  # 处理备注
+    alert_key = Column(String(100))  # 传感器报警的去重键，例如 threshold:methane_concentration
+    peak_value = Column(Float)  # 持续期间的峰值
+    last_seen_at = Column(DateTime(timezone=True))  # 最后一次观测到报警条件的时间
+    occurrence_count = Column(Integer, default=1)  # 持续期间触发的读数数量
     
     # 关联关系
     monitoring_point = relationship("MonitoringPoint", back_populates="alerts")
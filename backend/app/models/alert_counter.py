@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, DateTime, Enum, ForeignKey, Index, PrimaryKeyConstraint
+from sqlalchemy.sql import func
+from app.database.database import Base
+from app.models.alert import AlertSeverity, AlertStatus
+
+class AlertCounter(Base):
+    """
+    报警计数：每个 (监控点, 严重程度, 状态) 一行，与报警的新建/状态变化在同一事务内增减
+    统计概览直接读这张小表，不再扫描 alerts 历史；mine_id 冗余存储以便按煤矿汇总
+    """
+    __tablename__ = "alert_counters"
+    __table_args__ = (
+        PrimaryKeyConstraint("monitoring_point_id", "severity", "status"),
+        Index("ix_alert_counters_mine", "mine_id"),
+    )
+
+    mine_id = Column(Integer, ForeignKey("mines.id", ondelete="CASCADE"), nullable=False)
+    monitoring_point_id = Column(Integer, ForeignKey("monitoring_points.id", ondelete="CASCADE"), nullable=False)
+    severity = Column(Enum(AlertSeverity), nullable=False)
+    status = Column(Enum(AlertStatus), nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
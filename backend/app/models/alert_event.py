@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Enum, JSON, Index
+from sqlalchemy.sql import func
+from app.database.database import Base
+from app.models.alert import AlertSeverity, AlertStatus, AlertType
+
+class AlertEvent(Base):
+    """
+    报警事件流：报警新建、升级和状态变化各记一行，与报警的变更在同一事务内写入
+    推送通道按 id 顺序读取并分发给订阅者，断线重连时按 Last-Event-ID 从这里补发
+    """
+    __tablename__ = "alert_events"
+    __table_args__ = (
+        Index("ix_alert_events_created_at", "created_at"),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    alert_id = Column(Integer, nullable=False)  # 不建外键，报警删除后事件仍可补发
+    event_type = Column(String(20), nullable=False)  # created / escalated / acknowledged / resolved / updated / deleted
+    mine_id = Column(Integer)
+    monitoring_point_id = Column(Integer, nullable=False)
+    alert_type = Column(Enum(AlertType), nullable=False)
+    severity = Column(Enum(AlertSeverity), nullable=False)
+    status = Column(Enum(AlertStatus), nullable=False)
+    payload = Column(JSON)  # 报警的主要字段快照
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
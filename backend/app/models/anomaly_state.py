@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, Float, BigInteger, DateTime, ForeignKey, PrimaryKeyConstraint
+from sqlalchemy.sql import func
+from app.database.database import Base
+
+class AnomalyDetectorState(Base):
+    """
+    异常检测器的检查点：每个监控点每个字段一行
+    重启后从这里恢复 EWMA / CUSUM 状态，无需回放历史数据预热
+    """
+    __tablename__ = "anomaly_detector_state"
+    __table_args__ = (
+        PrimaryKeyConstraint("monitoring_point_id", "field"),
+    )
+
+    monitoring_point_id = Column(Integer, ForeignKey("monitoring_points.id", ondelete="CASCADE"), nullable=False)
+    field = Column(String(50), nullable=False)
+    sample_count = Column(BigInteger, nullable=False, default=0)
+    ewma_mean = Column(Float)
+    ewma_variance = Column(Float)
+    ewma_baseline = Column(Float)  # 漂移检测用的慢速基线
+    cusum_positive = Column(Float, default=0)
+    cusum_negative = Column(Float, default=0)
+    last_recorded_at = Column(DateTime(timezone=True))  # 最后一次纳入统计的读数时间
+    last_alert_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,12 +1,28 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, PrimaryKeyConstraint, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database.database import Base
 
+# 十项环境监测数值字段
+ENVIRONMENT_FIELDS = (
+    "methane_concentration", "carbon_monoxide", "carbon_dioxide",
+    "oxygen_concentration", "hydrogen_sulfide", "temperature",
+    "humidity", "pressure", "air_flow", "dust_concentration"
+)
+
 class EnvironmentData(Base):
     __tablename__ = "environment_data"
+    # 按 recorded_at 做范围分区，分区表的主键必须包含分区键
+    __table_args__ = (
+        PrimaryKeyConstraint("id", "recorded_at"),
+        # 按监控点取最新/分页/时间范围查询
+        Index("ix_environment_data_point_recorded_at", "monitoring_point_id", "recorded_at"),
+        # 按煤矿分页（连接监控点后按时间倒序）
+        Index("ix_environment_data_recorded_at", "recorded_at"),
+        {"postgresql_partition_by": "RANGE (recorded_at)"},
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, autoincrement=True, index=True)
     monitoring_point_id = Column(Integer, ForeignKey("monitoring_points.id"), nullable=False)
     
     # 气体浓度
@@ -28,7 +44,10 @@ class EnvironmentData(Base):
     emergency_system_status = Column(Boolean)  # 应急系统状态
     
     # 时间戳
-    recorded_at = Column(DateTime(timezone=True), server_default=func.now())
+    recorded_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
     
     # 关联关系
-    monitoring_point = relationship("MonitoringPoint", back_populates="environment_data") 
\ No newline at end of file
+    monitoring_point = relationship("MonitoringPoint", back_populates="environment_data")
+
+    # ORM 标识仍只使用 id
+    __mapper_args__ = {"primary_key": [id]} 
\ No newline at end of file
@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, BigInteger, Float, DateTime, ForeignKey, String, PrimaryKeyConstraint
+from sqlalchemy.orm import declared_attr
+from sqlalchemy.sql import func
+from app.database.database import Base
+from app.models.environment_data import ENVIRONMENT_FIELDS
+
+class EnvironmentRollupMixin:
+    """按 (monitoring_point_id, bucket_start) 汇总的环境数据，每个字段保存 count/sum/min/max/平方和"""
+    __table_args__ = (PrimaryKeyConstraint("monitoring_point_id", "bucket_start"),)
+
+    @declared_attr
+    def monitoring_point_id(cls):
+        return Column(Integer, ForeignKey("monitoring_points.id"), primary_key=True)
+
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    sample_count = Column(Integer, nullable=False, default=0)  # 桶内数据行数
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+for _field in ENVIRONMENT_FIELDS:
+    setattr(EnvironmentRollupMixin, f"{_field}_count", Column(Integer, nullable=False, default=0))
+    setattr(EnvironmentRollupMixin, f"{_field}_sum", Column(Float))
+    setattr(EnvironmentRollupMixin, f"{_field}_min", Column(Float))
+    setattr(EnvironmentRollupMixin, f"{_field}_max", Column(Float))
+    setattr(EnvironmentRollupMixin, f"{_field}_sumsq", Column(Float))
+
+class EnvironmentRollupMinute(EnvironmentRollupMixin, Base):
+    __tablename__ = "environment_rollup_1m"
+    bucket_seconds = 60
+
+class EnvironmentRollupHour(EnvironmentRollupMixin, Base):
+    __tablename__ = "environment_rollup_1h"
+    bucket_seconds = 3600
+
+class RollupWatermark(Base):
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String(50), primary_key=True)
+    last_id = Column(BigInteger, nullable=False, default=0)  # 已处理的最大 environment_data.id
+    covered_until = Column(DateTime(timezone=True))  # 此时间之前的桶已完整汇总
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -7,7 +7,7 @@ class Equipment(Base):
     __tablename__ = "equipment"
     
     id = Column(Integer, primary_key=True, index=True)
-    mine_id = Column(Integer, ForeignKey("mines.id"), nullable=False)
+    mine_id = Column(Integer, ForeignKey("mines.id"), nullable=False, index=True)
     name = Column(String(100), nullable=False)
     equipment_type = Column(String(50), nullable=False)  # 设备类型
     model = Column(String(100))  # 设备型号
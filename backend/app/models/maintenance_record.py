@@ -1,10 +1,16 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database.database import Base
 
 class MaintenanceRecord(Base):
     __tablename__ = "maintenance_records"
+    __table_args__ = (
+        Index("ix_maintenance_records_equipment_start_time", "equipment_id", "start_time"),
+        Index("ix_maintenance_records_type_start_time", "maintenance_type", "start_time"),
+        Index("ix_maintenance_records_status_start_time", "status", "start_time"),
+        Index("ix_maintenance_records_start_time", "start_time"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     equipment_id = Column(Integer, ForeignKey("equipment.id"), nullable=False)
@@ -7,10 +7,10 @@ class MonitoringPoint(Base):
     __tablename__ = "monitoring_points"
 
     id = Column(Integer, primary_key=True, index=True)
-    mine_id = Column(Integer, ForeignKey("mines.id"), nullable=False)
+    mine_id = Column(Integer, ForeignKey("mines.id"), nullable=False, index=True)
     name = Column(String(100), nullable=False)
     location = Column(String(200))
-    camera_id = Column(String(50))
+    camera_id = Column(String(50), index=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -0,0 +1,48 @@
+from sqlalchemy import Column, Integer, BigInteger, Boolean, String, DateTime, ForeignKey, JSON, Index, text
+from sqlalchemy.sql import func
+from app.database.database import Base
+
+class RetentionPolicy(Base):
+    """数据保留策略，mine_id 为空的是默认策略；天数为空表示永久保留"""
+    __tablename__ = "retention_policies"
+    __table_args__ = (
+        # 默认策略只能有一条
+        Index(
+            "uq_retention_policies_default", text("(mine_id IS NULL)"),
+            unique=True, postgresql_where=text("mine_id IS NULL")
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    mine_id = Column(Integer, ForeignKey("mines.id"), unique=True)
+    raw_retention_days = Column(Integer)  # 原始数据保留天数
+    minute_rollup_retention_days = Column(Integer)  # 1 分钟汇总保留天数
+    hour_rollup_retention_days = Column(Integer)  # 1 小时汇总保留天数
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class RetentionProgress(Base):
+    """每个煤矿的清理进度，中断后从这里继续"""
+    __tablename__ = "retention_progress"
+
+    mine_id = Column(Integer, ForeignKey("mines.id"), primary_key=True)
+    raw_compacted_before = Column(DateTime(timezone=True))  # 此时间之前的原始数据已汇总，可以删除
+    last_run_id = Column(Integer)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class RetentionRun(Base):
+    """每次清理任务的执行记录和指标"""
+    __tablename__ = "retention_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    dry_run = Column(Boolean, default=False)
+    status = Column(String(20), default="running")  # running, completed, failed
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True))
+    raw_rows_compacted = Column(BigInteger, default=0)
+    raw_rows_deleted = Column(BigInteger, default=0)
+    minute_rollups_deleted = Column(BigInteger, default=0)
+    hour_rollups_deleted = Column(BigInteger, default=0)
+    details = Column(JSON)  # 按煤矿的明细
+    error = Column(String(500))
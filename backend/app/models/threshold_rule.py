@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Enum, Index, JSON
+from sqlalchemy.sql import func
+from app.database.database import Base
+from app.models.alert import AlertSeverity
+import enum
+
+class RuleType(str, enum.Enum):
+    THRESHOLD = "threshold"  # field 超出 min_value / max_value
+    RATE_OF_CHANGE = "rate_of_change"  # field 相邻两次读数的变化速率超过 max_rate（每分钟）
+    COMBINATION = "combination"  # field 超出上下限且 conditions 中的条件同时满足
+
+class ThresholdRule(Base):
+    """
+    环境数据阈值规则
+    monitoring_point_id 和 mine_id 都为空时是全局规则；同一字段按 监控点 > 煤矿 > 全局 的优先级生效
+    """
+    __tablename__ = "threshold_rules"
+    __table_args__ = (
+        Index("ix_threshold_rules_scope", "mine_id", "monitoring_point_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    mine_id = Column(Integer, ForeignKey("mines.id"))
+    monitoring_point_id = Column(Integer, ForeignKey("monitoring_points.id"))
+    rule_type = Column(Enum(RuleType), nullable=False, default=RuleType.THRESHOLD)
+    field = Column(String(50), nullable=False)  # EnvironmentData 字段名
+    min_value = Column(Float)  # 低于此值报警
+    max_value = Column(Float)  # 高于此值报警
+    max_rate = Column(Float)  # 变化速率上限（单位/分钟）
+    conditions = Column(JSON)  # 组合规则的附加条件 [{"field": ..., "op": ">", "value": ...}]
+    severity = Column(Enum(AlertSeverity), nullable=False, default=AlertSeverity.HIGH)
+    # 报警防抖，为空时使用 ALERT_* 默认配置
+    hysteresis = Column(Float)  # 退出阈值与进入阈值的距离
+    min_duration_seconds = Column(Integer)  # 持续超限多久才报警
+    suppress_seconds = Column(Integer)  # 解除后多久内再次超限仍归入同一报警
+    description = Column(String(200))
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
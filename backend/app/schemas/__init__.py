@@ -5,23 +5,31 @@ from . import environment_data
 from . import equipment
 from . import maintenance_record
 from . import token
+from . import retention
+from . import threshold_rule
 
 from .user import User, UserCreate, UserUpdate, UserLogin
 from .token import Token, TokenPayload
 from .mine import Mine, MineCreate, MineUpdate, MineWithPoints
 from .monitoring_point import MonitoringPoint, MonitoringPointCreate, MonitoringPointUpdate
-from .alert import Alert, AlertCreate, AlertUpdate, AlertWithDetails, AlertSummary
-from .environment_data import EnvironmentData, EnvironmentDataCreate, EnvironmentDataUpdate, EnvironmentStatistics, EnvironmentTrends
+from .alert import Alert, AlertCreate, AlertUpdate, AlertWithDetails, AlertSummary, MineAlertSummary, AlertMonitoringPoint, AlertUser, AlertBulkAction, AlertBulkResult
+from .environment_data import EnvironmentData, EnvironmentDataCreate, EnvironmentDataUpdate, EnvironmentDataBatchCreate, EnvironmentDataBatchResult, EnvironmentStatistics, EnvironmentTrends
 from .equipment import Equipment, EquipmentCreate, EquipmentUpdate, EquipmentStatistics
 from .maintenance_record import MaintenanceRecord, MaintenanceRecordCreate, MaintenanceRecordUpdate, MaintenanceStatistics
+from .retention import RetentionPolicy, RetentionPolicyCreate, RetentionPolicyUpdate, RetentionRun
+from .threshold_rule import ThresholdRule, ThresholdRuleCreate, ThresholdRuleUpdate
+from .detection import DetectionCreate, DetectionBatchCreate, DetectionBatchResult
 
 __all__ = [
     "User", "UserCreate", "UserUpdate", "UserLogin", 
     "Token", "TokenPayload",
     "Mine", "MineCreate", "MineUpdate", "MineWithPoints", 
     "MonitoringPoint", "MonitoringPointCreate", "MonitoringPointUpdate", 
-    "Alert", "AlertCreate", "AlertUpdate", "AlertWithDetails", "AlertSummary",
-    "EnvironmentData", "EnvironmentDataCreate", "EnvironmentDataUpdate", "EnvironmentStatistics", "EnvironmentTrends",
+    "Alert", "AlertCreate", "AlertUpdate", "AlertWithDetails", "AlertSummary", "MineAlertSummary", "AlertMonitoringPoint", "AlertUser", "AlertBulkAction", "AlertBulkResult",
+    "EnvironmentData", "EnvironmentDataCreate", "EnvironmentDataUpdate", "EnvironmentDataBatchCreate", "EnvironmentDataBatchResult", "EnvironmentStatistics", "EnvironmentTrends",
     "Equipment", "EquipmentCreate", "EquipmentUpdate", "EquipmentStatistics",
-    "MaintenanceRecord", "MaintenanceRecordCreate", "MaintenanceRecordUpdate", "MaintenanceStatistics"
+    "MaintenanceRecord", "MaintenanceRecordCreate", "MaintenanceRecordUpdate", "MaintenanceStatistics",
+    "RetentionPolicy", "RetentionPolicyCreate", "RetentionPolicyUpdate", "RetentionRun",
+    "ThresholdRule", "ThresholdRuleCreate", "ThresholdRuleUpdate",
+    "DetectionCreate", "DetectionBatchCreate", "DetectionBatchResult"
 ] 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional, List, Dict
 from datetime import datetime
 from app.models.alert import AlertStatus, AlertSeverity, AlertType
@@ -35,20 +35,78 @@ class Alert(AlertBase):
     acknowledged_by: Optional[int] = None
     resolved_at: Optional[datetime] = None
     resolved_by: Optional[int] = None
+    alert_key: Optional[str] = None
+    peak_value: Optional[float] = None
+    last_seen_at: Optional[datetime] = None
+    occurrence_count: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+class AlertMonitoringPoint(BaseModel):
+    """报警详情中的监控点摘要"""
+    id: int
+    mine_id: int
+    name: str
+    location: Optional[str] = None
+    camera_id: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class AlertUser(BaseModel):
+    """报警详情中的操作人摘要"""
+    id: int
+    username: str
+    full_name: Optional[str] = None
 
     class Config:
         from_attributes = True
 
 class AlertWithDetails(Alert):
-    monitoring_point: Optional[dict] = None
-    acknowledged_by_user: Optional[dict] = None
-    resolved_by_user: Optional[dict] = None
+    monitoring_point: Optional[AlertMonitoringPoint] = None
+    acknowledged_by_user: Optional[AlertUser] = None
+    resolved_by_user: Optional[AlertUser] = None
+
+class AlertBulkAction(BaseModel):
+    """批量确认/解决：指定报警ID列表，或按条件筛选（至少一个条件）"""
+    alert_ids: Optional[List[int]] = Field(None, min_length=1, max_length=1000)
+    mine_id: Optional[int] = None
+    monitoring_point_id: Optional[int] = None
+    alert_type: Optional[AlertType] = None
+    detected_before: Optional[datetime] = None
+
+    @model_validator(mode="after")
+    def check_target(self):
+        if self.alert_ids is None and all(
+            value is None for value in (self.mine_id, self.monitoring_point_id, self.alert_type, self.detected_before)
+        ):
+            raise ValueError("alert_ids or at least one filter is required")
+        return self
+
+class AlertBulkSkipped(BaseModel):
+    id: int
+    reason: str  # 报警当前状态，或 not_found
+
+class AlertBulkResult(BaseModel):
+    updated: List[int]
+    skipped: List[AlertBulkSkipped]  # 只列出 alert_ids 中未变更的报警，按条件筛选时为空
+
+class MineAlertSummary(BaseModel):
+    mine_id: int
+    total_alerts: int
+    active_alerts: int
+    critical_alerts: int
+    alerts_by_severity: Dict[str, int]
+    alerts_by_status: Dict[str, int]
 
 class AlertSummary(BaseModel):
     total_alerts: int
     active_alerts: int
     critical_alerts: int
     alerts_by_severity: Dict[str, int]
+    alerts_by_status: Dict[str, int] = {}
+    alerts_by_mine: List[MineAlertSummary] = []
     recent_alerts: List[Alert]
 
     class Config:
@@ -0,0 +1,30 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from datetime import datetime
+from app.models.alert import AlertSeverity, AlertType
+
+class DetectionCreate(BaseModel):
+    """AI 检测器上报的一次检测"""
+    monitoring_point_id: int
+    alert_type: AlertType = AlertType.DANGEROUS_ACTION
+    severity: AlertSeverity = AlertSeverity.HIGH
+    confidence_score: float = Field(..., ge=0, le=1)
+    detected_at: Optional[datetime] = None  # 为空时取接收时间，不带时区按 UTC
+    title: Optional[str] = Field(None, min_length=1, max_length=200)
+    description: Optional[str] = None
+    image_url: Optional[str] = Field(None, max_length=500)
+    video_url: Optional[str] = Field(None, max_length=500)
+    location_details: Optional[str] = Field(None, max_length=200)
+    equipment_id: Optional[str] = Field(None, max_length=100)
+
+class DetectionBatchCreate(BaseModel):
+    detections: List[DetectionCreate] = Field(..., min_length=1, max_length=10000)
+
+class DetectionBatchResult(BaseModel):
+    total: int
+    accepted: int
+    below_confidence: int  # 低于置信度下限被丢弃
+    unknown_point: int  # 监控点不存在被丢弃
+    unknown_point_ids: List[int]
+    merged: int  # 合并到未关闭报警的检测数
+    created_alert_ids: List[int]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 
 class EnvironmentDataBase(BaseModel):
@@ -18,7 +18,7 @@ class EnvironmentDataBase(BaseModel):
     emergency_system_status: Optional[bool] = None
 
 class EnvironmentDataCreate(EnvironmentDataBase):
-    pass
+    recorded_at: Optional[datetime] = None  # 采集时间，缺省为入库时间
 
 class EnvironmentDataUpdate(BaseModel):
     methane_concentration: Optional[float] = Field(None, ge=0, le=100)
@@ -41,6 +41,21 @@ class EnvironmentData(EnvironmentDataBase):
     class Config:
         from_attributes = True
 
+class EnvironmentDataBatchCreate(BaseModel):
+    items: List[EnvironmentDataCreate] = Field(..., min_length=1, max_length=10000)
+
+class EnvironmentDataBatchItemResult(BaseModel):
+    index: int  # 请求中的行号
+    status: str  # created / rejected
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class EnvironmentDataBatchResult(BaseModel):
+    total: int
+    created: int
+    rejected: int
+    results: List[EnvironmentDataBatchItemResult]
+
 class EnvironmentStatistics(BaseModel):
     count: int
     time_range: dict
@@ -0,0 +1,43 @@
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any
+from datetime import datetime
+
+class RetentionPolicyBase(BaseModel):
+    mine_id: Optional[int] = None  # 为空表示默认策略
+    raw_retention_days: Optional[int] = Field(30, ge=1)
+    minute_rollup_retention_days: Optional[int] = Field(365, ge=1)
+    hour_rollup_retention_days: Optional[int] = Field(None, ge=1)  # 为空表示永久保留
+    is_active: bool = True
+
+class RetentionPolicyCreate(RetentionPolicyBase):
+    pass
+
+class RetentionPolicyUpdate(BaseModel):
+    raw_retention_days: Optional[int] = Field(None, ge=1)
+    minute_rollup_retention_days: Optional[int] = Field(None, ge=1)
+    hour_rollup_retention_days: Optional[int] = Field(None, ge=1)
+    is_active: Optional[bool] = None
+
+class RetentionPolicy(RetentionPolicyBase):
+    id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class RetentionRun(BaseModel):
+    id: int
+    dry_run: bool
+    status: str
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    raw_rows_compacted: int = 0
+    raw_rows_deleted: int = 0
+    minute_rollups_deleted: int = 0
+    hour_rollups_deleted: int = 0
+    details: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,83 @@
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import List, Literal, Optional
+from datetime import datetime
+from app.models.alert import AlertSeverity
+from app.models.environment_data import ENVIRONMENT_FIELDS
+from app.models.threshold_rule import RuleType
+
+def check_environment_field(value: str) -> str:
+    if value not in ENVIRONMENT_FIELDS:
+        raise ValueError(f"field must be one of {list(ENVIRONMENT_FIELDS)}")
+    return value
+
+def validate_rule_definition(rule_type: RuleType, min_value, max_value, max_rate, conditions) -> None:
+    """按规则类型校验参数，创建和更新共用"""
+    if rule_type == RuleType.RATE_OF_CHANGE:
+        if max_rate is None or max_rate <= 0:
+            raise ValueError("rate_of_change rules require a positive max_rate")
+        return
+    if min_value is None and max_value is None:
+        raise ValueError("min_value or max_value is required")
+    if min_value is not None and max_value is not None and min_value >= max_value:
+        raise ValueError("min_value must be less than max_value")
+    if rule_type == RuleType.COMBINATION and not conditions:
+        raise ValueError("combination rules require at least one condition")
+
+class RuleCondition(BaseModel):
+    field: str
+    op: Literal[">", ">=", "<", "<="]
+    value: float
+
+    @field_validator("field")
+    @classmethod
+    def check_field(cls, value: str) -> str:
+        return check_environment_field(value)
+
+class ThresholdRuleBase(BaseModel):
+    mine_id: Optional[int] = None
+    monitoring_point_id: Optional[int] = None
+    rule_type: RuleType = RuleType.THRESHOLD
+    field: str
+    min_value: Optional[float] = None
+    max_value: Optional[float] = None
+    max_rate: Optional[float] = None
+    conditions: Optional[List[RuleCondition]] = None
+    severity: AlertSeverity = AlertSeverity.HIGH
+    hysteresis: Optional[float] = Field(None, ge=0)
+    min_duration_seconds: Optional[int] = Field(None, ge=0)
+    suppress_seconds: Optional[int] = Field(None, ge=0)
+    description: Optional[str] = Field(None, max_length=200)
+    is_active: bool = True
+
+    @field_validator("field")
+    @classmethod
+    def check_field(cls, value: str) -> str:
+        return check_environment_field(value)
+
+    @model_validator(mode="after")
+    def check_definition(self):
+        validate_rule_definition(self.rule_type, self.min_value, self.max_value, self.max_rate, self.conditions)
+        return self
+
+class ThresholdRuleCreate(ThresholdRuleBase):
+    pass
+
+class ThresholdRuleUpdate(BaseModel):
+    min_value: Optional[float] = None
+    max_value: Optional[float] = None
+    max_rate: Optional[float] = None
+    conditions: Optional[List[RuleCondition]] = None
+    severity: Optional[AlertSeverity] = None
+    hysteresis: Optional[float] = Field(None, ge=0)
+    min_duration_seconds: Optional[int] = Field(None, ge=0)
+    suppress_seconds: Optional[int] = Field(None, ge=0)
+    description: Optional[str] = Field(None, max_length=200)
+    is_active: Optional[bool] = None
+
+class ThresholdRule(ThresholdRuleBase):
+    id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1 @@
+# 进程内后台服务
\ No newline at end of file
@@ -0,0 +1,140 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional
+from sqlalchemy.orm import Session
+from app.crud.alert import create_alerts_bulk, extend_open_alerts, get_open_alert_ids_by_key
+from app.models.alert import AlertSeverity
+
+logger = logging.getLogger(__name__)
+
+class AlertSignal(NamedTuple):
+    """一批读数中某个 (监控点, 报警键) 的报警条件汇总"""
+    monitoring_point_id: int
+    alert_key: str
+    first_at: datetime
+    last_at: datetime
+    count: int
+    peak_value: float
+    direction: str  # max / min，峰值取最大还是最小
+    severity: AlertSeverity
+    confidence_score: Optional[float]
+    min_duration_seconds: int
+    suppress_seconds: int
+    alert: dict  # 需要新建报警时插入的字段
+
+class _KeyState:
+    __slots__ = ("pending_since", "last_seen", "alert_id", "cleared_at")
+
+    def __init__(self):
+        self.pending_since: Optional[datetime] = None  # 本次超限开始时间（尚未报警或报警中）
+        self.last_seen: Optional[datetime] = None
+        self.alert_id: Optional[int] = None  # 最近一次报警
+        self.cleared_at: Optional[datetime] = None  # 最近一次回到退出阈值以内的时间
+
+class AlertDebouncer:
+    """
+    传感器报警的状态机，键为 (监控点ID, 报警键)
+    - 超限持续 min_duration_seconds 后才新建报警，期间解除则不报警
+    - 条件持续期间把峰值、最后出现时间、次数合并到已有的未关闭报警，不再插入新行
+    - 回到退出阈值以内（滞回）后视为解除；解除后 suppress_seconds 内再次超限仍归入上一条报警，
+      该报警已被人工关闭时这段时间内不再新建
+    状态在进程内；重启后通过 ix_alerts_open_key 找回未关闭的报警
+    """
+
+    def __init__(self):
+        self._states: Dict[tuple, _KeyState] = {}
+        self._lock = threading.Lock()
+
+    def _restore(self, db: Session, keys: List[tuple]) -> None:
+        missing = [key for key in keys if key not in self._states]
+        open_alerts = get_open_alert_ids_by_key(db, missing)
+        for key in missing:
+            state = self._states[key] = _KeyState()
+            state.alert_id = open_alerts.get(key)
+
+    def process(self, db: Session, signals: List[AlertSignal], cleared: Dict[tuple, datetime]) -> List[int]:
+        """
+        处理一批报警条件和解除时间（键均为 (监控点ID, 报警键)），写入报警但不提交事务
+        返回新建的报警ID
+        """
+        with self._lock:
+            self._restore(db, [(signal.monitoring_point_id, signal.alert_key) for signal in signals])
+
+            updates, waiting = [], []
+            for signal in signals:
+                state = self._states[(signal.monitoring_point_id, signal.alert_key)]
+                # 长时间没有新的超限读数，视为新的一次超限
+                if state.last_seen and signal.first_at - state.last_seen > timedelta(seconds=signal.suppress_seconds):
+                    state.pending_since = None
+                state.pending_since = state.pending_since or signal.first_at
+                state.last_seen = max(state.last_seen or signal.last_at, signal.last_at)
+                if state.alert_id is not None:
+                    updates.append(signal)
+                else:
+                    waiting.append(signal)
+
+            extended = extend_open_alerts(db, [
+                {
+                    "id": self._states[(signal.monitoring_point_id, signal.alert_key)].alert_id,
+                    "peak_value": signal.peak_value,
+                    "direction": signal.direction,
+                    "last_seen_at": signal.last_at,
+                    "occurrence_count": signal.count,
+                    "severity": signal.severity,
+                    "confidence_score": signal.confidence_score,
+                }
+                for signal in updates
+            ])
+            for signal in updates:
+                state = self._states[(signal.monitoring_point_id, signal.alert_key)]
+                if state.alert_id in extended:
+                    continue
+                # 报警已被人工关闭：抑制窗口内不再新建
+                if state.cleared_at and signal.first_at - state.cleared_at < timedelta(seconds=signal.suppress_seconds):
+                    continue
+                state.alert_id = None
+                state.pending_since = signal.first_at
+                waiting.append(signal)
+
+            to_create = []
+            for signal in waiting:
+                state = self._states[(signal.monitoring_point_id, signal.alert_key)]
+                if state.last_seen - state.pending_since >= timedelta(seconds=signal.min_duration_seconds):
+                    to_create.append((state, signal))
+
+            alert_ids = create_alerts_bulk(db, [
+                {
+                    **signal.alert,
+                    "alert_key": signal.alert_key,
+                    "detected_at": state.pending_since,
+                    "peak_value": signal.peak_value,
+                    "last_seen_at": signal.last_at,
+                    "occurrence_count": signal.count,
+                }
+                for state, signal in to_create
+            ])
+            for (state, _), alert_id in zip(to_create, alert_ids):
+                state.alert_id = alert_id
+
+            for key, cleared_at in cleared.items():
+                state = self._states.get(key)
+                if state is None or state.pending_since is None:
+                    continue
+                if state.last_seen is None or cleared_at > state.last_seen:
+                    state.pending_since = None
+                    state.cleared_at = cleared_at
+
+        if updates or alert_ids:
+            logger.info("Alert debouncer extended %d and created %d alerts", len(extended), len(alert_ids))
+        return alert_ids
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "keys": len(self._states),
+                "pending": sum(1 for state in self._states.values() if state.pending_since and state.alert_id is None),
+                "alerting": sum(1 for state in self._states.values() if state.pending_since and state.alert_id),
+            }
+
+alert_debouncer = AlertDebouncer()
@@ -0,0 +1,343 @@
+import asyncio
+import logging
+import select
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple
+from app.core.config import settings
+from app.crud.alert_event import (
+    ALERT_EVENTS_CHANNEL, get_alert_events_after, get_alert_events_by_ids, get_latest_alert_event_id,
+    get_snapshot_xid_bounds
+)
+from app.database.database import SessionLocal, engine
+
+logger = logging.getLogger(__name__)
+
+# 等待空洞期间重新检查写入事务是否结束的间隔（回滚和不写事件的事务不会发通知）
+GAP_RECHECK_SECONDS = 0.1
+
+class StreamEvent(NamedTuple):
+    id: int
+    event_type: str
+    alert_id: int
+    mine_id: Optional[int]
+    monitoring_point_id: int
+    alert_type: str
+    severity: str
+    status: str
+    payload: dict
+
+    def message(self) -> dict:
+        return {"id": self.id, "event": self.event_type, "alert": self.payload}
+
+def _stream_event(row) -> StreamEvent:
+    return StreamEvent(
+        row.id, row.event_type, row.alert_id, row.mine_id, row.monitoring_point_id,
+        row.alert_type.value, row.severity.value, row.status.value, row.payload or {}
+    )
+
+class AlertStreamFilter(NamedTuple):
+    """订阅条件，空集合表示不限"""
+    mine_ids: FrozenSet[int] = frozenset()
+    monitoring_point_ids: FrozenSet[int] = frozenset()
+    severities: FrozenSet[str] = frozenset()
+    alert_types: FrozenSet[str] = frozenset()
+
+    def matches(self, event: StreamEvent) -> bool:
+        return (
+            (not self.mine_ids or event.mine_id in self.mine_ids)
+            and (not self.monitoring_point_ids or event.monitoring_point_id in self.monitoring_point_ids)
+            and (not self.severities or event.severity in self.severities)
+            and (not self.alert_types or event.alert_type in self.alert_types)
+        )
+
+class Subscription:
+    """
+    一个连接的有界发送队列，按报警ID合并：同一报警尚未发出的旧事件被新事件替换；
+    队列满时丢弃最早的事件并计数，由连接通知客户端按 last_event_id 重新拉取。
+    迟到事件（late）不参与按 id 去重，与队列中同一报警较新的事件合并时保留较新的。
+    需要在连接所在的事件循环中创建
+    """
+
+    def __init__(self, filters: AlertStreamFilter, queue_size: Optional[int] = None):
+        self.filters = filters
+        self.queue_size = queue_size or settings.ALERT_STREAM_QUEUE_SIZE
+        self.last_id = 0  # 已处理（入队或过滤掉）的最大事件ID
+        self.dropped = 0
+        self.coalesced = 0
+        self._pending: "OrderedDict[int, StreamEvent]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+
+    def offer(self, event: StreamEvent, late: bool = False) -> None:
+        if not late:
+            if event.id <= self.last_id:
+                return
+            self.last_id = event.id
+        if not self.filters.matches(event):
+            return
+        with self._lock:
+            existing = self._pending.get(event.alert_id)
+            if existing is not None:
+                self.coalesced += 1
+                if existing.id > event.id:
+                    return
+                del self._pending[event.alert_id]
+            elif len(self._pending) >= self.queue_size:
+                self._pending.popitem(last=False)
+                self.dropped += 1
+            self._pending[event.alert_id] = event
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            # 事件循环已关闭，连接正在断开
+            pass
+
+    async def next_batch(self, timeout: float) -> Tuple[List[StreamEvent], int]:
+        """等待下一批事件，返回（事件, 自上次以来因队列满丢弃的数量）；超时返回空批"""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            return [], 0
+        self._wakeup.clear()
+        with self._lock:
+            events = list(self._pending.values())
+            self._pending.clear()
+            dropped, self.dropped = self.dropped, 0
+        return events, dropped
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+class AlertStreamHub:
+    """
+    报警推送的进程内分发中心
+    后台线程 LISTEN alert_events，收到通知（或每 poll_seconds 秒）从 alert_events 表按 id 读取新事件，
+    每批只查询一次数据库，再分发给本进程的全部订阅者；多 worker 部署时各进程独立监听，客户端连到任意进程都能收到。
+    最近 history_size 条事件保存在内存中用于断线续传，更早的从数据库补发
+
+    并发事务的事件不按 id 顺序提交：遇到 id 空洞时暂缓推送其后的事件，空洞提交后按顺序推送，
+    因此 last_id 之前的事件都已推送或确认跳过，按 id 续传不会漏发。发现空洞时记录快照的 xmax，
+    之后的快照 xmin 越过它即说明当时在运行的写事务都已结束，空洞仍未出现就是已回滚，立即跳过；
+    写事务超过 gap_seconds 仍未结束时也跳过。被跳过的 id 在 late_seconds 内提交的仍作为迟到事件补推给在线连接，
+    但不进入续传历史
+    """
+
+    def __init__(self, history_size: int, poll_seconds: float, gap_seconds: float = 5.0, late_seconds: float = 300.0):
+        self.history_size = history_size
+        self.poll_seconds = poll_seconds
+        self.gap_seconds = gap_seconds
+        self.late_seconds = late_seconds
+        self.last_id = 0
+        # (等待的 id, 首次发现空洞的 monotonic 时间, 发现空洞后快照的 xmax)
+        self._gap_since: Optional[Tuple[int, float, Optional[int]]] = None
+        self._skipped: Dict[int, float] = {}  # 跳过的 id -> 跳过时间
+        self.skipped = 0
+        self.late = 0
+        # 内存历史覆盖 (history_floor, last_id] 区间的全部事件
+        self._history: Deque[StreamEvent] = deque()
+        self._history_floor = 0
+        self._subscriptions: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        db = SessionLocal()
+        try:
+            self.last_id = self._history_floor = get_latest_alert_event_id(db)
+        finally:
+            db.close()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="alert-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _listen(self) -> None:
+        connection = engine.raw_connection()
+        try:
+            connection.set_session(autocommit=True)
+            cursor = connection.cursor()
+            cursor.execute(f"LISTEN {ALERT_EVENTS_CHANNEL}")
+            # 监听建立前提交的事件也要读取
+            self.poll()
+            while not self._stop.is_set():
+                timeout = GAP_RECHECK_SECONDS if self._gap_since is not None else self.poll_seconds
+                select.select([connection], [], [], timeout)
+                connection.poll()
+                connection.notifies.clear()
+                # 有通知时读取新事件；超时也读取一次，防止通知丢失
+                self.poll()
+        finally:
+            connection.close()
+
+    def _run(self) -> None:
+        backoff = 1.0
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except Exception:
+                logger.exception("Alert stream listener failed, reconnecting in %.0fs", backoff)
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+    def poll(self) -> int:
+        """读取并分发 last_id 之后连续的新事件和迟到事件，返回事件数"""
+        total = 0
+        db = SessionLocal()
+        try:
+            now = time.monotonic()
+            self._skipped = {event_id: at for event_id, at in self._skipped.items() if now - at < self.late_seconds}
+            if self._skipped:
+                late = [_stream_event(row) for row in get_alert_events_by_ids(db, list(self._skipped))]
+                if late:
+                    self.publish_late(late)
+                    total += len(late)
+            while True:
+                # 快照先于读取：xmin 之前结束的事务提交的事件一定能读到
+                xmin, _ = get_snapshot_xid_bounds(db)
+                rows = get_alert_events_after(db, self.last_id)
+                ready = self._take_ready(rows, xmin)
+                if ready:
+                    self.publish([_stream_event(row) for row in ready])
+                    total += len(ready)
+                if self._gap_since is not None and self._gap_since[2] is None:
+                    # 新发现的空洞：读取之后的快照 xmax 之前已包含空洞所属的事务
+                    xmin, xmax = get_snapshot_xid_bounds(db)
+                    self._gap_since = (self._gap_since[0], self._gap_since[1], xmax)
+                    if xmin >= xmax:
+                        # 没有正在运行的写事务，重新读取一次即可判定
+                        continue
+                if not rows or len(ready) < len(rows):
+                    break
+        finally:
+            db.close()
+        return total
+
+    def _take_ready(self, rows: list, xmin: int) -> list:
+        """
+        按 id 连续取出可以推送的事件；xmin 为读取前的快照下界
+        发现空洞时的写事务都已结束（xmin 越过记录的 xmax）时空洞已回滚，跳过；否则最多等待 gap_seconds
+        """
+        ready = []
+        expected = self.last_id + 1
+        for row in rows:
+            if row.id > expected:
+                now = time.monotonic()
+                if self._gap_since is None or self._gap_since[0] != expected:
+                    self._gap_since = (expected, now, None)
+                    break
+                _, since, xmax = self._gap_since
+                if xmax is None or xmin < xmax:
+                    if now - since < self.gap_seconds:
+                        break
+                    logger.warning(
+                        "Alert events %d-%d still uncommitted after %.0fs, skipping", expected, row.id - 1, self.gap_seconds
+                    )
+                else:
+                    logger.debug("Alert events %d-%d were rolled back, skipping", expected, row.id - 1)
+                for event_id in range(expected, row.id):
+                    self._skipped[event_id] = now
+                self.skipped += row.id - expected
+            ready.append(row)
+            expected = row.id + 1
+        else:
+            self._gap_since = None
+        return ready
+
+    def publish(self, events: List[StreamEvent]) -> None:
+        with self._lock:
+            for event in events:
+                if event.id <= self.last_id:
+                    continue
+                self._history.append(event)
+                if len(self._history) > self.history_size:
+                    self._history_floor = self._history.popleft().id
+                self.last_id = event.id
+                for subscription in self._subscriptions:
+                    subscription.offer(event)
+
+    def publish_late(self, events: List[StreamEvent]) -> None:
+        """补推跳过后才提交的事件，只发给在线连接"""
+        with self._lock:
+            for event in events:
+                if self._skipped.pop(event.id, None) is None:
+                    continue
+                self.late += 1
+                for subscription in self._subscriptions:
+                    subscription.offer(event, late=True)
+
+    def subscribe(self, subscription: Subscription, last_event_id: Optional[int] = None) -> None:
+        """
+        注册订阅（会查询数据库，在线程池中调用）；提供 last_event_id 时先补发其后的事件：
+        内存历史不够早的部分从数据库读取，再在锁内补发内存历史并注册，保证不漏发、不乱序。
+        补发同样经过队列，积压过多时按队列规则合并或丢弃
+        """
+        if last_event_id is None:
+            with self._lock:
+                subscription.last_id = self.last_id
+                self._subscriptions.add(subscription)
+            return
+
+        subscription.last_id = last_event_id
+        while True:
+            with self._lock:
+                if subscription.last_id >= self._history_floor:
+                    for event in self._history:
+                        subscription.offer(event)
+                    self._subscriptions.add(subscription)
+                    return
+                floor = self._history_floor
+            db = SessionLocal()
+            try:
+                # 只补发到内存历史的起点，之后的由内存历史按推送顺序补发
+                rows = [row for row in get_alert_events_after(db, subscription.last_id) if row.id <= floor]
+            finally:
+                db.close()
+            for row in rows:
+                subscription.offer(_stream_event(row))
+            if not rows:
+                # 数据库中已没有更早的事件（已清理或跳过的空洞），直接接上内存历史
+                subscription.last_id = max(subscription.last_id, floor)
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def stats(self) -> dict:
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+            history = len(self._history)
+        return {
+            "running": self.running,
+            "last_event_id": self.last_id,
+            "history": history,
+            "waiting_for_id": self._gap_since[0] if self._gap_since and self._gap_since[0] > self.last_id else None,
+            "skipped": self.skipped,
+            "late": self.late,
+            "subscriptions": len(subscriptions),
+            "pending": sum(subscription.pending() for subscription in subscriptions),
+            "dropped": sum(subscription.dropped for subscription in subscriptions),
+            "coalesced": sum(subscription.coalesced for subscription in subscriptions),
+        }
+
+alert_stream_hub = AlertStreamHub(
+    history_size=settings.ALERT_STREAM_HISTORY_SIZE,
+    poll_seconds=settings.ALERT_STREAM_POLL_SECONDS,
+    gap_seconds=settings.ALERT_STREAM_GAP_SECONDS,
+    late_seconds=settings.ALERT_STREAM_LATE_EVENT_SECONDS
+)
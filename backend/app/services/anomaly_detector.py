@@ -0,0 +1,243 @@
+import logging
+import math
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Set
+import numpy as np
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.anomaly_state import AnomalyDetectorState
+from app.models.environment_data import ENVIRONMENT_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# 每个监控点一个 (字段数, 8) 的 float64 数组，每个字段的状态占一行
+COUNT, MEAN, VARIANCE, BASELINE, CUSUM_POSITIVE, CUSUM_NEGATIVE, LAST_TS, LAST_ALERT = range(8)
+STATE_COLUMNS = 8
+# 漂移检测的基线比均值慢 10 倍，缓慢上升时不会被均值跟上而漏报
+BASELINE_SLOWDOWN = 10
+
+class AnomalyCandidate(NamedTuple):
+    monitoring_point_id: int
+    field: str
+    kind: str  # spike / drift_up / drift_down
+    value: float
+    mean: float
+    std: float
+    score: float  # spike 为 z 分数，drift 为 CUSUM 累积量（以标准差计）
+    confidence: float
+    recorded_at: datetime
+
+def _timestamp(value: Optional[datetime]) -> float:
+    if value is None:
+        return datetime.now(timezone.utc).timestamp()
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+def _datetime(timestamp: float) -> Optional[datetime]:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc) if math.isfinite(timestamp) else None
+
+class AnomalyDetector:
+    """
+    每个监控点每个字段维护 O(1) 的在线统计：EWMA 均值/方差、慢速基线和双侧 CUSUM
+    单点偏离均值超过 z_threshold 个标准差判为突变；相对基线的标准化偏差经 CUSUM 累积超过 cusum_h 判为缓慢漂移。
+    早于已处理时间的读数（补传数据）不参与更新。
+    状态在进程内，多 worker 部署时每个进程只看到自己写入的读数；检查点以最后写入者为准
+    """
+
+    def __init__(
+        self,
+        alpha: float,
+        warmup_samples: int,
+        z_threshold: float,
+        cusum_k: float,
+        cusum_h: float,
+        cooldown_seconds: float
+    ):
+        self.alpha = alpha
+        self.warmup_samples = warmup_samples
+        self.z_threshold = z_threshold
+        self.cusum_k = cusum_k
+        self.cusum_h = cusum_h
+        self.cooldown_seconds = cooldown_seconds
+        self._states: Dict[int, np.ndarray] = {}
+        self._dirty: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def _new_state(self) -> np.ndarray:
+        state = np.zeros((len(ENVIRONMENT_FIELDS), STATE_COLUMNS))
+        state[:, LAST_TS] = -np.inf
+        state[:, LAST_ALERT] = -np.inf
+        return state
+
+    def _std(self, state: np.ndarray) -> np.ndarray:
+        # 传感器量化会让方差为 0，按均值的 1% 设标准差下限，避免微小变化被放大
+        return np.maximum(np.sqrt(state[:, VARIANCE]), np.maximum(np.abs(state[:, MEAN]) * 0.01, 1e-6))
+
+    def _update(self, point_id: int, recorded_at: float, values: np.ndarray) -> List[AnomalyCandidate]:
+        state = self._states.get(point_id)
+        if state is None:
+            state = self._states[point_id] = self._new_state()
+        valid = ~np.isnan(values) & (recorded_at > state[:, LAST_TS])
+        if not valid.any():
+            return []
+
+        warmed = valid & (state[:, COUNT] >= self.warmup_samples)
+        mean = state[:, MEAN].copy()
+        std = self._std(state)
+        z = np.where(warmed, (np.nan_to_num(values) - mean) / std, 0.0)
+        drift_z = np.where(warmed, (np.nan_to_num(values) - state[:, BASELINE]) / std, 0.0)
+        state[:, CUSUM_POSITIVE] = np.where(
+            warmed, np.maximum(0.0, state[:, CUSUM_POSITIVE] + drift_z - self.cusum_k), state[:, CUSUM_POSITIVE]
+        )
+        state[:, CUSUM_NEGATIVE] = np.where(
+            warmed, np.maximum(0.0, state[:, CUSUM_NEGATIVE] - drift_z - self.cusum_k), state[:, CUSUM_NEGATIVE]
+        )
+
+        spike = warmed & (np.abs(z) > self.z_threshold)
+        drift = warmed & ~spike & ((state[:, CUSUM_POSITIVE] > self.cusum_h) | (state[:, CUSUM_NEGATIVE] > self.cusum_h))
+        alarm = (spike | drift) & (recorded_at - state[:, LAST_ALERT] >= self.cooldown_seconds)
+
+        candidates = []
+        for index in np.flatnonzero(alarm).tolist():
+            if spike[index]:
+                kind, score = "spike", float(z[index])
+                confidence = math.erf(abs(score) / math.sqrt(2))
+            else:
+                upward = state[index, CUSUM_POSITIVE] >= state[index, CUSUM_NEGATIVE]
+                kind = "drift_up" if upward else "drift_down"
+                score = float(state[index, CUSUM_POSITIVE if upward else CUSUM_NEGATIVE])
+                # 累积量按 2·s/h 折算为等效 z 分数，达到阈值时约为 0.95
+                confidence = math.erf(2 * score / self.cusum_h / math.sqrt(2))
+                # 报警后以当前均值为新基线，持续的漂移会在冷却期后再次累积
+                state[index, CUSUM_POSITIVE] = state[index, CUSUM_NEGATIVE] = 0.0
+                state[index, BASELINE] = mean[index]
+            state[index, LAST_ALERT] = recorded_at
+            candidates.append(AnomalyCandidate(
+                point_id, ENVIRONMENT_FIELDS[index], kind, float(values[index]), float(mean[index]),
+                float(std[index]), score, round(confidence, 4), _datetime(recorded_at)
+            ))
+
+        # EWMA 均值/方差的增量更新；样本少于 1/alpha 时按累计平均计算，消除首个样本的偏差
+        values = np.nan_to_num(values)
+        first = valid & (state[:, COUNT] == 0)
+        rest = valid & ~first
+        alpha = np.maximum(self.alpha, 1.0 / (state[:, COUNT] + 1))
+        diff = np.where(rest, values - state[:, MEAN], 0.0)
+        increment = alpha * diff
+        state[:, MEAN] = np.where(first, values, state[:, MEAN] + increment)
+        state[:, VARIANCE] = np.where(rest, (1 - alpha) * (state[:, VARIANCE] + diff * increment), state[:, VARIANCE])
+        # 预热期间基线等于均值，之后以慢 BASELINE_SLOWDOWN 倍的速度跟随
+        state[:, BASELINE] = np.where(
+            valid & (state[:, COUNT] < self.warmup_samples), state[:, MEAN],
+            np.where(valid, state[:, BASELINE] + self.alpha / BASELINE_SLOWDOWN * (values - state[:, BASELINE]), state[:, BASELINE])
+        )
+        state[:, COUNT] += valid
+        state[:, LAST_TS] = np.where(valid, recorded_at, state[:, LAST_TS])
+        self._dirty.add(point_id)
+        return candidates
+
+    def observe(self, readings: Sequence[Mapping]) -> List[AnomalyCandidate]:
+        """按采集时间顺序把读数纳入统计，返回检测到的异常"""
+        rows = sorted((
+            (_timestamp(reading.get("recorded_at")), reading["monitoring_point_id"],
+             [np.nan if reading.get(field) is None else reading[field] for field in ENVIRONMENT_FIELDS])
+            for reading in readings
+        ), key=lambda row: (row[0], row[1]))
+        candidates = []
+        with self._lock:
+            for recorded_at, point_id, values in rows:
+                candidates.extend(self._update(point_id, recorded_at, np.array(values, dtype=np.float64)))
+        return candidates
+
+    def load_checkpoint(self, db: Session) -> int:
+        """从检查点表恢复全部状态，返回恢复的监控点数"""
+        field_index = {field: index for index, field in enumerate(ENVIRONMENT_FIELDS)}
+        states: Dict[int, np.ndarray] = {}
+        for row in db.query(AnomalyDetectorState).all():
+            index = field_index.get(row.field)
+            if index is None:
+                continue
+            state = states.get(row.monitoring_point_id)
+            if state is None:
+                state = states[row.monitoring_point_id] = self._new_state()
+            state[index, COUNT] = row.sample_count
+            state[index, MEAN] = row.ewma_mean or 0.0
+            state[index, VARIANCE] = row.ewma_variance or 0.0
+            state[index, BASELINE] = row.ewma_baseline if row.ewma_baseline is not None else state[index, MEAN]
+            state[index, CUSUM_POSITIVE] = row.cusum_positive or 0.0
+            state[index, CUSUM_NEGATIVE] = row.cusum_negative or 0.0
+            state[index, LAST_TS] = _timestamp(row.last_recorded_at) if row.last_recorded_at else -np.inf
+            state[index, LAST_ALERT] = _timestamp(row.last_alert_at) if row.last_alert_at else -np.inf
+        with self._lock:
+            # 启动后已经开始处理的监控点以内存状态为准
+            for point_id, state in states.items():
+                self._states.setdefault(point_id, state)
+        return len(states)
+
+    def save_checkpoint(self, db: Session) -> int:
+        """把上次检查点之后有更新的监控点写入检查点表，返回写入的监控点数"""
+        with self._lock:
+            dirty = list(self._dirty)
+            self._dirty.clear()
+            snapshot = {point_id: self._states[point_id].copy() for point_id in dirty}
+        rows = [
+            {
+                "monitoring_point_id": point_id,
+                "field": field,
+                "sample_count": int(state[index, COUNT]),
+                "ewma_mean": float(state[index, MEAN]),
+                "ewma_variance": float(state[index, VARIANCE]),
+                "ewma_baseline": float(state[index, BASELINE]),
+                "cusum_positive": float(state[index, CUSUM_POSITIVE]),
+                "cusum_negative": float(state[index, CUSUM_NEGATIVE]),
+                "last_recorded_at": _datetime(state[index, LAST_TS]),
+                "last_alert_at": _datetime(state[index, LAST_ALERT]),
+            }
+            for point_id, state in snapshot.items()
+            for index, field in enumerate(ENVIRONMENT_FIELDS)
+            if state[index, COUNT] > 0
+        ]
+        if not rows:
+            return 0
+        statement = insert(AnomalyDetectorState)
+        try:
+            db.execute(statement.on_conflict_do_update(
+                index_elements=["monitoring_point_id", "field"],
+                set_={
+                    **{
+                        column: statement.excluded[column]
+                        for column in rows[0] if column not in ("monitoring_point_id", "field")
+                    },
+                    "updated_at": datetime.now(timezone.utc)
+                }
+            ), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            # 写入失败时下次重试
+            with self._lock:
+                self._dirty.update(dirty)
+            raise
+        return len(snapshot)
+
+    def stats(self) -> dict:
+        with self._lock:
+            points = len(self._states)
+            dirty = len(self._dirty)
+        return {
+            "points": points,
+            "dirty_points": dirty,
+            "state_bytes": points * len(ENVIRONMENT_FIELDS) * STATE_COLUMNS * 8,
+        }
+
+anomaly_detector = AnomalyDetector(
+    alpha=settings.ANOMALY_EWMA_ALPHA,
+    warmup_samples=settings.ANOMALY_WARMUP_SAMPLES,
+    z_threshold=settings.ANOMALY_Z_THRESHOLD,
+    cusum_k=settings.ANOMALY_CUSUM_K,
+    cusum_h=settings.ANOMALY_CUSUM_H,
+    cooldown_seconds=settings.ANOMALY_ALERT_COOLDOWN_SECONDS
+)
@@ -0,0 +1,305 @@
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+from sqlalchemy import String, cast, func, select, text
+from app.models.alert import Alert
+from app.models.environment_data import EnvironmentData, ENVIRONMENT_FIELDS
+from app.models.monitoring_point import MonitoringPoint
+
+# pyarrow 是可选依赖：poetry install -E analytics
+INSTALL_HINT = "pyarrow is not installed, run `poetry install -E analytics`"
+
+DEFAULT_BATCH_SIZE = 50000
+WATERMARK_FILE = "_watermark.json"
+PARTITION_COLUMNS = ("mine_id", "day")
+# 增量导出的安全间隔：取上界后等待，让正在插入的事务分配到事务ID，再等待这些事务结束
+WATERMARK_SAFETY_LAG_SECONDS = 1.0
+IN_FLIGHT_TIMEOUT_SECONDS = 60.0
+
+def _utc_day(column):
+    return func.date(func.timezone("UTC", column))
+
+# 每张表导出的列：(列名, SQL 表达式, 列类型)
+EXPORT_TABLES = {
+    "environment_data": {
+        "model": EnvironmentData,
+        "columns": [
+            ("id", EnvironmentData.id, "int64"),
+            ("mine_id", MonitoringPoint.mine_id, "int32"),
+            ("monitoring_point_id", EnvironmentData.monitoring_point_id, "int32"),
+            ("recorded_at", EnvironmentData.recorded_at, "timestamp"),
+            ("day", _utc_day(EnvironmentData.recorded_at), "date"),
+        ] + [
+            (field, getattr(EnvironmentData, field), "float32") for field in ENVIRONMENT_FIELDS
+        ] + [
+            ("ventilation_status", EnvironmentData.ventilation_status, "bool"),
+            ("emergency_system_status", EnvironmentData.emergency_system_status, "bool"),
+        ],
+        "time_column": EnvironmentData.recorded_at,
+    },
+    "alerts": {
+        "model": Alert,
+        "columns": [
+            ("id", Alert.id, "int64"),
+            ("mine_id", MonitoringPoint.mine_id, "int32"),
+            ("monitoring_point_id", Alert.monitoring_point_id, "int32"),
+            ("detected_at", Alert.detected_at, "timestamp"),
+            ("day", _utc_day(Alert.detected_at), "date"),
+            ("alert_type", cast(Alert.alert_type, String), "dictionary"),
+            ("severity", cast(Alert.severity, String), "dictionary"),
+            ("status", cast(Alert.status, String), "dictionary"),
+            ("confidence_score", Alert.confidence_score, "float32"),
+            ("title", Alert.title, "string"),
+            ("acknowledged_at", Alert.acknowledged_at, "timestamp"),
+            ("resolved_at", Alert.resolved_at, "timestamp"),
+        ],
+        "time_column": Alert.detected_at,
+    },
+}
+
+def require_pyarrow():
+    """按需导入 pyarrow，未安装时抛出带安装提示的 RuntimeError"""
+    try:
+        import pyarrow
+    except ImportError as exc:
+        raise RuntimeError(INSTALL_HINT) from exc
+    return pyarrow
+
+def _arrow_type(pa, kind: str):
+    return {
+        "int64": pa.int64(),
+        "int32": pa.int32(),
+        "float32": pa.float32(),
+        "bool": pa.bool_(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+        "date": pa.date32(),
+        "string": pa.string(),
+        "dictionary": pa.dictionary(pa.int32(), pa.string()),
+    }[kind]
+
+def arrow_schema(table: str):
+    pa = require_pyarrow()
+    return pa.schema([(name, _arrow_type(pa, kind)) for name, _, kind in EXPORT_TABLES[table]["columns"]])
+
+def build_export_query(
+    table: str,
+    mine_id: Optional[int] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    since_id: Optional[int] = None,
+    until_id: Optional[int] = None
+):
+    """按 id 升序导出，便于用最大 id 作为增量水位线"""
+    spec = EXPORT_TABLES[table]
+    model = spec["model"]
+    query = select(*[expression.label(name) for name, expression, _ in spec["columns"]]).join(
+        MonitoringPoint, model.monitoring_point_id == MonitoringPoint.id
+    )
+    if mine_id is not None:
+        query = query.where(MonitoringPoint.mine_id == mine_id)
+    if start_time is not None:
+        query = query.where(spec["time_column"] >= start_time)
+    if end_time is not None:
+        query = query.where(spec["time_column"] <= end_time)
+    if since_id is not None:
+        query = query.where(model.id > since_id)
+    if until_id is not None:
+        query = query.where(model.id <= until_id)
+    return query.order_by(model.id.asc())
+
+def iter_record_batches(conn, table: str, batch_size: int = DEFAULT_BATCH_SIZE, **filters) -> Iterator:
+    """
+    用服务端游标逐批读取，并把每批行元组直接转置成 Arrow 列
+    不构造逐行字典；枚举列字典编码，传感器数值为 float32
+    """
+    pa = require_pyarrow()
+    columns = EXPORT_TABLES[table]["columns"]
+    schema = arrow_schema(table)
+    result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(
+        build_export_query(table, **filters)
+    )
+    try:
+        for rows in result.partitions():
+            arrays = []
+            for (name, _, kind), values in zip(columns, zip(*rows)):
+                if kind == "dictionary":
+                    arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+                else:
+                    arrays.append(pa.array(values, type=_arrow_type(pa, kind)))
+            yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+    finally:
+        result.close()
+
+def load_watermark(output_dir: Path) -> dict:
+    path = Path(output_dir) / WATERMARK_FILE
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+def watermark_key(
+    table: str,
+    mine_id: Optional[int] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None
+) -> str:
+    """水位线按过滤条件分别记录，无过滤条件时为表名（兼容已有的水位线文件）"""
+    filters = [
+        f"{name}={value.isoformat() if isinstance(value, datetime) else value}"
+        for name, value in (("mine_id", mine_id), ("start_time", start_time), ("end_time", end_time))
+        if value is not None
+    ]
+    return f"{table}?{'&'.join(filters)}" if filters else table
+
+def _snapshot_bound(conn, name: str) -> int:
+    return conn.execute(text(f"SELECT pg_snapshot_{name}(pg_current_snapshot())::text::bigint")).scalar()
+
+def safe_upper_id(conn, table: str) -> Optional[int]:
+    """
+    增量导出的 id 上界：不大于它的 id 要么已提交可见，要么不会再出现
+    并发事务不按 id 顺序提交，直接用已导出的最大 id 作为水位线会跳过尚未提交的较小 id；
+    这里取当前最大 id 后等待所有此前开始的写事务结束（pg_snapshot_xmin 越过当时的 xmax）
+    """
+    model = EXPORT_TABLES[table]["model"]
+    upper = conn.execute(select(func.max(model.id))).scalar()
+    if upper is None:
+        return None
+    time.sleep(WATERMARK_SAFETY_LAG_SECONDS)
+    xmax = _snapshot_bound(conn, "xmax")
+    deadline = time.monotonic() + IN_FLIGHT_TIMEOUT_SECONDS
+    while _snapshot_bound(conn, "xmin") < xmax:
+        if time.monotonic() > deadline:
+            raise RuntimeError(
+                f"Transactions older than the export did not finish within {IN_FLIGHT_TIMEOUT_SECONDS:.0f}s, retry later"
+            )
+        time.sleep(0.1)
+    return upper
+
+def save_watermark(output_dir: Path, watermark: dict) -> None:
+    """先写临时文件再原子替换，避免中断时留下半个水位线文件"""
+    path = Path(output_dir) / WATERMARK_FILE
+    temp_path = path.with_suffix(".tmp")
+    temp_path.write_text(json.dumps(watermark, indent=2, ensure_ascii=False))
+    os.replace(temp_path, path)
+
+def export_dataset(
+    conn,
+    output_dir: Path,
+    table: str,
+    file_format: str = "parquet",
+    incremental: bool = True,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    mine_id: Optional[int] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None
+) -> dict:
+    """
+    导出为按 mine_id=<id>/day=<YYYY-MM-DD> 分区（hive 风格）的 Parquet 或 Arrow IPC 数据集
+    incremental 时只导出上次水位线之后的新行，每次运行写入新的 part 文件。
+    水位线按 (表, 过滤条件) 记录，只推进到 safe_upper_id，不会跳过导出时尚未提交的行；
+    不同过滤条件的增量导出应写入不同目录，否则重叠的行会重复。
+    报警的状态变更不会改变 id，增量导出只包含新报警；需要最新状态时做一次全量导出。
+    """
+    pa = require_pyarrow()
+    import pyarrow.dataset as ds
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    watermark = load_watermark(output_dir)
+    key = watermark_key(table, mine_id, start_time, end_time)
+    since_id = until_id = None
+    if incremental:
+        since_id = watermark.get(key, {}).get("last_id")
+        until_id = safe_upper_id(conn, table)
+        if until_id is None or (since_id is not None and until_id <= since_id):
+            return {"table": table, "rows": 0, "batches": 0, "last_id": since_id}
+
+    progress = {"rows": 0, "batches": 0, "last_id": since_id}
+
+    def tracked_batches():
+        for batch in iter_record_batches(
+            conn, table, batch_size,
+            mine_id=mine_id, start_time=start_time, end_time=end_time, since_id=since_id, until_id=until_id
+        ):
+            progress["rows"] += batch.num_rows
+            progress["batches"] += 1
+            progress["last_id"] = batch.column(0)[-1].as_py()
+            yield batch
+
+    schema = arrow_schema(table)
+    if file_format == "parquet":
+        file_options = ds.ParquetFileFormat().make_write_options(compression="zstd")
+        extension = "parquet"
+    else:
+        file_options = ds.IpcFileFormat().make_write_options(compression="zstd")
+        extension = "arrow"
+
+    run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:8]
+    ds.write_dataset(
+        tracked_batches(),
+        base_dir=str(output_dir / table),
+        schema=schema,
+        format=file_format,
+        file_options=file_options,
+        partitioning=ds.partitioning(
+            pa.schema([(name, schema.field(name).type) for name in PARTITION_COLUMNS]), flavor="hive"
+        ),
+        basename_template=f"part-{run_id}-{{i}}.{extension}",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+
+    if incremental:
+        # 过滤条件排除的行也不会再出现在该过滤条件下，水位线推进到上界而不是最后导出的 id
+        progress["last_id"] = until_id
+        watermark[key] = {"last_id": until_id, "exported_at": datetime.now(timezone.utc).isoformat()}
+        save_watermark(output_dir, watermark)
+    return {"table": table, "rows": progress["rows"], "batches": progress["batches"], "last_id": progress["last_id"]}
+
+class _ChunkSink:
+    """供 pyarrow 写入的内存缓冲，每写完一批取走已写出的字节"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def stream_arrow_ipc(conn, table: str, batch_size: int = DEFAULT_BATCH_SIZE, **filters) -> Iterator[bytes]:
+    """以 Arrow IPC 流格式逐批输出，客户端可用 pyarrow.ipc.open_stream 读取"""
+    pa = require_pyarrow()
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(sink, arrow_schema(table)) as writer:
+        yield sink.drain()
+        for batch in iter_record_batches(conn, table, batch_size, **filters):
+            writer.write_batch(batch)
+            yield sink.drain()
+    yield sink.drain()
+
+def write_parquet_file(conn, table: str, target, batch_size: int = DEFAULT_BATCH_SIZE, **filters) -> Tuple[int, int]:
+    """把查询结果写成单个 Parquet 文件（每批一个 row group），返回 (行数, 批数)"""
+    require_pyarrow()
+    import pyarrow.parquet as pq
+
+    rows = batches = 0
+    with pq.ParquetWriter(target, arrow_schema(table), compression="zstd") as writer:
+        for batch in iter_record_batches(conn, table, batch_size, **filters):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+            batches += 1
+    return rows, batches
@@ -0,0 +1,320 @@
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.crud.alert import create_alerts_bulk, extend_open_alerts, get_open_alerts_last_seen_by_key
+from app.models.alert import AlertStatus, AlertType
+from app.schemas.detection import DetectionCreate
+from app.services.point_registry import monitoring_point_registry
+from app.services.rule_engine import SEVERITY_RANK
+
+logger = logging.getLogger(__name__)
+
+# 报警标题使用的类型名称
+ALERT_TYPE_LABELS = {
+    AlertType.DANGEROUS_ACTION: "危险动作",
+    AlertType.EQUIPMENT_FAILURE: "设备故障",
+    AlertType.ENVIRONMENTAL_HAZARD: "环境危险",
+    AlertType.SAFETY_VIOLATION: "违规行为",
+    AlertType.SYSTEM_ERROR: "系统异常",
+}
+
+def detection_alert_key(alert_type: AlertType) -> str:
+    return f"detection:{alert_type.value}"
+
+def confidence_floor(alert_type: AlertType) -> float:
+    """报警类型的置信度下限，未单独配置时使用默认值"""
+    return settings.DETECTION_CONFIDENCE_FLOORS.get(alert_type.value, settings.DETECTION_DEFAULT_CONFIDENCE_FLOOR)
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+class _DetectionGroup:
+    """同一 (监控点, 报警类型) 的一组检测：时间范围、次数、最高置信度和严重程度，报警内容取置信度最高的一次"""
+    __slots__ = ("first_at", "last_at", "count", "severity", "top")
+
+    def __init__(self, detection: DetectionCreate, detected_at: datetime):
+        self.first_at = self.last_at = detected_at
+        self.count = 1
+        self.severity = detection.severity
+        self.top = detection
+
+    def add(self, detection: DetectionCreate, detected_at: datetime) -> None:
+        self.first_at = min(self.first_at, detected_at)
+        self.last_at = max(self.last_at, detected_at)
+        self.count += 1
+        if SEVERITY_RANK[detection.severity] > SEVERITY_RANK[self.severity]:
+            self.severity = detection.severity
+        if detection.confidence_score > self.top.confidence_score:
+            self.top = detection
+
+    def merge(self, other: "_DetectionGroup") -> None:
+        self.first_at = min(self.first_at, other.first_at)
+        self.last_at = max(self.last_at, other.last_at)
+        self.count += other.count
+        if SEVERITY_RANK[other.severity] > SEVERITY_RANK[self.severity]:
+            self.severity = other.severity
+        if other.top.confidence_score > self.top.confidence_score:
+            self.top = other.top
+
+    def alert_row(self, alert_key: str) -> dict:
+        """新建报警时插入的字段"""
+        top = self.top
+        return {
+            "monitoring_point_id": top.monitoring_point_id,
+            "alert_type": top.alert_type,
+            "severity": self.severity,
+            "status": AlertStatus.ACTIVE,
+            "title": top.title or f"检测到{ALERT_TYPE_LABELS.get(top.alert_type, top.alert_type.value)}",
+            "description": top.description,
+            "confidence_score": top.confidence_score,
+            "image_url": top.image_url,
+            "video_url": top.video_url,
+            "location_details": top.location_details,
+            "equipment_id": top.equipment_id,
+            "alert_key": alert_key,
+            "detected_at": self.first_at,
+            "last_seen_at": self.last_at,
+            "occurrence_count": self.count,
+        }
+
+    def extend_row(self, alert_id: int) -> dict:
+        """合并到已有报警的字段（extend_open_alerts 的一项）"""
+        return {
+            "id": alert_id,
+            "peak_value": None,
+            "direction": "max",
+            "last_seen_at": self.last_at,
+            "occurrence_count": self.count,
+            "severity": self.severity,
+            "confidence_score": self.top.confidence_score,
+        }
+
+class _KeyState:
+    __slots__ = ("alert_id", "last_seen", "pending")
+
+    def __init__(self, alert_id: Optional[int], last_seen: datetime):
+        self.alert_id = alert_id  # 当前事件对应的报警，None 表示正在查找或新建
+        self.last_seen = last_seen  # 最近一次检测时间，含尚未写入的
+        self.pending: Optional[_DetectionGroup] = None  # 尚未写入该报警的检测
+
+    def add_pending(self, group: _DetectionGroup) -> None:
+        if self.pending is None:
+            self.pending = group
+        else:
+            self.pending.merge(group)
+
+class DetectionIngestor:
+    """
+    AI 检测的批量接入，键为 (监控点ID, 报警类型)
+    - 低于类型置信度下限的检测直接丢弃；监控点用进程内ID集合校验
+    - 距该键上次检测不超过 merge_window 的检测属于同一事件，只在内存中累加（次数、最后出现时间、最高置信度），
+      每 DETECTION_FLUSH_SECONDS 秒由 flush() 用一条 UPDATE 写入各报警；报警已被关闭时改为新建
+    - 超出窗口或没有未关闭的报警时新建报警，每批一条多行 INSERT
+    键状态在进程内；首次遇到的键按 ix_alerts_open_key 查找未关闭的报警，重启或多 worker 时沿用同一条报警。
+    锁只保护内存状态，查询和提交在锁外进行：正在新建报警的键先占位，期间到达的检测累加到占位状态，
+    提交后再在锁内核对状态是否已被新事件替换
+    """
+
+    def __init__(self, merge_window_seconds: float):
+        self.merge_window = timedelta(seconds=merge_window_seconds)
+        self._states: Dict[tuple, _KeyState] = {}
+        # 已进入新事件的旧报警 -> (键, 尚未写入的检测)，只合并不重新打开
+        self._retired: Dict[int, Tuple[tuple, _DetectionGroup]] = {}
+        # 新建报警失败时占位状态上累加的检测，下次刷写时新建报警
+        self._orphans: List[Tuple[tuple, _DetectionGroup]] = []
+        self._lock = threading.Lock()
+        self._totals = {"received": 0, "below_confidence": 0, "unknown_point": 0, "merged": 0, "created": 0, "flushed": 0}
+
+    def ingest(self, db: Session, detections: Sequence[DetectionCreate]) -> dict:
+        """过滤并合并一批检测，新建的报警在返回前提交"""
+        now = datetime.now(timezone.utc)
+        candidates = [
+            detection for detection in detections
+            if detection.confidence_score >= confidence_floor(detection.alert_type)
+        ]
+        unknown = monitoring_point_registry.unknown(
+            {detection.monitoring_point_id for detection in candidates}
+        ) if candidates else set()
+
+        groups: Dict[tuple, _DetectionGroup] = {}
+        unknown_count = 0
+        for detection in candidates:
+            if detection.monitoring_point_id in unknown:
+                unknown_count += 1
+                continue
+            detected_at = _utc(detection.detected_at) or now
+            key = (detection.monitoring_point_id, detection_alert_key(detection.alert_type))
+            group = groups.get(key)
+            if group is None:
+                groups[key] = _DetectionGroup(detection, detected_at)
+            else:
+                group.add(detection, detected_at)
+
+        merged, created_ids = self._process(db, groups) if groups else (0, [])
+        below = len(detections) - len(candidates)
+        with self._lock:
+            self._totals["received"] += len(detections)
+            self._totals["below_confidence"] += below
+            self._totals["unknown_point"] += unknown_count
+        return {
+            "total": len(detections),
+            "accepted": len(candidates) - unknown_count,
+            "below_confidence": below,
+            "unknown_point": unknown_count,
+            "unknown_point_ids": sorted(unknown),
+            "merged": merged,
+            "created_alert_ids": created_ids,
+        }
+
+    def _retire_pending(self, alert_id: int, key: tuple, group: _DetectionGroup) -> None:
+        pending = self._retired.get(alert_id)
+        if pending is None:
+            self._retired[alert_id] = (key, group)
+        else:
+            pending[1].merge(group)
+
+    def _detach(self, key: tuple, state: _KeyState) -> None:
+        """状态已被新事件替换：累加的检测转为只合并到原报警；正在新建的由新建方完成后处理"""
+        if state.pending is not None and state.alert_id is not None:
+            self._retire_pending(state.alert_id, key, state.pending)
+            state.pending = None
+
+    def _process(self, db: Session, groups: Dict[tuple, _DetectionGroup]) -> Tuple[int, List[int]]:
+        merged = 0
+        claimed: List[Tuple[tuple, _KeyState, _DetectionGroup]] = []
+        with self._lock:
+            for key, group in groups.items():
+                state = self._states.get(key)
+                if state is not None and group.first_at - state.last_seen <= self.merge_window:
+                    state.add_pending(group)
+                    state.last_seen = max(state.last_seen, group.last_at)
+                    merged += group.count
+                    continue
+                if state is not None:
+                    self._detach(key, state)
+                # 占位，查找或新建期间同一键的检测累加到这里
+                state = self._states[key] = _KeyState(None, group.last_at)
+                claimed.append((key, state, group))
+            self._totals["merged"] += merged
+        if not claimed:
+            return merged, []
+
+        try:
+            open_alerts = get_open_alerts_last_seen_by_key(db, [key for key, _, _ in claimed])
+            adopted, to_create = [], []
+            for key, state, group in claimed:
+                found = open_alerts.get(key)
+                if found is not None and group.first_at - found[1] <= self.merge_window:
+                    adopted.append((key, state, group, found))
+                else:
+                    to_create.append((key, state, group))
+            alert_ids = create_alerts_bulk(db, [group.alert_row(key[1]) for key, _, group in to_create])
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                for key, state, _ in claimed:
+                    if self._states.get(key) is state:
+                        del self._states[key]
+                    if state.pending is not None:
+                        self._orphans.append((key, state.pending))
+                        state.pending = None
+            raise
+
+        with self._lock:
+            for key, state, group, (alert_id, last_seen) in adopted:
+                state.alert_id = alert_id
+                state.last_seen = max(state.last_seen, last_seen)
+                state.add_pending(group)
+                if self._states.get(key) is not state:
+                    self._detach(key, state)
+            for (key, state, _), alert_id in zip(to_create, alert_ids):
+                state.alert_id = alert_id
+                if self._states.get(key) is not state:
+                    self._detach(key, state)
+            adopted_count = sum(group.count for _, _, group, _ in adopted)
+            self._totals["merged"] += adopted_count
+            self._totals["created"] += len(alert_ids)
+        return merged + adopted_count, alert_ids
+
+    def flush(self, db: Session) -> int:
+        """
+        把累加的重复检测写入报警（一条 UPDATE），返回写入的报警数
+        报警已被关闭且该键仍在同一事件中时，用累加的检测新建报警；已进入新事件的旧检测只合并，不重新打开
+        """
+        with self._lock:
+            current = [
+                (key, state, state.alert_id, state.pending) for key, state in self._states.items()
+                if state.alert_id is not None and state.pending is not None
+            ]
+            for _, state, _, _ in current:
+                state.pending = None
+            retired, self._retired = self._retired, {}
+            orphans, self._orphans = self._orphans, []
+        if not (current or retired or orphans):
+            return 0
+
+        by_alert = {alert_id: group for _, _, alert_id, group in current}
+        absorbed = set()
+        for alert_id, (_, group) in retired.items():
+            if alert_id in by_alert:
+                # 同一报警只写一行，失败时随当前状态一起放回
+                by_alert[alert_id].merge(group)
+                absorbed.add(alert_id)
+            else:
+                by_alert[alert_id] = group
+        try:
+            extended = extend_open_alerts(db, [group.extend_row(alert_id) for alert_id, group in by_alert.items()])
+            reopen = [(key, state, alert_id, group) for key, state, alert_id, group in current if alert_id not in extended]
+            create = [(key, group) for key, _, _, group in reopen] + orphans
+            alert_ids = create_alerts_bulk(db, [group.alert_row(key[1]) for key, group in create])
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                # 放回，下次刷写重试
+                for key, state, alert_id, group in current:
+                    if state.alert_id == alert_id and self._states.get(key) is state:
+                        if state.pending is not None:
+                            group.merge(state.pending)
+                        state.pending = group
+                    else:
+                        self._retire_pending(alert_id, key, group)
+                for alert_id, (key, group) in retired.items():
+                    if alert_id not in absorbed:
+                        self._retire_pending(alert_id, key, group)
+                self._orphans.extend(orphans)
+            raise
+
+        with self._lock:
+            for (_, state, old_id, _), alert_id in zip(reopen, alert_ids):
+                # 刷写期间累加的检测跟随到新报警
+                if state.alert_id == old_id:
+                    state.alert_id = alert_id
+                moved = self._retired.pop(old_id, None)
+                if moved is not None:
+                    self._retire_pending(alert_id, *moved)
+            self._totals["flushed"] += len(extended)
+            self._totals["created"] += len(alert_ids)
+        if alert_ids:
+            logger.info("Detection flush extended %d alerts and created %d for closed ones", len(extended), len(alert_ids))
+        return len(extended)
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = [state.pending for state in self._states.values() if state.pending is not None]
+            pending += [group for _, group in self._retired.values()] + [group for _, group in self._orphans]
+            return {
+                "keys": len(self._states),
+                "pending_alerts": len(pending),
+                "pending_detections": sum(group.count for group in pending),
+                **self._totals,
+                "point_registry": monitoring_point_registry.stats(),
+            }
+
+detection_ingestor = DetectionIngestor(merge_window_seconds=settings.DETECTION_MERGE_WINDOW_SECONDS)
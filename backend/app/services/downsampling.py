@@ -0,0 +1,40 @@
+from typing import List, Sequence, Tuple
+
+def largest_triangle_three_buckets(points: Sequence[Tuple[float, float]], threshold: int) -> List[int]:
+    """
+    Largest-Triangle-Three-Buckets 降采样
+    points 为按 x 升序的 (x, y) 序列，返回保留点的下标；首尾点总是保留
+    """
+    count = len(points)
+    if threshold >= count or threshold < 3:
+        return list(range(count))
+
+    selected = [0]
+    bucket_size = (count - 2) / (threshold - 2)
+    previous = 0
+
+    for bucket in range(threshold - 2):
+        # 下一个桶的平均点作为三角形的第三个顶点
+        next_start = int((bucket + 1) * bucket_size) + 1
+        next_end = min(int((bucket + 2) * bucket_size) + 1, count)
+        if next_start >= next_end:
+            next_start, next_end = count - 1, count
+        next_len = next_end - next_start
+        avg_x = sum(points[i][0] for i in range(next_start, next_end)) / next_len
+        avg_y = sum(points[i][1] for i in range(next_start, next_end)) / next_len
+
+        # 当前桶中与前一选中点、下一桶平均点构成最大三角形的点
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        prev_x, prev_y = points[previous]
+        best_index, best_area = start, -1.0
+        for i in range(start, end):
+            x, y = points[i]
+            area = abs((prev_x - avg_x) * (y - prev_y) - (prev_x - x) * (avg_y - prev_y))
+            if area > best_area:
+                best_index, best_area = i, area
+        selected.append(best_index)
+        previous = best_index
+
+    selected.append(count - 1)
+    return selected
@@ -0,0 +1,212 @@
+import logging
+import queue
+import threading
+import time
+from typing import List
+from sqlalchemy.exc import OperationalError
+from app.core.config import settings
+from app.crud import environment_data as crud_environment_data
+from app.database.database import SessionLocal
+from app.schemas.environment_data import EnvironmentDataCreate
+from app.services import ingest
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRY_BACKOFF_SECONDS = 30.0
+
+class WriteBufferFullError(Exception):
+    """写缓冲队列已满"""
+
+class EnvironmentDataWriteBuffer:
+    """
+    环境数据写缓冲：请求只做内存入队，后台线程按行数或时间阈值在一个事务内批量提交
+    入队即已向客户端确认，数据库暂时不可用时整批按指数退避重试，重试期间不取新数据，队列满后新请求返回503；
+    重试用尽或遇到非暂时性错误才计为失败。规则评估、异常检测和防抖每批只执行一次，重试时只重新插入。
+    停止时退避等待立即结束，由刷写线程自己写完队列中剩余的数据
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        batch_size: int,
+        flush_interval_ms: int,
+        max_retries: int = 5,
+        retry_backoff_ms: int = 500,
+        session_factory=SessionLocal
+    ):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff_ms / 1000
+        self.session_factory = session_factory
+        self._queue = queue.Queue(maxsize=max_size)
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._processed = False  # 当前批次是否已执行过报警评估（只由刷写线程访问）
+        self._stats_lock = threading.Lock()
+        self._enqueued = 0
+        self._rejected_full = 0
+        self._flushed_rows = 0
+        self._invalid_rows = 0
+        self._failed_rows = 0
+        self._retries = 0
+        self._flush_count = 0
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """启动后台刷写线程"""
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="environment-write-buffer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止后台线程，并把队列中剩余的数据全部写入数据库"""
+        self._stop_event.set()
+        if self._thread is not None:
+            # 刷写线程退出前自己清空队列，这里等待它完成，避免两个线程同时写入
+            self._thread.join()
+            self._thread = None
+        else:
+            self._drain()
+
+    def enqueue(self, item: EnvironmentDataCreate) -> None:
+        """入队一条环境数据，队列已满时抛出 WriteBufferFullError"""
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._stats_lock:
+                self._rejected_full += 1
+            raise WriteBufferFullError("Environment data write buffer is full")
+        with self._stats_lock:
+            self._enqueued += 1
+
+    def stats(self) -> dict:
+        """队列深度与刷写延迟计数"""
+        with self._stats_lock:
+            return {
+                "running": self.running,
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self.max_size,
+                "enqueued": self._enqueued,
+                "rejected_full": self._rejected_full,
+                "flushed_rows": self._flushed_rows,
+                "invalid_rows": self._invalid_rows,
+                "failed_rows": self._failed_rows,
+                "retries": self._retries,
+                "flush_count": self._flush_count,
+                "last_flush_ms": round(self._last_flush_ms, 3),
+                "avg_flush_ms": round(self._total_flush_ms / self._flush_count, 3) if self._flush_count else 0.0,
+                "max_flush_ms": round(self._max_flush_ms, 3)
+            }
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            batch = self._collect()
+            if batch:
+                self._flush(batch)
+        self._drain()
+
+    def _collect(self) -> List[EnvironmentDataCreate]:
+        """等待第一条数据，然后在时间窗口内尽量凑满一批"""
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain(self) -> None:
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            self._flush(batch)
+
+    def _write(self, batch: List[EnvironmentDataCreate], process_readings: bool) -> dict:
+        db = self.session_factory()
+        try:
+            result, rows = crud_environment_data.insert_environment_data_batch(db, batch)
+            if rows and process_readings:
+                # 评估会更新进程内的检测和防抖状态，提交失败后重试也不再执行
+                self._processed = True
+                ingest.process_ingested_readings(db, rows)
+            crud_environment_data.commit_environment_data_batch(db, rows)
+            return result
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _flush(self, batch: List[EnvironmentDataCreate]) -> None:
+        started = time.perf_counter()
+        attempt = 0
+        self._processed = False
+        while True:
+            try:
+                result = self._write(batch, process_readings=not self._processed)
+                break
+            except OperationalError as exc:
+                # 断连、死锁、序列化失败等暂时性错误，退避后整批重试
+                if attempt >= self.max_retries:
+                    logger.exception("Failed to flush %d buffered environment readings after %d retries",
+                                     len(batch), attempt)
+                    self._fail(batch)
+                    return
+                delay = min(self.retry_backoff * 2 ** attempt, MAX_RETRY_BACKOFF_SECONDS)
+                attempt += 1
+                logger.warning("Flushing %d buffered environment readings failed (%s), retry %d/%d in %.1fs",
+                               len(batch), exc.orig or exc, attempt, self.max_retries, delay)
+                with self._stats_lock:
+                    self._retries += 1
+                # 停止时不再等待，剩余的重试立即进行
+                self._stop_event.wait(delay)
+            except Exception:
+                logger.exception("Failed to flush %d buffered environment readings", len(batch))
+                self._fail(batch)
+                return
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if result["rejected"]:
+            logger.warning("Dropped %d buffered readings for unknown monitoring points", result["rejected"])
+        with self._stats_lock:
+            self._flushed_rows += result["created"]
+            self._invalid_rows += result["rejected"]
+            self._flush_count += 1
+            self._last_flush_ms = elapsed_ms
+            self._total_flush_ms += elapsed_ms
+            self._max_flush_ms = max(self._max_flush_ms, elapsed_ms)
+
+    def _fail(self, batch: List[EnvironmentDataCreate]) -> None:
+        with self._stats_lock:
+            self._failed_rows += len(batch)
+
+environment_write_buffer = EnvironmentDataWriteBuffer(
+    max_size=settings.ENVIRONMENT_WRITE_BUFFER_MAX_SIZE,
+    batch_size=settings.ENVIRONMENT_WRITE_BUFFER_BATCH_SIZE,
+    flush_interval_ms=settings.ENVIRONMENT_WRITE_BUFFER_FLUSH_INTERVAL_MS,
+    max_retries=settings.ENVIRONMENT_WRITE_BUFFER_MAX_RETRIES,
+    retry_backoff_ms=settings.ENVIRONMENT_WRITE_BUFFER_RETRY_BACKOFF_MS
+)
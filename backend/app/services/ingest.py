@@ -0,0 +1,143 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Mapping, Sequence
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.crud.environment_data import get_readings_before
+from app.models.alert import AlertSeverity, AlertStatus, AlertType
+from app.services.alert_debouncer import AlertSignal, alert_debouncer
+from app.services.anomaly_detector import AnomalyCandidate, anomaly_detector
+from app.services.latest_cache import latest_reading_cache
+from app.services.rule_engine import ENVIRONMENT_FIELD_LABELS, threshold_rule_engine
+from app.services.rule_evaluator import AlertCandidate, EvaluationResult, evaluate_batch, pack_readings
+
+ANOMALY_TITLES = {"spike": "突变", "drift_up": "持续升高", "drift_down": "持续降低"}
+
+def rule_alert_key(rule_type, field: str) -> str:
+    return f"{rule_type.value}:{field}"
+
+def anomaly_alert_key(field: str) -> str:
+    return f"anomaly:{field}"
+
+def _rule_signal(candidate: AlertCandidate) -> AlertSignal:
+    rule = candidate.rule
+    label = ENVIRONMENT_FIELD_LABELS.get(rule.field, rule.field)
+    if candidate.direction == "rate":
+        title = f"{label}变化过快"
+        description = f"{label}每分钟变化 {candidate.value:g}，超过上限 {candidate.threshold:g}"
+    elif candidate.direction == "above":
+        title = f"{label}超限"
+        description = f"{label} {candidate.value:g} 高于上限 {candidate.threshold:g}"
+    else:
+        title = f"{label}过低"
+        description = f"{label} {candidate.value:g} 低于下限 {candidate.threshold:g}"
+    description += f"（规则 #{rule.id}）"
+    return AlertSignal(
+        monitoring_point_id=candidate.monitoring_point_id,
+        alert_key=rule_alert_key(rule.rule_type, rule.field),
+        first_at=candidate.first_at,
+        last_at=candidate.last_at,
+        count=candidate.count,
+        peak_value=candidate.value,
+        direction="min" if candidate.direction == "below" else "max",
+        severity=rule.severity,
+        confidence_score=None,
+        min_duration_seconds=settings.ALERT_MIN_DURATION_SECONDS if rule.min_duration_seconds is None else rule.min_duration_seconds,
+        suppress_seconds=settings.ALERT_SUPPRESS_SECONDS if rule.suppress_seconds is None else rule.suppress_seconds,
+        alert={
+            "monitoring_point_id": candidate.monitoring_point_id,
+            "alert_type": AlertType.ENVIRONMENTAL_HAZARD,
+            "severity": rule.severity,
+            "status": AlertStatus.ACTIVE,
+            "title": title,
+            "description": description,
+        },
+    )
+
+def _anomaly_signals(candidates: List[AnomalyCandidate]) -> List[AlertSignal]:
+    """同一监控点同一字段的多次异常合并为一个信号，取置信度最高的一次"""
+    grouped: Dict[tuple, List[AnomalyCandidate]] = {}
+    for candidate in candidates:
+        grouped.setdefault((candidate.monitoring_point_id, candidate.field), []).append(candidate)
+
+    signals = []
+    for (point_id, field), items in grouped.items():
+        top = max(items, key=lambda item: item.confidence)
+        label = ENVIRONMENT_FIELD_LABELS.get(field, field)
+        if top.kind == "spike":
+            detail = f"偏离 {top.score:+.1f} 个标准差"
+        else:
+            detail = f"CUSUM 累积 {top.score:.1f} 个标准差"
+        severity = AlertSeverity.HIGH if top.confidence >= 0.999 else AlertSeverity.MEDIUM
+        downward = top.kind == "drift_down" or (top.kind == "spike" and top.score < 0)
+        signals.append(AlertSignal(
+            monitoring_point_id=point_id,
+            alert_key=anomaly_alert_key(field),
+            first_at=min(item.recorded_at for item in items),
+            last_at=max(item.recorded_at for item in items),
+            count=len(items),
+            peak_value=top.value,
+            direction="min" if downward else "max",
+            severity=severity,
+            confidence_score=top.confidence,
+            # 检测器自身有冷却时间，异常不再要求持续时间
+            min_duration_seconds=0,
+            suppress_seconds=settings.ALERT_SUPPRESS_SECONDS,
+            alert={
+                "monitoring_point_id": point_id,
+                "alert_type": AlertType.ENVIRONMENTAL_HAZARD,
+                "severity": severity,
+                "status": AlertStatus.ACTIVE,
+                "title": f"{label}异常{ANOMALY_TITLES[top.kind]}",
+                "description": f"{label} {top.value:g}，近期均值 {top.mean:.4g}、标准差 {top.std:.3g}，{detail}",
+                "confidence_score": top.confidence,
+            },
+        ))
+    return signals
+
+def _earliest_by_point(readings: Sequence[Mapping]) -> Dict[int, datetime]:
+    now = datetime.now(timezone.utc)
+    earliest: Dict[int, datetime] = {}
+    for reading in readings:
+        recorded_at = reading.get("recorded_at") or now
+        if recorded_at.tzinfo is None:
+            recorded_at = recorded_at.replace(tzinfo=timezone.utc)
+        point_id = reading["monitoring_point_id"]
+        if point_id not in earliest or recorded_at < earliest[point_id]:
+            earliest[point_id] = recorded_at
+    return earliest
+
+def evaluate_readings(db: Session, readings: Sequence[Mapping]) -> EvaluationResult:
+    """
+    打包并评估一批读数，每个监控点写入前的上一条读数作为变化速率规则的前值
+    前值优先取缓存（不受 TTL 限制，上报间隔长于 TTL 的监控点也能计算速率）；
+    缓存没有该监控点，或缓存的读数不早于本批（乱序补传）时，查库取本批之前的最近一条
+    """
+    earliest = _earliest_by_point(readings)
+    cached, _ = latest_reading_cache.peek_many(earliest)
+    previous = [reading for reading in cached if reading.recorded_at < earliest[reading.monitoring_point_id]]
+    found = {reading.monitoring_point_id for reading in previous}
+    missing = {point_id: before for point_id, before in earliest.items() if point_id not in found}
+    if missing:
+        previous.extend(get_readings_before(db, missing))
+    return evaluate_batch(pack_readings(readings, previous), threshold_rule_engine)
+
+def process_ingested_readings(db: Session, readings: Sequence[Mapping]) -> List[int]:
+    """
+    对刚写入的环境数据评估规则、更新异常检测状态，经防抖后生成或更新 ENVIRONMENTAL_HAZARD 报警
+    报警与环境数据在同一事务中写入，由调用方提交；返回新报警的ID
+    """
+    if not readings:
+        return []
+    signals, cleared = [], {}
+    if settings.RULE_ENGINE_ENABLED:
+        result = evaluate_readings(db, readings)
+        signals.extend(_rule_signal(candidate) for candidate in result.candidates)
+        cleared = {
+            (point_id, rule_alert_key(rule_type, field)): cleared_at
+            for (point_id, rule_type, field), cleared_at in result.cleared.items()
+        }
+    if settings.ANOMALY_DETECTION_ENABLED:
+        signals.extend(_anomaly_signals(anomaly_detector.observe(readings)))
+    if not signals and not cleared:
+        return []
+    return alert_debouncer.process(db, signals, cleared)
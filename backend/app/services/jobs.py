@@ -0,0 +1,133 @@
+import logging
+from sqlalchemy import text
+from app.core.config import settings
+from app.database import partitioning
+from app.crud.alert_counter import reconcile_alert_counters
+from app.crud.alert_event import prune_alert_events
+from app.crud.environment_rollup import refresh_environment_rollups
+from app.crud.retention import run_retention
+from app.database.database import SessionLocal, engine
+from app.services.anomaly_detector import anomaly_detector
+from app.services.detection_ingest import detection_ingestor
+from app.services.scheduler import PeriodicTask, TaskScheduler
+
+logger = logging.getLogger(__name__)
+
+def maintain_environment_partitions() -> None:
+    """预建未来分区并清理过期分区"""
+    with engine.begin() as conn:
+        # 多个 worker 同时运行时只允许一个执行 DDL
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('environment_data_partitions'))"))
+        result = partitioning.maintain_partitions(conn)
+    if result["created"] or result["dropped"]:
+        logger.info("Partition maintenance created %s, dropped %s", result["created"], result["dropped"])
+
+def refresh_rollups() -> None:
+    """增量刷新环境数据汇总表"""
+    db = SessionLocal()
+    try:
+        result = refresh_environment_rollups(db)
+    finally:
+        db.close()
+    if result["rows"]:
+        logger.info("Rolled up %s rows into %s minute / %s hour buckets",
+                    result["rows"], result["minute_buckets"], result["hour_buckets"])
+
+def apply_retention() -> None:
+    """按保留策略汇总并清理过期数据"""
+    db = SessionLocal()
+    try:
+        run = run_retention(db)
+    finally:
+        db.close()
+    logger.info(
+        "Retention run %s %s: compacted %s raw rows, deleted %s raw / %s minute / %s hour rows",
+        run.id, run.status, run.raw_rows_compacted, run.raw_rows_deleted,
+        run.minute_rollups_deleted, run.hour_rollups_deleted
+    )
+
+def restore_anomaly_state() -> None:
+    """启动时从检查点恢复异常检测状态，避免重新预热"""
+    db = SessionLocal()
+    try:
+        points = anomaly_detector.load_checkpoint(db)
+    finally:
+        db.close()
+    logger.info("Restored anomaly detector state for %s monitoring points", points)
+
+def checkpoint_anomaly_state() -> None:
+    """把异常检测状态写入检查点表"""
+    db = SessionLocal()
+    try:
+        points = anomaly_detector.save_checkpoint(db)
+    finally:
+        db.close()
+    if points:
+        logger.info("Checkpointed anomaly detector state for %s monitoring points", points)
+
+def reconcile_alert_counts() -> None:
+    """按 alerts 重新计算报警计数，修正并报告偏差"""
+    db = SessionLocal()
+    try:
+        result = reconcile_alert_counters(db)
+    finally:
+        db.close()
+    if result["drift"]:
+        logger.warning(
+            "Alert counters drifted on %s keys (net %+d), corrected: %s",
+            len(result["drift"]),
+            sum(item["expected"] - item["counted"] for item in result["drift"]),
+            result["drift"][:20]
+        )
+    if result["mines_fixed"]:
+        logger.info("Moved %s alert counters to the monitoring point's current mine", result["mines_fixed"])
+
+def prune_alert_stream_events() -> None:
+    """清理超过保留时间的报警推送事件"""
+    db = SessionLocal()
+    try:
+        deleted = prune_alert_events(db, settings.ALERT_EVENT_RETENTION_HOURS)
+    finally:
+        db.close()
+    if deleted:
+        logger.info("Pruned %s alert events", deleted)
+
+def flush_detections() -> None:
+    """把合并的重复检测写入对应报警"""
+    db = SessionLocal()
+    try:
+        detection_ingestor.flush(db)
+    finally:
+        db.close()
+
+def register_jobs(scheduler: TaskScheduler) -> None:
+    """注册应用内周期任务"""
+    scheduler.add(PeriodicTask(
+        "environment-partition-maintenance",
+        settings.ENVIRONMENT_DATA_PARTITION_MAINTENANCE_SECONDS,
+        maintain_environment_partitions
+    ))
+    if settings.ENVIRONMENT_ROLLUP_ENABLED:
+        scheduler.add(PeriodicTask(
+            "environment-rollup-refresh",
+            settings.ENVIRONMENT_ROLLUP_REFRESH_SECONDS,
+            refresh_rollups
+        ))
+    if settings.RETENTION_ENABLED:
+        scheduler.add(PeriodicTask("retention", settings.RETENTION_INTERVAL_SECONDS, apply_retention))
+    if settings.ANOMALY_DETECTION_ENABLED:
+        scheduler.add(PeriodicTask(
+            "anomaly-checkpoint",
+            settings.ANOMALY_CHECKPOINT_SECONDS,
+            checkpoint_anomaly_state,
+            run_on_start=False
+        ))
+    if settings.ALERT_COUNTER_RECONCILE_SECONDS:
+        scheduler.add(PeriodicTask(
+            "alert-counter-reconcile",
+            settings.ALERT_COUNTER_RECONCILE_SECONDS,
+            reconcile_alert_counts,
+            run_on_start=False
+        ))
+    scheduler.add(PeriodicTask("alert-event-prune", 3600, prune_alert_stream_events, run_on_start=False))
+    scheduler.add(PeriodicTask("detection-flush", settings.DETECTION_FLUSH_SECONDS, flush_detections, run_on_start=False))
@@ -0,0 +1,85 @@
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.core.config import settings
+from app.schemas.environment_data import EnvironmentData as EnvironmentDataSchema
+
+class LatestReadingCache:
+    """
+    按监控点缓存最新一条环境数据
+    写入路径写穿透更新；读取未命中或超过 TTL 时回源数据库。
+    缓存是进程内的，多 worker 部署时其他进程写入的数据最多延迟 TTL 秒可见。
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[int, Tuple[EnvironmentDataSchema, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, monitoring_point_id: int) -> Optional[EnvironmentDataSchema]:
+        with self._lock:
+            entry = self._entries.get(monitoring_point_id)
+        if entry is None:
+            return None
+        reading, cached_at = entry
+        if self.ttl_seconds and time.monotonic() - cached_at > self.ttl_seconds:
+            return None
+        return reading
+
+    def get_many(self, monitoring_point_ids: Iterable[int]) -> Tuple[List[EnvironmentDataSchema], List[int]]:
+        """返回（命中的数据, 未命中的监控点ID）"""
+        hits, misses = [], []
+        for point_id in monitoring_point_ids:
+            reading = self.get(point_id)
+            if reading is None:
+                misses.append(point_id)
+            else:
+                hits.append(reading)
+        return hits, misses
+
+    def peek_many(self, monitoring_point_ids: Iterable[int]) -> Tuple[List[EnvironmentDataSchema], List[int]]:
+        """同 get_many，但不考虑 TTL：规则评估只需要写入前的上一条读数，过期的条目仍然可用"""
+        hits, misses = [], []
+        with self._lock:
+            for point_id in monitoring_point_ids:
+                entry = self._entries.get(point_id)
+                if entry is None:
+                    misses.append(point_id)
+                else:
+                    hits.append(entry[0])
+        return hits, misses
+
+    def put(self, reading: EnvironmentDataSchema) -> None:
+        """写入一条数据，迟到的旧数据不会覆盖已缓存的更新数据"""
+        with self._lock:
+            current = self._entries.get(reading.monitoring_point_id)
+            if current is not None and current[0].id != reading.id and current[0].recorded_at > reading.recorded_at:
+                return
+            self._entries[reading.monitoring_point_id] = (reading, time.monotonic())
+
+    def put_many(self, readings: Iterable[EnvironmentDataSchema]) -> None:
+        for reading in readings:
+            self.put(reading)
+
+    def refresh_record(self, reading: EnvironmentDataSchema) -> None:
+        """记录被更新：只有缓存的正是这一条时才替换"""
+        with self._lock:
+            current = self._entries.get(reading.monitoring_point_id)
+            if current is not None and current[0].id == reading.id:
+                self._entries[reading.monitoring_point_id] = (reading, time.monotonic())
+
+    def invalidate_record(self, monitoring_point_id: int, data_id: int) -> None:
+        """记录被删除：缓存的正是这一条时失效，下次读取回源数据库取新的最新值"""
+        with self._lock:
+            current = self._entries.get(monitoring_point_id)
+            if current is not None and current[0].id == data_id:
+                del self._entries[monitoring_point_id]
+
+    def invalidate(self, monitoring_point_id: Optional[int] = None) -> None:
+        with self._lock:
+            if monitoring_point_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(monitoring_point_id, None)
+
+latest_reading_cache = LatestReadingCache(ttl_seconds=settings.LATEST_READING_CACHE_TTL_SECONDS)
@@ -0,0 +1,61 @@
+import logging
+import threading
+import time
+from typing import Iterable, Set
+from sqlalchemy import text
+from app.core.config import settings
+from app.database.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# 遇到未知ID时重新加载的最短间隔，避免错误的ID反复触发查询
+MISS_RELOAD_SECONDS = 1.0
+
+class MonitoringPointRegistry:
+    """
+    进程内的监控点ID集合，高频接入接口用它校验监控点存在，不再逐批查询
+    每 refresh_seconds 秒重新加载；遇到未知ID时提前重新加载一次（至多每秒一次），
+    其他进程新建的监控点因此能立即使用。本进程新建监控点后调用 add()
+    """
+
+    def __init__(self, refresh_seconds: float, session_factory=SessionLocal):
+        self.refresh_seconds = refresh_seconds
+        self.session_factory = session_factory
+        self._ids: Set[int] = set()
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def reload(self) -> None:
+        db = self.session_factory()
+        try:
+            ids = {row[0] for row in db.execute(text("SELECT id FROM monitoring_points"))}
+        finally:
+            db.close()
+        with self._lock:
+            self._ids = ids
+            self._loaded_at = time.monotonic()
+        logger.debug("Loaded %d monitoring point ids", len(ids))
+
+    def add(self, monitoring_point_id: int) -> None:
+        with self._lock:
+            self._ids.add(monitoring_point_id)
+
+    def unknown(self, monitoring_point_ids: Iterable[int]) -> Set[int]:
+        """返回不存在的监控点ID"""
+        ids = set(monitoring_point_ids)
+        age = None if self._loaded_at is None else time.monotonic() - self._loaded_at
+        if age is None or age >= self.refresh_seconds:
+            self.reload()
+        missing = ids - self._ids
+        if missing and age is not None and MISS_RELOAD_SECONDS <= age < self.refresh_seconds:
+            self.reload()
+            missing = ids - self._ids
+        return missing
+
+    def stats(self) -> dict:
+        return {
+            "points": len(self._ids),
+            "age_seconds": None if self._loaded_at is None else round(time.monotonic() - self._loaded_at, 1),
+        }
+
+monitoring_point_registry = MonitoringPointRegistry(refresh_seconds=settings.MONITORING_POINT_REGISTRY_REFRESH_SECONDS)
@@ -0,0 +1,350 @@
+import logging
+import math
+import select
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Mapping, NamedTuple, Optional, Sequence, Set
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.database.database import engine
+from app.models.environment_data import EnvironmentData, ENVIRONMENT_FIELDS
+from app.schemas.environment_data import EnvironmentData as EnvironmentDataSchema
+
+logger = logging.getLogger(__name__)
+
+# 其他进程写入了增量同步看不到的数据（补传、回填、修改、删除）时通知各进程丢弃对应监控点的缓冲
+STALE_CHANNEL = "recent_readings_stale"
+# NOTIFY 负载上限 8000 字节，监控点过多时通知全部失效
+MAX_STALE_PAYLOAD = 7000
+
+STATUS_FIELDS = ("ventilation_status", "emergency_system_status")
+# 每条读数占用的字节：采集时间 f8 + ID i8 + 十项数值 f8 + 两个状态 i1（-1 表示缺失）
+ROW_BYTES = 8 + 8 + 8 * len(ENVIRONMENT_FIELDS) + len(STATUS_FIELDS)
+READ_COLUMNS = [
+    getattr(EnvironmentData, column)
+    for column in ("id", "recorded_at", *ENVIRONMENT_FIELDS, *STATUS_FIELDS)
+]
+
+class Window(NamedTuple):
+    """某个监控点一段时间内的读数，按采集时间升序"""
+    recorded_at: np.ndarray  # epoch 秒
+    values: np.ndarray  # (行数, 字段数) float64，缺失为 NaN
+
+def _timestamp(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+def _value(reading, name: str):
+    if isinstance(reading, Mapping):
+        return reading.get(name)
+    return getattr(reading, name, None)
+
+def _status(value: int) -> Optional[bool]:
+    return None if value < 0 else bool(value)
+
+def stale_payload(monitoring_point_ids: Iterable[int]) -> str:
+    """STALE_CHANNEL 的通知内容：逗号分隔的监控点ID，* 表示全部"""
+    payload = ",".join(str(point_id) for point_id in sorted(set(monitoring_point_ids)))
+    return payload if len(payload) <= MAX_STALE_PAYLOAD else "*"
+
+class _PointBuffer:
+    """单个监控点的定长环形缓冲，各列是预分配的 numpy 数组，写满后覆盖最早写入的行"""
+    __slots__ = ("recorded_at", "ids", "values", "statuses", "slots", "head", "covered_since", "synced_at")
+
+    def __init__(self, capacity: int):
+        self.recorded_at = np.full(capacity, np.nan)  # NaN 表示空槽或已删除
+        self.ids = np.full(capacity, -1, dtype=np.int64)
+        self.values = np.full((capacity, len(ENVIRONMENT_FIELDS)), np.nan, dtype=np.float64)
+        self.statuses = np.full((capacity, len(STATUS_FIELDS)), -1, dtype=np.int8)
+        self.slots: Dict[int, int] = {}  # 读数ID -> 槽位，查找不扫描整个缓冲
+        self.head = 0
+        # 早于该时间的读数可能已被覆盖，查询窗口从此时间之后开始才能由缓冲应答
+        self.covered_since = -math.inf
+        self.synced_at: Optional[float] = None  # 上次与数据库同步的 monotonic 时间，None 表示尚未预热
+
+    def append(self, data_id: int, recorded_at: float, values: Sequence[float], statuses: Sequence[int]) -> None:
+        evicted = self.recorded_at[self.head]
+        if not math.isnan(evicted):
+            # 与被覆盖的读数同一时刻的查询窗口也不完整，覆盖范围从其后开始
+            self.covered_since = max(self.covered_since, float(np.nextafter(evicted, math.inf)))
+        self.slots.pop(int(self.ids[self.head]), None)
+        self.slots[data_id] = self.head
+        self.recorded_at[self.head] = recorded_at
+        self.ids[self.head] = data_id
+        self.values[self.head] = values
+        self.statuses[self.head] = statuses
+        self.head = (self.head + 1) % len(self.ids)
+
+    def find(self, data_id: int) -> Optional[int]:
+        return self.slots.get(data_id)
+
+    def clear(self, slot: int) -> None:
+        self.slots.pop(int(self.ids[slot]), None)
+        self.recorded_at[slot] = np.nan
+        self.ids[slot] = -1
+
+    def rows(self) -> int:
+        return int(np.count_nonzero(~np.isnan(self.recorded_at)))
+
+class RecentReadingStore:
+    """
+    按监控点保存最近 capacity 条环境数据的环形缓冲，服务最新值、短时间窗统计和趋势查询
+    读数以列数组存储，不为每行创建 Python 对象；写入路径在提交后追加，
+    监控点首次被查询时从数据库预热，之后每 sync_seconds 秒增量同步其他进程写入的数据
+    （只补齐最近 sync_lookback_seconds 秒内采集的读数）。更早的补传、回填以及修改/删除由写入方在事务中
+    mark_stale 通知，后台线程 LISTEN 收到后丢弃对应缓冲，下次查询重新预热。
+    查询窗口早于缓冲覆盖范围时返回 None，由调用方回源数据库
+    """
+
+    def __init__(self, capacity: int, sync_seconds: float, sync_lookback_seconds: float):
+        self.capacity = capacity
+        self.sync_seconds = sync_seconds
+        self.sync_lookback_seconds = sync_lookback_seconds
+        self._buffers: Dict[int, _PointBuffer] = {}
+        self._lock = threading.Lock()
+        # 每次失效加一，预热查询期间发生失效时结果不算作已同步
+        self._invalidations = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _append(self, buffer: _PointBuffer, reading) -> None:
+        data_id = _value(reading, "id")
+        if data_id is None or buffer.find(data_id) is not None:
+            return
+        recorded_at = _timestamp(_value(reading, "recorded_at"))
+        if recorded_at < buffer.covered_since:
+            # 覆盖范围之前的查询本来就回源数据库，不为其挤掉较新的读数
+            return
+        buffer.append(
+            data_id,
+            recorded_at,
+            [np.nan if _value(reading, field) is None else _value(reading, field) for field in ENVIRONMENT_FIELDS],
+            [-1 if _value(reading, field) is None else int(_value(reading, field)) for field in STATUS_FIELDS]
+        )
+
+    def append_many(self, readings: Sequence) -> None:
+        """写入已提交的读数（需带 id 和 recorded_at），只追加到已被查询过的监控点"""
+        with self._lock:
+            for reading in readings:
+                buffer = self._buffers.get(_value(reading, "monitoring_point_id"))
+                if buffer is not None:
+                    self._append(buffer, reading)
+
+    def refresh_record(self, reading) -> None:
+        """记录被更新：缓冲中有这一条时原位替换"""
+        with self._lock:
+            buffer = self._buffers.get(reading.monitoring_point_id)
+            slot = buffer.find(reading.id) if buffer is not None else None
+            if slot is None:
+                return
+            buffer.recorded_at[slot] = _timestamp(reading.recorded_at)
+            buffer.values[slot] = [np.nan if getattr(reading, field) is None else getattr(reading, field)
+                                   for field in ENVIRONMENT_FIELDS]
+            buffer.statuses[slot] = [-1 if getattr(reading, field) is None else int(getattr(reading, field))
+                                     for field in STATUS_FIELDS]
+
+    def remove_record(self, monitoring_point_id: int, data_id: int) -> None:
+        """记录被删除：清空所在的槽位"""
+        with self._lock:
+            buffer = self._buffers.get(monitoring_point_id)
+            slot = buffer.find(data_id) if buffer is not None else None
+            if slot is not None:
+                buffer.clear(slot)
+
+    def invalidate(self, monitoring_point_id: Optional[int] = None) -> None:
+        """丢弃缓冲，下次查询时重新预热"""
+        with self._lock:
+            self._invalidations += 1
+            if monitoring_point_id is None:
+                self._buffers.clear()
+            else:
+                self._buffers.pop(monitoring_point_id, None)
+
+    def late_points(self, readings: Sequence) -> Set[int]:
+        """采集时间早于增量同步回看范围的读数所在的监控点，其他进程的缓冲同步不到这些读数"""
+        cutoff = time.time() - self.sync_lookback_seconds
+        return {
+            _value(reading, "monitoring_point_id") for reading in readings
+            if _value(reading, "recorded_at") is not None and _timestamp(_value(reading, "recorded_at")) < cutoff
+        }
+
+    def mark_stale(self, db: Session, monitoring_point_ids: Iterable[int]) -> None:
+        """在写入事务中通知各进程（包括本进程）丢弃这些监控点的缓冲，事务提交后送达"""
+        monitoring_point_ids = set(monitoring_point_ids)
+        if monitoring_point_ids:
+            db.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": STALE_CHANNEL, "payload": stale_payload(monitoring_point_ids)}
+            )
+
+    def _apply_stale(self, payload: str) -> None:
+        if payload == "*":
+            self.invalidate()
+            return
+        for item in payload.split(","):
+            if item:
+                self.invalidate(int(item))
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """启动监听 STALE_CHANNEL 的后台线程"""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="recent-store-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _listen(self) -> None:
+        connection = engine.raw_connection()
+        try:
+            connection.set_session(autocommit=True)
+            cursor = connection.cursor()
+            cursor.execute(f"LISTEN {STALE_CHANNEL}")
+            # 监听建立前或断线期间的通知可能已丢失，现有缓冲全部重新预热
+            self.invalidate()
+            while not self._stop.is_set():
+                if not select.select([connection], [], [], 1.0)[0]:
+                    continue
+                connection.poll()
+                for notify in connection.notifies:
+                    self._apply_stale(notify.payload)
+                connection.notifies.clear()
+        finally:
+            connection.close()
+
+    def _run(self) -> None:
+        backoff = 1.0
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except Exception:
+                logger.exception("Recent store listener failed, reconnecting in %.0fs", backoff)
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+    def _sync(self, db: Session, monitoring_point_id: int) -> _PointBuffer:
+        """预热或增量同步一个监控点，返回其缓冲"""
+        with self._lock:
+            buffer = self._buffers.get(monitoring_point_id)
+            if buffer is None:
+                # 先放入空缓冲，预热查询期间写入路径追加的读数不会丢失
+                buffer = self._buffers[monitoring_point_id] = _PointBuffer(self.capacity)
+            elif buffer.synced_at is not None and (
+                not self.sync_seconds or time.monotonic() - buffer.synced_at <= self.sync_seconds
+            ):
+                return buffer
+            invalidations = self._invalidations
+            newest = None
+            if buffer.synced_at is not None:
+                valid = ~np.isnan(buffer.recorded_at)
+                newest = float(buffer.recorded_at[valid].max()) if valid.any() else None
+
+        synced_at = time.monotonic()
+        # 只查询缓冲需要的列，不构造 ORM 对象
+        query = db.query(*READ_COLUMNS).filter(EnvironmentData.monitoring_point_id == monitoring_point_id)
+        if newest is not None:
+            since = datetime.fromtimestamp(newest - self.sync_lookback_seconds, tz=timezone.utc)
+            query = query.filter(EnvironmentData.recorded_at >= since)
+        rows = query.order_by(EnvironmentData.recorded_at.desc()).limit(self.capacity).all()[::-1]
+
+        with self._lock:
+            current = self._buffers.get(monitoring_point_id)
+            if newest is None or current is None:
+                # 预热：用数据库中最近 capacity 条重建，预热期间写入路径追加的读数再合并进来
+                buffer = _PointBuffer(self.capacity)
+                for row in rows:
+                    self._append(buffer, row)
+                if len(rows) == self.capacity:
+                    buffer.covered_since = float(np.nextafter(_timestamp(rows[0].recorded_at), math.inf))
+                elif rows:
+                    # 不足 capacity 条时只覆盖最早一条之后；之后回填的更早数据由查询回源数据库
+                    buffer.covered_since = _timestamp(rows[0].recorded_at)
+                else:
+                    buffer.covered_since = time.time()
+                if current is not None:
+                    for slot in np.flatnonzero(~np.isnan(current.recorded_at)).tolist():
+                        if buffer.find(int(current.ids[slot])) is None:
+                            buffer.append(int(current.ids[slot]), float(current.recorded_at[slot]),
+                                          current.values[slot], current.statuses[slot])
+                self._buffers[monitoring_point_id] = buffer
+            else:
+                buffer = current
+                for row in rows:
+                    self._append(buffer, row)
+            # 查询期间有缓冲失效时，结果可能缺少触发失效的数据，下次查询重新预热
+            buffer.synced_at = synced_at if invalidations == self._invalidations else None
+        return buffer
+
+    def window(self, db: Session, monitoring_point_id: int, start: datetime, end: datetime) -> Optional[Window]:
+        """返回 [start, end] 内的读数；缓冲未覆盖 start 时返回 None"""
+        start_ts, end_ts = _timestamp(start), _timestamp(end)
+        buffer = self._sync(db, monitoring_point_id)
+        with self._lock:
+            if start_ts < buffer.covered_since:
+                return None
+            recorded_at = buffer.recorded_at
+            slots = np.flatnonzero((recorded_at >= start_ts) & (recorded_at <= end_ts))
+            slots = slots[np.argsort(recorded_at[slots], kind="stable")]
+            return Window(recorded_at[slots], buffer.values[slots])
+
+    def latest(self, db: Session, monitoring_point_id: int) -> Optional[EnvironmentDataSchema]:
+        """最新一条读数，监控点在数据库中没有数据时返回 None"""
+        buffer = self._sync(db, monitoring_point_id)
+        with self._lock:
+            if np.isnan(buffer.recorded_at).all():
+                return None
+            slot = int(np.nanargmax(buffer.recorded_at))
+            return EnvironmentDataSchema(
+                id=int(buffer.ids[slot]),
+                monitoring_point_id=monitoring_point_id,
+                recorded_at=datetime.fromtimestamp(float(buffer.recorded_at[slot]), tz=timezone.utc),
+                **{field: None if math.isnan(value) else value
+                   for field, value in zip(ENVIRONMENT_FIELDS, buffer.values[slot].tolist())},
+                **{field: _status(int(value)) for field, value in zip(STATUS_FIELDS, buffer.statuses[slot])}
+            )
+
+    def stats(self) -> dict:
+        """
+        内存占用：每个监控点的缓冲按 capacity 预分配，与实际行数无关；
+        bytes_per_point_hour 按各监控点采样间隔的中位数折算每小时保留的字节数
+        """
+        with self._lock:
+            buffers = list(self._buffers.values())
+            rows = sum(buffer.rows() for buffer in buffers)
+            intervals = []
+            for buffer in buffers:
+                recorded_at = np.sort(buffer.recorded_at[~np.isnan(buffer.recorded_at)])
+                if len(recorded_at) > 1:
+                    intervals.append(float(np.median(np.diff(recorded_at))))
+        interval = float(np.median(intervals)) if intervals else None
+        point_bytes = self.capacity * ROW_BYTES
+        return {
+            "points": len(buffers),
+            "rows": rows,
+            "capacity": self.capacity,
+            "row_bytes": ROW_BYTES,
+            "point_bytes": point_bytes,
+            "allocated_bytes": len(buffers) * point_bytes,
+            "median_interval_seconds": interval,
+            "bytes_per_point_hour": round(3600 / interval * ROW_BYTES) if interval else None,
+            "retained_hours_per_point": round(self.capacity * interval / 3600, 2) if interval else None,
+        }
+
+recent_reading_store = RecentReadingStore(
+    capacity=settings.RECENT_STORE_CAPACITY,
+    sync_seconds=settings.RECENT_STORE_SYNC_SECONDS,
+    sync_lookback_seconds=settings.RECENT_STORE_SYNC_LOOKBACK_SECONDS
+)
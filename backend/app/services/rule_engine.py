@@ -0,0 +1,161 @@
+import logging
+import threading
+import time
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+from sqlalchemy import text
+from app.core.config import settings
+from app.database.database import SessionLocal
+from app.models.alert import AlertSeverity
+from app.models.threshold_rule import RuleType, ThresholdRule
+
+logger = logging.getLogger(__name__)
+
+# 报警标题使用的字段名称
+ENVIRONMENT_FIELD_LABELS = {
+    "methane_concentration": "甲烷浓度",
+    "carbon_monoxide": "一氧化碳浓度",
+    "carbon_dioxide": "二氧化碳浓度",
+    "oxygen_concentration": "氧气浓度",
+    "hydrogen_sulfide": "硫化氢浓度",
+    "temperature": "温度",
+    "humidity": "湿度",
+    "pressure": "气压",
+    "air_flow": "风速",
+    "dust_concentration": "粉尘浓度",
+}
+
+SEVERITY_RANK = {
+    AlertSeverity.LOW: 0,
+    AlertSeverity.MEDIUM: 1,
+    AlertSeverity.HIGH: 2,
+    AlertSeverity.CRITICAL: 3,
+}
+
+# 规则表或监控点变化时签名随之变化，用于跨进程热加载
+SIGNATURE_SQL = text(
+    "SELECT (SELECT count(*) FROM threshold_rules), (SELECT max(updated_at) FROM threshold_rules), "
+    "(SELECT max(id) FROM monitoring_points)"
+)
+
+class CompiledRule(NamedTuple):
+    id: int
+    rule_type: RuleType
+    field: str
+    min_value: Optional[float]
+    max_value: Optional[float]
+    max_rate: Optional[float]
+    conditions: Tuple[Tuple[str, str, float], ...]  # (field, op, value)
+    severity: AlertSeverity
+    hysteresis: Optional[float]
+    min_duration_seconds: Optional[int]
+    suppress_seconds: Optional[int]
+
+# 规则按 (类型, 字段) 解析优先级，例如监控点的阈值规则不会覆盖煤矿的变化速率规则
+RuleKey = Tuple[RuleType, str]
+
+def compile_rule(rule) -> CompiledRule:
+    return CompiledRule(
+        rule.id, rule.rule_type, rule.field, rule.min_value, rule.max_value, rule.max_rate,
+        tuple((item["field"], item["op"], item["value"]) for item in rule.conditions or ()),
+        rule.severity, rule.hysteresis, rule.min_duration_seconds, rule.suppress_seconds
+    )
+
+class ThresholdRuleEngine:
+    """
+    把 threshold_rules 编译为按监控点解析好的内存规则表
+    本进程修改规则后调用 invalidate() 立即生效；其他进程每 reload_seconds 秒比对一次签名后热加载
+    """
+
+    def __init__(self, reload_seconds: float, session_factory=SessionLocal):
+        self.reload_seconds = reload_seconds
+        self.session_factory = session_factory
+        self._lock = threading.Lock()
+        self._global: Dict[RuleKey, Tuple[CompiledRule, ...]] = {}
+        self._by_mine: Dict[int, Dict[RuleKey, Tuple[CompiledRule, ...]]] = {}
+        self._by_point: Dict[int, Dict[RuleKey, Tuple[CompiledRule, ...]]] = {}
+        self._point_mine: Dict[int, int] = {}
+        self._resolved: Dict[int, Dict[RuleKey, Tuple[CompiledRule, ...]]] = {}
+        self._signature = None
+        self._checked_at = 0.0
+        self.version = 0
+
+    def invalidate(self) -> None:
+        """下次评估前强制重新加载"""
+        with self._lock:
+            self._signature = None
+            self._checked_at = 0.0
+
+    def reload(self, db=None) -> None:
+        """从数据库加载规则并编译"""
+        owns_session = db is None
+        db = db or self.session_factory()
+        try:
+            signature = tuple(db.execute(SIGNATURE_SQL).one())
+            rules = db.query(ThresholdRule).filter(ThresholdRule.is_active == True).all()
+            point_mine = dict(db.execute(text("SELECT id, mine_id FROM monitoring_points")).all())
+        finally:
+            if owns_session:
+                db.close()
+
+        self.load(rules, point_mine, signature)
+
+    def load(self, rules: Iterable, point_mine: Dict[int, int], signature=None) -> None:
+        """编译规则（ORM 对象或同名属性的对象）并替换当前规则表"""
+        scoped: Dict[tuple, Dict[RuleKey, list]] = {}
+        count = 0
+        for rule in rules:
+            if rule.monitoring_point_id is not None:
+                scope = ("point", rule.monitoring_point_id)
+            elif rule.mine_id is not None:
+                scope = ("mine", rule.mine_id)
+            else:
+                scope = ("global", None)
+            scoped.setdefault(scope, {}).setdefault((rule.rule_type, rule.field), []).append(compile_rule(rule))
+            count += 1
+        # 同一键按严重程度从高到低排列
+        compiled = {
+            scope: {
+                key: tuple(sorted(items, key=lambda r: SEVERITY_RANK[r.severity], reverse=True))
+                for key, items in keys.items()
+            }
+            for scope, keys in scoped.items()
+        }
+
+        with self._lock:
+            self._global = compiled.get(("global", None), {})
+            self._by_mine = {key[1]: value for key, value in compiled.items() if key[0] == "mine"}
+            self._by_point = {key[1]: value for key, value in compiled.items() if key[0] == "point"}
+            self._point_mine = dict(point_mine)
+            self._resolved = {}
+            self._signature = signature
+            self._checked_at = time.monotonic()
+            self.version += 1
+        logger.info("Loaded %d threshold rules (version %d)", count, self.version)
+
+    def _maybe_reload(self) -> None:
+        if self._signature is not None and time.monotonic() - self._checked_at < self.reload_seconds:
+            return
+        if self._signature is not None:
+            db = self.session_factory()
+            try:
+                signature = tuple(db.execute(SIGNATURE_SQL).one())
+            finally:
+                db.close()
+            if signature == self._signature:
+                self._checked_at = time.monotonic()
+                return
+        self.reload()
+
+    def rules_for_point(self, monitoring_point_id: int) -> Dict[RuleKey, Tuple[CompiledRule, ...]]:
+        """按 监控点 > 煤矿 > 全局 合并出监控点每个 (类型, 字段) 生效的规则"""
+        self._maybe_reload()
+        resolved = self._resolved.get(monitoring_point_id)
+        if resolved is None:
+            with self._lock:
+                resolved = dict(self._global)
+                resolved.update(self._by_mine.get(self._point_mine.get(monitoring_point_id), {}))
+                resolved.update(self._by_point.get(monitoring_point_id, {}))
+                self._resolved[monitoring_point_id] = resolved
+        return resolved
+
+threshold_rule_engine = ThresholdRuleEngine(reload_seconds=settings.RULE_ENGINE_RELOAD_SECONDS)
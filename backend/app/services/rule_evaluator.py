@@ -0,0 +1,211 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Mapping, NamedTuple, Sequence
+import numpy as np
+from app.core.config import settings
+from app.models.environment_data import ENVIRONMENT_FIELDS
+from app.models.threshold_rule import RuleType
+from app.services.rule_engine import SEVERITY_RANK, CompiledRule, ThresholdRuleEngine
+
+# 一行一条读数：监控点、采集时间（epoch 秒）、十项数值（缺失为 NaN），current 为 False 的行只作为变化速率的前值
+READING_DTYPE = np.dtype(
+    [("monitoring_point_id", np.int32), ("recorded_at", np.float64), ("current", np.bool_)]
+    + [(field, np.float64) for field in ENVIRONMENT_FIELDS]
+)
+
+COMPARATORS = {">": np.greater, ">=": np.greater_equal, "<": np.less, "<=": np.less_equal}
+
+class AlertCandidate(NamedTuple):
+    rule: CompiledRule
+    monitoring_point_id: int
+    value: float  # 偏离最大的读数值；变化速率规则为每分钟变化量
+    threshold: float
+    direction: str  # above / below / rate
+    recorded_at: datetime  # 偏离最大的读数时间
+    first_at: datetime  # 本批第一条违规读数时间
+    last_at: datetime  # 本批最后一条违规读数时间
+    count: int  # 本批中违反该规则的读数数量
+
+    @property
+    def key(self) -> tuple:
+        return (self.monitoring_point_id, self.rule.rule_type, self.rule.field)
+
+class EvaluationResult(NamedTuple):
+    candidates: List[AlertCandidate]
+    # (监控点, 类型, 字段) -> 本批最后一条回到退出阈值以内的读数时间，用于滞回判定条件解除
+    cleared: Dict[tuple, datetime]
+
+def _column(readings: Sequence, name: str) -> list:
+    if readings and isinstance(readings[0], Mapping):
+        return [reading.get(name) for reading in readings]
+    return [getattr(reading, name, None) for reading in readings]
+
+def _timestamp(value, default: float) -> float:
+    if value is None:
+        return default
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+def pack_readings(readings: Sequence, previous: Sequence = ()) -> np.ndarray:
+    """
+    把读数（字典、EnvironmentDataCreate 或 ORM 对象）按列打包为结构化数组
+    previous 中的读数排在前面并标记为非当前行；未提供采集时间的读数按当前时间处理
+    """
+    now = datetime.now(timezone.utc).timestamp()
+    previous, readings = list(previous), list(readings)
+    packed = np.empty(len(previous) + len(readings), dtype=READING_DTYPE)
+    packed["current"][:len(previous)] = False
+    packed["current"][len(previous):] = True
+    for offset, group in ((0, previous), (len(previous), readings)):
+        if not group:
+            continue
+        rows = slice(offset, offset + len(group))
+        packed["monitoring_point_id"][rows] = _column(group, "monitoring_point_id")
+        packed["recorded_at"][rows] = [_timestamp(value, now) for value in _column(group, "recorded_at")]
+        for field in ENVIRONMENT_FIELDS:
+            # float 数组中 None 会转换为 NaN
+            packed[field][rows] = np.array(_column(group, field), dtype=np.float64)
+    return packed
+
+def _bounds_mask(values: np.ndarray, rule: CompiledRule, band: float = 0.0) -> np.ndarray:
+    """超出上下限的行；band 为滞回区间，上限下移、下限上移"""
+    mask = np.zeros(len(values), dtype=bool)
+    if rule.max_value is not None:
+        mask |= values > rule.max_value - band
+    if rule.min_value is not None:
+        mask |= values < rule.min_value + band
+    return mask
+
+def hysteresis_band(rule: CompiledRule) -> float:
+    """退出阈值与进入阈值的距离，未配置时按阈值的 ALERT_HYSTERESIS_RATIO 计算"""
+    if rule.hysteresis is not None:
+        return rule.hysteresis
+    if rule.rule_type == RuleType.RATE_OF_CHANGE:
+        return abs(rule.max_rate) * settings.ALERT_HYSTERESIS_RATIO
+    return abs(rule.max_value if rule.max_value is not None else rule.min_value) * settings.ALERT_HYSTERESIS_RATIO
+
+def _deviation(values: np.ndarray, rule: CompiledRule) -> np.ndarray:
+    """超出上下限的幅度，用于挑选每个监控点最严重的读数"""
+    deviation = np.full(len(values), -np.inf)
+    if rule.max_value is not None:
+        deviation = np.maximum(deviation, values - rule.max_value)
+    if rule.min_value is not None:
+        deviation = np.maximum(deviation, rule.min_value - values)
+    return deviation
+
+def _rates(packed: np.ndarray, field: str, order: np.ndarray) -> np.ndarray:
+    """每行相对同一监控点上一条读数的变化速率（单位/分钟），没有前值的行为 NaN；order 为按 (监控点, 时间) 的排序"""
+    rates = np.full(len(packed), np.nan)
+    if len(packed) < 2:
+        return rates
+    points = packed["monitoring_point_id"][order]
+    values = packed[field][order].astype(np.float64)
+    elapsed = np.diff(packed["recorded_at"][order])
+    valid = (points[1:] == points[:-1]) & (elapsed > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = np.where(valid, np.abs(np.diff(values)) / (elapsed / 60.0), np.nan)
+    rates[order[1:]] = rate
+    return rates
+
+def _timestamps(values: np.ndarray) -> List[datetime]:
+    return [datetime.fromtimestamp(value, tz=timezone.utc) for value in values.tolist()]
+
+def evaluate_batch(packed: np.ndarray, engine: ThresholdRuleEngine) -> EvaluationResult:
+    """
+    用向量化掩码一次评估整批读数的阈值、变化速率和组合规则
+    每条规则对全部行计算一次掩码，再按监控点取偏离最大的读数；
+    同一监控点同一 (类型, 字段) 只保留最严重的候选。
+    同时按滞回区间计算每个 (监控点, 类型, 字段) 最后一次解除的时间
+    """
+    if len(packed) == 0:
+        return EvaluationResult([], {})
+    point_ids = packed["monitoring_point_id"]
+    recorded_at = packed["recorded_at"]
+    unique_points, inverse = np.unique(point_ids, return_inverse=True)
+
+    # 每条规则适用的监控点（按优先级解析后）
+    applicable: Dict[int, np.ndarray] = {}
+    rules: Dict[int, CompiledRule] = {}
+    for index, point_id in enumerate(unique_points.tolist()):
+        for key_rules in engine.rules_for_point(point_id).values():
+            for rule in key_rules:
+                if rule.id not in applicable:
+                    applicable[rule.id] = np.zeros(len(unique_points), dtype=bool)
+                    rules[rule.id] = rule
+                applicable[rule.id][index] = True
+
+    current = packed["current"]
+    rates_by_field: Dict[str, np.ndarray] = {}
+    time_order = None
+    best: Dict[tuple, AlertCandidate] = {}
+    # 每个 (类型, 字段)：[规则适用的行, 仍处于滞回区间外的行, 有测量值的行]
+    key_masks: Dict[tuple, list] = {}
+    for rule_id, rule in rules.items():
+        values = packed[rule.field]
+        band = hysteresis_band(rule)
+        if rule.rule_type == RuleType.RATE_OF_CHANGE:
+            if rule.field not in rates_by_field:
+                if time_order is None:
+                    time_order = np.lexsort((recorded_at, point_ids))
+                rates_by_field[rule.field] = _rates(packed, rule.field, time_order)
+            measured = rates_by_field[rule.field]
+            mask = measured > rule.max_rate
+            active = measured > rule.max_rate - band
+            deviation = measured - rule.max_rate
+        else:
+            mask = _bounds_mask(values, rule)
+            active = _bounds_mask(values, rule, band)
+            for field, op, threshold in rule.conditions:
+                condition = COMPARATORS[op](packed[field], threshold)
+                mask &= condition
+                active &= condition
+            measured = values
+            deviation = _deviation(values, rule)
+
+        applies = current & applicable[rule_id][inverse]
+        masks = key_masks.setdefault((rule.rule_type, rule.field), [
+            np.zeros(len(packed), dtype=bool), np.zeros(len(packed), dtype=bool), np.zeros(len(packed), dtype=bool)
+        ])
+        masks[0] |= applies
+        masks[1] |= applies & active
+        masks[2] |= applies & ~np.isnan(measured)
+
+        mask &= applies
+        rows = np.flatnonzero(mask)
+        if len(rows) == 0:
+            continue
+
+        # 按监控点分组，组内偏离最大的排在最前
+        order = np.lexsort((-deviation[rows], point_ids[rows]))
+        rows = rows[order]
+        group_points, starts, counts = np.unique(point_ids[rows], return_index=True, return_counts=True)
+        first_at = _timestamps(np.minimum.reduceat(recorded_at[rows], starts))
+        last_at = _timestamps(np.maximum.reduceat(recorded_at[rows], starts))
+        for group, (point_id, start, count) in enumerate(zip(group_points.tolist(), starts.tolist(), counts.tolist())):
+            row = rows[start]
+            value = float(measured[row])
+            if rule.rule_type == RuleType.RATE_OF_CHANGE:
+                direction, threshold = "rate", rule.max_rate
+            elif rule.max_value is not None and value > rule.max_value:
+                direction, threshold = "above", rule.max_value
+            else:
+                direction, threshold = "below", rule.min_value
+            candidate = AlertCandidate(
+                rule, point_id, value, threshold, direction,
+                datetime.fromtimestamp(float(recorded_at[row]), tz=timezone.utc),
+                first_at[group], last_at[group], count
+            )
+            existing = best.get(candidate.key)
+            if existing is None or SEVERITY_RANK[rule.severity] > SEVERITY_RANK[existing.rule.severity]:
+                best[candidate.key] = candidate
+
+    cleared: Dict[tuple, datetime] = {}
+    for (rule_type, field), (applies, active, measured) in key_masks.items():
+        rows = np.flatnonzero(applies & measured & ~active)
+        if len(rows) == 0:
+            continue
+        latest = np.full(len(unique_points), -np.inf)
+        np.maximum.at(latest, inverse[rows], recorded_at[rows])
+        for index in np.flatnonzero(np.isfinite(latest)).tolist():
+            cleared[(int(unique_points[index]), rule_type, field)] = datetime.fromtimestamp(latest[index], tz=timezone.utc)
+    return EvaluationResult(list(best.values()), cleared)
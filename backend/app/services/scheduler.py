@@ -0,0 +1,65 @@
+import logging
+import threading
+from typing import Callable, List
+
+logger = logging.getLogger(__name__)
+
+class PeriodicTask:
+    """在后台线程中按固定间隔执行的维护任务"""
+
+    def __init__(self, name: str, interval_seconds: float, func: Callable[[], None], run_on_start: bool = True):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.func = func
+        self.run_on_start = run_on_start
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_once(self) -> None:
+        try:
+            self.func()
+        except Exception:
+            logger.exception("Periodic task %s failed", self.name)
+
+    def _run(self) -> None:
+        if self.run_on_start:
+            self.run_once()
+        while not self._stop_event.wait(self.interval_seconds):
+            self.run_once()
+
+class TaskScheduler:
+    """统一管理应用内的周期任务，随 FastAPI 启停"""
+
+    def __init__(self):
+        self.tasks: List[PeriodicTask] = []
+
+    def add(self, task: PeriodicTask) -> PeriodicTask:
+        self.tasks.append(task)
+        return task
+
+    def start(self) -> None:
+        for task in self.tasks:
+            task.start()
+
+    def stop(self) -> None:
+        for task in self.tasks:
+            task.stop()
+
+scheduler = TaskScheduler()
@@ -1,8 +1,10 @@
 import asyncio
 from sqlalchemy.orm import Session
 from app.database.database import SessionLocal, engine
+from app.database import partitioning
 from app.models import user, mine, monitoring_point, alert, environment_data, equipment, maintenance_record
 from app.crud import user as crud_user
+from app.crud import threshold_rule as crud_threshold_rule
 from app.schemas.user import UserCreate
 from app.models.user import UserRole
 
@@ -16,6 +18,8 @@ def create_tables():
     environment_data.Base.metadata.create_all(bind=engine)
     equipment.Base.metadata.create_all(bind=engine)
     maintenance_record.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        partitioning.ensure_partitions(conn)
 
 def init_db(db: Session) -> None:
     """初始化数据库"""
@@ -61,6 +65,11 @@ def init_db(db: Session) -> None:
         viewer = crud_user.create_user(db, user=viewer_in)
         print(f"Created viewer user: {viewer.username}")
 
+    # 默认阈值规则（迁移 0005 之外的建表方式需要在这里写入）
+    seeded = crud_threshold_rule.seed_default_threshold_rules(db)
+    if seeded:
+        print(f"Created {seeded} default threshold rules")
+
 def main() -> None:
     """主函数"""
     print("Creating database tables...")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+分页基准测试
+对比 offset 分页与 keyset 游标分页在第 1 页和深分页（默认第 10000 页）的耗时
+
+用法:
+    python scripts/benchmark_pagination.py
+    python scripts/benchmark_pagination.py --page 10000 --limit 100 --repeat 5
+    python scripts/benchmark_pagination.py --point-id 12
+"""
+
+import argparse
+import statistics
+import time
+from explain_queries import cleanup_seed, seed_data
+from sqlalchemy import text
+from app.crud import environment_data as crud_environment_data
+from app.database.database import SessionLocal, engine
+
+def measure(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="Benchmark offset vs keyset pagination")
+    parser.add_argument("--point-id", type=int, help="use an existing monitoring point instead of seeding")
+    parser.add_argument("--page", type=int, default=10000, help="deep page number to compare with page 1")
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine.echo = False
+    db = SessionLocal()
+    try:
+        point_id = args.point_id
+        if point_id is None:
+            rows = args.page * args.limit + args.limit
+            print(f"🌱 正在写入 {rows} 行基准数据...")
+            mine_id = seed_data(db, points=1, rows_per_point=rows, alerts_per_point=0)
+            point_id = db.execute(text("SELECT min(id) FROM monitoring_points WHERE mine_id = :m"), {"m": mine_id}).scalar()
+
+        skip = (args.page - 1) * args.limit
+        # 深分页的游标取自上一页最后一行，与客户端逐页翻到这里时拿到的游标相同
+        previous = crud_environment_data.get_environment_data_by_monitoring_point(db, point_id, skip - 1, 1)
+        if not previous:
+            print(f"❌ 监控点 {point_id} 的数据不足 {args.page} 页")
+            return
+        after = (previous[0].recorded_at, previous[0].id)
+
+        results = {
+            # 第 1 页两种方式是同一条 SQL
+            "第 1 页": measure(lambda: crud_environment_data.get_environment_data_by_monitoring_point(
+                db, point_id, 0, args.limit), args.repeat),
+            f"offset 第 {args.page} 页": measure(lambda: crud_environment_data.get_environment_data_by_monitoring_point(
+                db, point_id, skip, args.limit), args.repeat),
+            f"keyset 第 {args.page} 页": measure(lambda: crud_environment_data.get_environment_data_by_monitoring_point(
+                db, point_id, 0, args.limit, after), args.repeat),
+        }
+
+        offset_page = crud_environment_data.get_environment_data_by_monitoring_point(db, point_id, skip, args.limit)
+        keyset_page = crud_environment_data.get_environment_data_by_monitoring_point(db, point_id, 0, args.limit, after)
+
+        print(f"\n📊 监控点 {point_id}，每页 {args.limit} 行，中位数耗时")
+        for name, elapsed in results.items():
+            print(f"   {name:<16}: {elapsed:.2f} ms")
+        same = [row.id for row in offset_page] == [row.id for row in keyset_page]
+        print("   ✅ 深分页结果一致" if same else "   ❌ 深分页结果不一致")
+
+        if args.point_id is None:
+            cleanup_seed(db)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
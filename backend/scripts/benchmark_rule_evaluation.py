@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+规则评估基准测试
+用合成数据测量向量化批量评估（打包 + 掩码评估）在 1 万 / 10 万 / 100 万条读数下的吞吐，
+并与逐行 Python 判断阈值规则的耗时对比。不需要连接数据库
+
+用法:
+    python scripts/benchmark_rule_evaluation.py
+    python scripts/benchmark_rule_evaluation.py --sizes 10000 100000 1000000 --points 500
+    python scripts/benchmark_rule_evaluation.py --baseline-max 0
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import numpy as np
+from app.models.alert import AlertSeverity
+from app.models.environment_data import ENVIRONMENT_FIELDS
+from app.models.threshold_rule import RuleType
+from app.services.rule_engine import ThresholdRuleEngine
+from app.services.rule_evaluator import evaluate_batch, pack_readings
+
+# 典型值与波动范围，约 0.1% 的读数会越过阈值
+FIELD_PROFILES = {
+    "methane_concentration": (0.3, 0.2),
+    "carbon_monoxide": (10.0, 12.0),
+    "carbon_dioxide": (0.4, 0.2),
+    "oxygen_concentration": (20.6, 0.3),
+    "hydrogen_sulfide": (2.0, 2.0),
+    "temperature": (26.0, 4.5),
+    "humidity": (70.0, 10.0),
+    "pressure": (101.3, 1.0),
+    "air_flow": (2.0, 0.6),
+    "dust_concentration": (4.0, 2.0),
+}
+
+def build_rules(mines: int):
+    """全局阈值规则 + 每个煤矿一条收紧的阈值规则 + 变化速率规则 + 组合规则"""
+    rules = []
+
+    def add(rule_type, field, mine_id=None, min_value=None, max_value=None, max_rate=None, conditions=None,
+            severity=AlertSeverity.HIGH):
+        rules.append(SimpleNamespace(
+            id=len(rules) + 1, rule_type=rule_type, field=field, mine_id=mine_id, monitoring_point_id=None,
+            min_value=min_value, max_value=max_value, max_rate=max_rate, conditions=conditions, severity=severity,
+            hysteresis=None, min_duration_seconds=None, suppress_seconds=None
+        ))
+
+    add(RuleType.THRESHOLD, "methane_concentration", max_value=1.0)
+    add(RuleType.THRESHOLD, "methane_concentration", max_value=1.5, severity=AlertSeverity.CRITICAL)
+    add(RuleType.THRESHOLD, "temperature", max_value=40.0)
+    add(RuleType.THRESHOLD, "oxygen_concentration", min_value=19.5)
+    add(RuleType.THRESHOLD, "carbon_monoxide", max_value=50.0)
+    add(RuleType.THRESHOLD, "hydrogen_sulfide", max_value=10.0)
+    add(RuleType.RATE_OF_CHANGE, "methane_concentration", max_rate=0.5)
+    add(RuleType.RATE_OF_CHANGE, "temperature", max_rate=5.0, severity=AlertSeverity.MEDIUM)
+    add(RuleType.COMBINATION, "methane_concentration", max_value=0.8,
+        conditions=[{"field": "air_flow", "op": "<", "value": 1.0}], severity=AlertSeverity.CRITICAL)
+    for mine_id in range(1, mines + 1):
+        add(RuleType.THRESHOLD, "temperature", mine_id=mine_id, max_value=38.0 + mine_id % 3)
+    return rules
+
+def build_readings(size: int, points: int, seed: int):
+    """按监控点轮流生成读数，每个监控点间隔 10 秒"""
+    rng = np.random.default_rng(seed)
+    start = datetime.now(timezone.utc) - timedelta(seconds=10 * (size // points + 1))
+    point_ids = (np.arange(size) % points + 1).tolist()
+    values = {
+        field: np.round(rng.normal(mean, spread / 3.3, size), 3).tolist()
+        for field, (mean, spread) in FIELD_PROFILES.items()
+    }
+    return [
+        {
+            "monitoring_point_id": point_ids[index],
+            "recorded_at": start + timedelta(seconds=10 * (index // points)),
+            **{field: values[field][index] for field in ENVIRONMENT_FIELDS},
+        }
+        for index in range(size)
+    ]
+
+def row_by_row(readings, engine: ThresholdRuleEngine) -> int:
+    """逐行判断阈值规则（不含变化速率和组合规则），作为对照"""
+    violations = 0
+    for reading in readings:
+        for (rule_type, field), rules in engine.rules_for_point(reading["monitoring_point_id"]).items():
+            if rule_type != RuleType.THRESHOLD:
+                continue
+            value = reading[field]
+            for rule in rules:
+                if (rule.max_value is not None and value > rule.max_value) or (
+                    rule.min_value is not None and value < rule.min_value
+                ):
+                    violations += 1
+                    break
+    return violations
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="Benchmark vectorized environment rule evaluation")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10000, 100000, 1000000])
+    parser.add_argument("--points", type=int, default=200)
+    parser.add_argument("--mines", type=int, default=10)
+    parser.add_argument("--baseline-max", type=int, default=100000,
+                        help="only run the row-by-row baseline up to this many readings (0 disables it)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    engine = ThresholdRuleEngine(reload_seconds=float("inf"))
+    engine.load(
+        build_rules(args.mines),
+        {point_id: point_id % args.mines + 1 for point_id in range(1, args.points + 1)},
+        signature=("benchmark",)
+    )
+
+    print(f"📏 {args.points} 个监控点，{args.mines} 个煤矿\n")
+    print(f"{'读数':>10} | {'打包 ms':>9} | {'评估 ms':>9} | {'吞吐 行/秒':>12} | {'候选':>6} | {'逐行 ms':>9}")
+    for size in args.sizes:
+        readings = build_readings(size, args.points, args.seed)
+
+        started = time.perf_counter()
+        packed = pack_readings(readings)
+        pack_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        candidates = evaluate_batch(packed, engine).candidates
+        evaluate_ms = (time.perf_counter() - started) * 1000
+
+        baseline = "-"
+        if size <= args.baseline_max:
+            started = time.perf_counter()
+            row_by_row(readings, engine)
+            baseline = f"{(time.perf_counter() - started) * 1000:.1f}"
+
+        throughput = size / ((pack_ms + evaluate_ms) / 1000)
+        print(f"{size:>10} | {pack_ms:>9.1f} | {evaluate_ms:>9.1f} | {throughput:>12,.0f} | {len(candidates):>6} | {baseline:>9}")
+
+if __name__ == "__main__":
+    main()
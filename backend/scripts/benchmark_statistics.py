@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+环境统计基准测试
+对比旧实现（加载全部 ORM 对象后在 Python 中计算）与单条聚合 SQL 的耗时和内存
+
+用法:
+    python scripts/benchmark_statistics.py --rows 600000 --repeat 5
+    python scripts/benchmark_statistics.py --point-id 12 --hours 168
+"""
+
+import argparse
+import math
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from explain_queries import cleanup_seed, seed_data
+from sqlalchemy import text
+from app.crud import environment_data as crud_environment_data
+from app.database.database import SessionLocal, engine
+from app.models.environment_data import ENVIRONMENT_FIELDS
+
+def legacy_statistics(db, monitoring_point_id: int, hours: int) -> dict:
+    """旧实现：逐行加载后用列表推导计算"""
+    start_time = datetime.utcnow() - timedelta(hours=hours)
+    data_list = crud_environment_data.get_environment_data_by_time_range(
+        db, monitoring_point_id, start_time, datetime.utcnow()
+    )
+    if not data_list:
+        return {}
+    stats = {"count": len(data_list)}
+    for field in ENVIRONMENT_FIELDS:
+        values = [getattr(data, field) for data in data_list if getattr(data, field) is not None]
+        if values:
+            stats[field] = {
+                "min": min(values),
+                "max": max(values),
+                "avg": sum(values) / len(values),
+                "count": len(values)
+            }
+    return stats
+
+def measure(func, repeat: int) -> dict:
+    timings = []
+    peak = 0
+    result = None
+    for _ in range(repeat):
+        tracemalloc.start()
+        started = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - started) * 1000)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return {"result": result, "mean_ms": statistics.mean(timings), "min_ms": min(timings), "peak_mb": peak / 1024 / 1024}
+
+def compare(legacy: dict, current: dict) -> bool:
+    if legacy.get("count") != current.get("count"):
+        return False
+    for field in ENVIRONMENT_FIELDS:
+        if (field in legacy) != (field in current):
+            return False
+        if field in legacy:
+            for key in ("min", "max", "avg", "count"):
+                if not math.isclose(legacy[field][key], current[field][key], rel_tol=1e-9):
+                    return False
+    return True
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="Benchmark environment statistics implementations")
+    parser.add_argument("--point-id", type=int, help="use an existing monitoring point instead of seeding")
+    parser.add_argument("--rows", type=int, default=600000, help="seeded rows (1 Hz samples, kept inside the window)")
+    parser.add_argument("--hours", type=int, default=168)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    engine.echo = False
+    db = SessionLocal()
+    try:
+        point_id = args.point_id
+        if point_id is None:
+            print(f"🌱 正在写入 {args.rows} 行基准数据...")
+            mine_id = seed_data(db, points=1, rows_per_point=args.rows, alerts_per_point=0)
+            point_id = db.execute(text("SELECT min(id) FROM monitoring_points WHERE mine_id = :m"), {"m": mine_id}).scalar()
+
+        legacy = measure(lambda: legacy_statistics(db, point_id, args.hours), args.repeat)
+        db.expunge_all()
+        current = measure(
+            lambda: crud_environment_data.get_environment_data_statistics(db, point_id, args.hours), args.repeat
+        )
+
+        print(f"\n📊 监控点 {point_id}，最近 {args.hours} 小时，{legacy['result'].get('count', 0)} 行")
+        print(f"   旧实现（Python 计算）: 平均 {legacy['mean_ms']:.1f} ms，最快 {legacy['min_ms']:.1f} ms，"
+              f"峰值内存 {legacy['peak_mb']:.1f} MB")
+        print(f"   聚合 SQL            : 平均 {current['mean_ms']:.1f} ms，最快 {current['min_ms']:.1f} ms，"
+              f"峰值内存 {current['peak_mb']:.1f} MB")
+        if current["mean_ms"] > 0:
+            print(f"   加速比: {legacy['mean_ms'] / current['mean_ms']:.1f}x")
+        print("   ✅ 结果一致" if compare(legacy["result"], current["result"]) else "   ❌ 结果不一致")
+
+        if args.point_id is None:
+            cleanup_seed(db)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
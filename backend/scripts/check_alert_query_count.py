@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+报警列表查询数检查脚本
+按不同分页大小查询报警列表并序列化为 AlertWithDetails，统计执行的 SQL 语句数；
+各分页大小的语句数应相同（预加载关联，没有 N+1 查询），不同时列出语句并返回非零退出码
+
+用法:
+    python scripts/check_alert_query_count.py
+    python scripts/check_alert_query_count.py --sizes 1 20 100 --mine-id 1
+"""
+
+import argparse
+import sys
+from app.core.query_counter import QueryCounter, install
+from app.crud import crud_alert
+from app.database.database import SessionLocal, engine
+from app.schemas.alert import AlertWithDetails
+
+def count_listing(limit: int, mine_id: int = None) -> tuple:
+    """返回（报警条数, 语句列表），每次使用新会话，避免身份映射中已有的对象省掉查询"""
+    db = SessionLocal()
+    try:
+        with QueryCounter() as counter:
+            alerts = crud_alert.get_alerts(db, limit=limit, mine_id=mine_id)
+            [AlertWithDetails.model_validate(alert).model_dump() for alert in alerts]
+        return len(alerts), counter.statements
+    finally:
+        db.close()
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="Check that the alert listing runs a constant number of SQL statements")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100], help="page sizes to compare")
+    parser.add_argument("--mine-id", type=int, default=None)
+    args = parser.parse_args()
+
+    engine.echo = False
+    install(engine)
+    results = {}
+    for size in args.sizes:
+        rows, statements = count_listing(size, args.mine_id)
+        results[size] = statements
+        print(f"limit={size:<6} alerts={rows:<6} statements={len(statements)}")
+        if rows < size:
+            print(f"⚠️  报警数不足 {size} 条，该分页大小的结果不能说明问题")
+
+    if len({len(statements) for statements in results.values()}) > 1:
+        print("❌ 语句数随分页大小变化，存在 N+1 查询：")
+        for size, statements in results.items():
+            print(f"--- limit={size}")
+            for statement in statements:
+                print("   ", " ".join(statement.split())[:160])
+        sys.exit(1)
+    print("✅ 各分页大小的语句数相同")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+查询计划检查脚本
+对各 CRUD 查询执行 EXPLAIN (ANALYZE, BUFFERS)，确认热点查询走索引而不是顺序扫描
+
+用法:
+    python scripts/explain_queries.py --seed --points 50 --rows-per-point 20000
+    python scripts/explain_queries.py --mine-id 1
+    python scripts/explain_queries.py --seed --cleanup
+"""
+
+import argparse
+import sys
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event, text
+from app.crud import alert as crud_alert
+from app.crud import environment_data as crud_environment_data
+from app.crud import equipment as crud_equipment
+from app.crud import maintenance_record as crud_maintenance
+from app.database import partitioning
+from app.database.database import SessionLocal, engine
+from app.models.alert import AlertSeverity, AlertStatus, AlertType
+
+SEED_MINE_NAME = "EXPLAIN 基准矿井"
+
+def seed_data(db, points: int, rows_per_point: int, alerts_per_point: int) -> int:
+    """用 generate_series 批量造数，返回煤矿ID"""
+    mine_id = db.execute(text(
+        "INSERT INTO mines (name, location, depth, status) "
+        "VALUES (:name, 'benchmark', 500, 'active') RETURNING id"
+    ), {"name": SEED_MINE_NAME}).scalar()
+    point_ids = [row[0] for row in db.execute(text(
+        "INSERT INTO monitoring_points (mine_id, name, location, camera_id, is_active) "
+        "SELECT :mine_id, 'seed point ' || g, 'seed', 'SEED' || :mine_id || '-' || g, true "
+        "FROM generate_series(1, :points) g RETURNING id"
+    ), {"mine_id": mine_id, "points": points}).all()]
+
+    oldest = datetime.now(timezone.utc) - timedelta(seconds=rows_per_point)
+    if partitioning.is_partitioned(db):
+        partitioning.ensure_partitions(db, since=oldest.date())
+
+    db.execute(text(
+        "INSERT INTO environment_data (monitoring_point_id, methane_concentration, carbon_monoxide, "
+        "carbon_dioxide, oxygen_concentration, hydrogen_sulfide, temperature, humidity, pressure, "
+        "air_flow, dust_concentration, recorded_at) "
+        "SELECT p.id, random() * 1.05, random() * 52, 400 + random() * 200, 19.4 + random() * 1.6, "
+        "random() * 5, 15 + random() * 26, 40 + random() * 50, 1000 + random() * 30, "
+        "random() * 4, random() * 10, now() - g * interval '1 second' "
+        "FROM unnest(CAST(:point_ids AS integer[])) AS p(id) CROSS JOIN generate_series(1, :rows) g"
+    ), {"point_ids": point_ids, "rows": rows_per_point})
+
+    db.execute(text(
+        "INSERT INTO alerts (monitoring_point_id, alert_type, severity, status, title, detected_at) "
+        "SELECT p.id, "
+        "CAST((CAST(:types AS text[]))[1 + floor(random() * 5)::int] AS alerttype), "
+        "CAST((CAST(:severities AS text[]))[1 + floor(random() * 4)::int] AS alertseverity), "
+        "CAST(CASE WHEN random() < 0.05 THEN 'ACTIVE' ELSE 'RESOLVED' END AS alertstatus), "
+        "'seed alert', now() - g * interval '1 minute' "
+        "FROM unnest(CAST(:point_ids AS integer[])) AS p(id) CROSS JOIN generate_series(1, :alerts) g"
+    ), {
+        "point_ids": point_ids,
+        "alerts": alerts_per_point,
+        "types": [t.name for t in AlertType],
+        "severities": [s.name for s in AlertSeverity],
+    })
+
+    equipment_ids = [row[0] for row in db.execute(text(
+        "INSERT INTO equipment (mine_id, name, equipment_type, status) "
+        "SELECT :mine_id, 'seed equipment ' || g, 'fan', 'operational' "
+        "FROM generate_series(1, :count) g RETURNING id"
+    ), {"mine_id": mine_id, "count": points}).all()]
+    db.execute(text(
+        "INSERT INTO maintenance_records (equipment_id, maintenance_type, description, start_time, status) "
+        "SELECT e.id, (ARRAY['preventive', 'corrective', 'emergency'])[1 + floor(random() * 3)::int], "
+        "'seed', now() - g * interval '1 day', 'completed' "
+        "FROM unnest(CAST(:equipment_ids AS integer[])) AS e(id) CROSS JOIN generate_series(1, 200) g"
+    ), {"equipment_ids": equipment_ids})
+
+    db.commit()
+    for table in ("environment_data", "alerts", "maintenance_records", "equipment", "monitoring_points"):
+        db.execute(text(f"ANALYZE {table}"))
+    db.commit()
+    return mine_id
+
+def cleanup_seed(db) -> None:
+    mine_ids = [row[0] for row in db.execute(text("SELECT id FROM mines WHERE name = :name"), {"name": SEED_MINE_NAME})]
+    for mine_id in mine_ids:
+        point_filter = "monitoring_point_id IN (SELECT id FROM monitoring_points WHERE mine_id = :mine_id)"
+        db.execute(text(f"DELETE FROM environment_data WHERE {point_filter}"), {"mine_id": mine_id})
+        db.execute(text(f"DELETE FROM alerts WHERE {point_filter}"), {"mine_id": mine_id})
+        db.execute(text(
+            "DELETE FROM maintenance_records WHERE equipment_id IN (SELECT id FROM equipment WHERE mine_id = :mine_id)"
+        ), {"mine_id": mine_id})
+        db.execute(text("DELETE FROM equipment WHERE mine_id = :mine_id"), {"mine_id": mine_id})
+        db.execute(text("DELETE FROM monitoring_points WHERE mine_id = :mine_id"), {"mine_id": mine_id})
+        db.execute(text("DELETE FROM mines WHERE id = :mine_id"), {"mine_id": mine_id})
+    db.commit()
+    print(f"🧹 已清理 {len(mine_ids)} 个基准煤矿的数据")
+
+def build_cases(db, mine_id: int) -> list:
+    """(名称, 调用) 列表，参数取自指定煤矿的第一个监控点与设备"""
+    point_id = db.execute(text("SELECT min(id) FROM monitoring_points WHERE mine_id = :m"), {"m": mine_id}).scalar()
+    equipment_id = db.execute(text("SELECT min(id) FROM equipment WHERE mine_id = :m"), {"m": mine_id}).scalar()
+    now = datetime.now(timezone.utc)
+    return [
+        ("get_latest_environment_data", lambda: crud_environment_data.get_latest_environment_data(db, point_id)),
+        ("get_environment_data_by_monitoring_point",
+         lambda: crud_environment_data.get_environment_data_by_monitoring_point(db, point_id, 0, 100)),
+        ("get_environment_data_by_mine", lambda: crud_environment_data.get_environment_data_by_mine(db, mine_id, 0, 100)),
+        ("get_environment_data_by_time_range",
+         lambda: crud_environment_data.get_environment_data_by_time_range(db, point_id, now - timedelta(hours=1), now)),
+        ("get_environment_data_statistics", lambda: crud_environment_data.get_environment_data_statistics(db, point_id, 24)),
+        ("get_environment_data_trends",
+         lambda: crud_environment_data.get_environment_data_trends(db, point_id, "temperature", 24)),
+        ("get_environment_alerts", lambda: crud_environment_data.get_environment_alerts(db, point_id)),
+        ("get_alerts(status=ACTIVE)", lambda: crud_alert.get_alerts(db, status=AlertStatus.ACTIVE)),
+        ("get_active_alerts", lambda: crud_alert.get_active_alerts(db)),
+        ("get_critical_alerts", lambda: crud_alert.get_critical_alerts(db)),
+        ("get_alerts_by_monitoring_point", lambda: crud_alert.get_alerts_by_monitoring_point(db, point_id)),
+        ("get_alerts_by_type", lambda: crud_alert.get_alerts_by_type(db, AlertType.DANGEROUS_ACTION)),
+        ("get_alert_summary", lambda: crud_alert.get_alert_summary(db, mine_id)),
+        ("get_equipment_by_mine", lambda: crud_equipment.get_equipment_by_mine(db, mine_id)),
+        ("get_maintenance_records_by_equipment",
+         lambda: crud_maintenance.get_maintenance_records_by_equipment(db, equipment_id)),
+        ("get_maintenance_records_by_time_range",
+         lambda: crud_maintenance.get_maintenance_records_by_time_range(db, now - timedelta(days=7), now)),
+        ("get_maintenance_statistics", lambda: crud_maintenance.get_maintenance_statistics(db, equipment_id)),
+    ]
+
+def capture_statements(func) -> list:
+    """执行一次 CRUD 调用并记录其发出的 SELECT 语句和参数"""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        func()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return captured
+
+def explain(db, statement: str, parameters) -> list:
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.execute("EXPLAIN (ANALYZE, BUFFERS) " + statement, parameters)
+        return [row[0] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="EXPLAIN ANALYZE every hot CRUD query")
+    parser.add_argument("--mine-id", type=int, help="explain against an existing mine instead of seeding")
+    parser.add_argument("--seed", action="store_true", help="seed a benchmark mine first")
+    parser.add_argument("--points", type=int, default=20)
+    parser.add_argument("--rows-per-point", type=int, default=10000)
+    parser.add_argument("--alerts-per-point", type=int, default=500)
+    parser.add_argument("--cleanup", action="store_true", help="delete seeded benchmark data at the end")
+    args = parser.parse_args()
+
+    engine.echo = False
+    db = SessionLocal()
+    try:
+        if args.seed:
+            print("🌱 正在造数...")
+            mine_id = seed_data(db, args.points, args.rows_per_point, args.alerts_per_point)
+        elif args.mine_id:
+            mine_id = args.mine_id
+        else:
+            print("❌ 请指定 --seed 或 --mine-id")
+            sys.exit(1)
+
+        seq_scans = []
+        for name, func in build_cases(db, mine_id):
+            for statement, parameters in capture_statements(func):
+                plan = explain(db, statement, parameters)
+                print(f"\n===== {name} =====")
+                print("\n".join(plan))
+                if any("Seq Scan" in line for line in plan):
+                    seq_scans.append(name)
+            db.rollback()
+
+        print("\n📊 汇总")
+        if seq_scans:
+            print(f"   ⚠️  仍有顺序扫描: {', '.join(sorted(set(seq_scans)))}")
+        else:
+            print("   ✅ 所有查询均使用索引")
+
+        if args.cleanup:
+            cleanup_seed(db)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+列式导出脚本
+把 environment_data / alerts 导出为按 mine_id/day 分区的 Parquet 或 Arrow IPC 数据集，默认从上次水位线增量导出
+
+需要可选依赖 pyarrow: poetry install -E analytics
+
+用法:
+    python scripts/export_columnar.py --output /data/exports
+    python scripts/export_columnar.py --output /data/exports --tables alerts --full
+    python scripts/export_columnar.py --output /data/arrow --format ipc --mine-id 3 --since 2026-01-01
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from app.database.database import engine
+from app.services import columnar_export
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="Export environment data and alerts as Parquet / Arrow datasets")
+    parser.add_argument("--output", required=True, help="dataset root directory")
+    parser.add_argument("--tables", nargs="+", default=list(columnar_export.EXPORT_TABLES),
+                        choices=list(columnar_export.EXPORT_TABLES))
+    parser.add_argument("--format", choices=["parquet", "ipc"], default="parquet")
+    parser.add_argument("--full", action="store_true", help="ignore the watermark and export everything")
+    parser.add_argument("--mine-id", type=int)
+    parser.add_argument("--since", type=datetime.fromisoformat, help="only rows at or after this time")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="only rows at or before this time")
+    parser.add_argument("--batch-size", type=int, default=columnar_export.DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    try:
+        columnar_export.require_pyarrow()
+    except RuntimeError as exc:
+        print(f"❌ {exc}")
+        sys.exit(1)
+
+    engine.echo = False
+    for table in args.tables:
+        started = time.perf_counter()
+        with engine.connect() as conn:
+            result = columnar_export.export_dataset(
+                conn, args.output, table,
+                file_format=args.format,
+                incremental=not args.full,
+                batch_size=args.batch_size,
+                mine_id=args.mine_id,
+                start_time=args.since,
+                end_time=args.until
+            )
+        elapsed = time.perf_counter() - started
+        print(f"✅ {table}: {result['rows']} 行，{result['batches']} 批，"
+              f"水位线 id={result['last_id']}，耗时 {elapsed:.1f} s")
+
+if __name__ == "__main__":
+    main()
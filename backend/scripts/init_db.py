@@ -11,10 +11,12 @@ from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.database import partitioning
 from app.models import Base
 from app.models.user import User
 from app.models.mine import Mine
 from app.models.monitoring_point import MonitoringPoint
+from app.crud import threshold_rule as crud_threshold_rule
 from app.core.password import get_password_hash
 from app.core.enums import UserRole
 
@@ -53,6 +55,9 @@ def create_tables():
     try:
         engine = create_engine(settings.database_url)
         Base.metadata.create_all(bind=engine)
+        # environment_data 为分区表，需要建好分区才能写入
+        with engine.begin() as conn:
+            partitioning.ensure_partitions(conn)
         print("✅ 数据库表创建成功")
         return True
     except Exception as e:
@@ -125,6 +130,11 @@ def create_initial_data():
             print("✅ 示例矿井和监控点创建成功")
         
         db.commit()
+
+        # 默认阈值规则，没有规则时不会产生环境报警
+        if crud_threshold_rule.seed_default_threshold_rules(db):
+            print("✅ 默认阈值规则创建成功")
+
         db.close()
         return True
     except Exception as e:
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+环境数据历史回填脚本
+流式读取 SCADA 导出的 CSV / NDJSON 文件，分块通过 PostgreSQL COPY FROM STDIN 写入 environment_data
+
+用法:
+    python scripts/load_environment_data.py export_2024_01.csv export_2024_02.ndjson.gz
+    python scripts/load_environment_data.py data.csv --map GAS_CH4=methane_concentration --chunk-size 50000
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import sys
+import time
+from datetime import timezone
+from typing import Dict, Iterator, Optional
+from app.database import partitioning
+from app.database.database import engine
+from app.services.recent_store import STALE_CHANNEL, stale_payload
+
+# 写入列顺序（与 COPY 列清单一致）
+COPY_COLUMNS = [
+    "monitoring_point_id",
+    "methane_concentration", "carbon_monoxide", "carbon_dioxide",
+    "oxygen_concentration", "hydrogen_sulfide", "temperature",
+    "humidity", "pressure", "air_flow", "dust_concentration",
+    "ventilation_status", "emergency_system_status",
+    "recorded_at"
+]
+
+FLOAT_FIELDS = set(COPY_COLUMNS[1:11])
+BOOL_FIELDS = {"ventilation_status", "emergency_system_status"}
+
+# 旧系统列名 -> EnvironmentData 字段（匹配时忽略大小写）
+# camera_id / point_name 仅用于解析 monitoring_point_id
+LEGACY_COLUMN_MAP = {
+    "monitoring_point_id": "monitoring_point_id",
+    "point_id": "monitoring_point_id",
+    "camera_id": "camera_id",
+    "cam_id": "camera_id",
+    "point_name": "point_name",
+    "station": "point_name",
+    "ch4": "methane_concentration",
+    "gas_ch4": "methane_concentration",
+    "methane": "methane_concentration",
+    "co": "carbon_monoxide",
+    "co2": "carbon_dioxide",
+    "o2": "oxygen_concentration",
+    "h2s": "hydrogen_sulfide",
+    "temp": "temperature",
+    "temperature": "temperature",
+    "rh": "humidity",
+    "humidity": "humidity",
+    "press": "pressure",
+    "pressure": "pressure",
+    "wind_speed": "air_flow",
+    "air_flow": "air_flow",
+    "dust": "dust_concentration",
+    "vent_on": "ventilation_status",
+    "fan_status": "ventilation_status",
+    "emerg_on": "emergency_system_status",
+    "timestamp": "recorded_at",
+    "ts": "recorded_at",
+    "time": "recorded_at",
+    "recorded_at": "recorded_at",
+}
+for _field in COPY_COLUMNS:
+    LEGACY_COLUMN_MAP.setdefault(_field, _field)
+
+TRUE_VALUES = {"1", "true", "t", "yes", "y", "on"}
+FALSE_VALUES = {"0", "false", "f", "no", "n", "off"}
+
+class RowError(ValueError):
+    """无法转换的数据行"""
+
+class MonitoringPointResolver:
+    """一次性加载全部监控点，按 ID / 摄像头编号 / 名称解析 monitoring_point_id"""
+
+    def __init__(self, connection):
+        cursor = connection.cursor()
+        cursor.execute("SELECT id, camera_id, name FROM monitoring_points")
+        self.ids = set()
+        self.by_camera = {}
+        self.by_name = {}
+        for point_id, camera_id, name in cursor.fetchall():
+            self.ids.add(point_id)
+            if camera_id:
+                self.by_camera[camera_id.strip().lower()] = point_id
+            if name:
+                self.by_name[name.strip().lower()] = point_id
+        cursor.close()
+
+    def resolve(self, record: Dict[str, str]) -> int:
+        raw_id = record.get("monitoring_point_id")
+        if raw_id not in (None, ""):
+            try:
+                point_id = int(raw_id)
+            except (TypeError, ValueError):
+                raise RowError(f"invalid monitoring_point_id {raw_id!r}")
+            if point_id not in self.ids:
+                raise RowError(f"unknown monitoring_point_id {point_id}")
+            return point_id
+        camera_id = record.get("camera_id")
+        if camera_id and str(camera_id).strip().lower() in self.by_camera:
+            return self.by_camera[str(camera_id).strip().lower()]
+        point_name = record.get("point_name")
+        if point_name and str(point_name).strip().lower() in self.by_name:
+            return self.by_name[str(point_name).strip().lower()]
+        raise RowError(f"cannot resolve monitoring point (camera_id={camera_id!r}, point_name={point_name!r})")
+
+def build_column_map(overrides) -> Dict[str, str]:
+    """合并默认映射与命令行 --map 覆盖项"""
+    column_map = dict(LEGACY_COLUMN_MAP)
+    for item in overrides or []:
+        legacy, _, field = item.partition("=")
+        if not field:
+            raise SystemExit(f"Invalid --map value {item!r}, expected LEGACY=field")
+        column_map[legacy.strip().lower()] = field.strip()
+    return column_map
+
+def open_text(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+def detect_format(path: str, requested: str) -> str:
+    if requested != "auto":
+        return requested
+    name = path[:-3] if path.endswith(".gz") else path
+    return "ndjson" if name.endswith((".ndjson", ".jsonl", ".json")) else "csv"
+
+def iter_records(handle, file_format: str) -> Iterator[dict]:
+    """逐行产出原始记录，不会把整个文件读入内存"""
+    if file_format == "csv":
+        yield from csv.DictReader(handle)
+    else:
+        for line in handle:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+def map_record(raw: dict, column_map: Dict[str, str]) -> Dict[str, str]:
+    record = {}
+    for key, value in raw.items():
+        if key is None:
+            continue
+        field = column_map.get(key.strip().lower())
+        if field:
+            record[field] = value
+    return record
+
+def convert_row(record: Dict[str, str], resolver: MonitoringPointResolver) -> list:
+    """转换为 COPY 列顺序的值列表，None 表示 NULL"""
+    values = []
+    for column in COPY_COLUMNS:
+        if column == "monitoring_point_id":
+            values.append(resolver.resolve(record))
+            continue
+        value = record.get(column)
+        if value is None or (isinstance(value, str) and value.strip() == ""):
+            if column == "recorded_at":
+                raise RowError("missing recorded_at")
+            values.append(None)
+        elif column in FLOAT_FIELDS:
+            try:
+                values.append(float(value))
+            except (TypeError, ValueError):
+                raise RowError(f"invalid {column} value {value!r}")
+        elif column in BOOL_FIELDS:
+            if isinstance(value, bool):
+                values.append("t" if value else "f")
+                continue
+            text = str(value).strip().lower()
+            if text in TRUE_VALUES:
+                values.append("t")
+            elif text in FALSE_VALUES:
+                values.append("f")
+            else:
+                raise RowError(f"invalid {column} value {value!r}")
+        else:
+            values.append(str(value).strip())
+    return values
+
+class CopyLoader:
+    """
+    把转换后的行攒成块，每块一次 COPY 并提交
+    COPY 前按本块的采集时间范围建好分区，历史数据不会落入默认分区；
+    回填的数据运行中的服务增量同步不到，每块在同一事务中通知其丢弃相关监控点的最近读数缓冲
+    """
+
+    def __init__(self, connection, chunk_size: int):
+        self.connection = connection
+        self.chunk_size = chunk_size
+        self.copy_sql = (
+            f"COPY environment_data ({', '.join(COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+        )
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+        self.pending = 0
+        self.point_ids = set()
+        self.recorded_at = []
+        self.loaded = 0
+        self.started = time.perf_counter()
+        with engine.connect() as conn:
+            self.partitioned = partitioning.is_partitioned(conn)
+
+    def add(self, values: list) -> None:
+        # csv 模式下未加引号的空字段即 NULL
+        self.writer.writerow(["" if v is None else v for v in values])
+        self.point_ids.add(values[0])
+        self.recorded_at.append(values[-1])
+        self.pending += 1
+        if self.pending >= self.chunk_size:
+            self.flush()
+
+    def ensure_partitions(self, cursor) -> None:
+        # 采集时间由 PostgreSQL 解析，与 COPY 的解析规则一致
+        cursor.execute("SELECT min(t::timestamptz), max(t::timestamptz) FROM unnest(%s::text[]) t", (self.recorded_at,))
+        first, last = cursor.fetchone()
+        with engine.begin() as conn:
+            created = partitioning.ensure_partitions(
+                conn, since=first.astimezone(timezone.utc).date(), until=last.astimezone(timezone.utc).date()
+            )
+        if created:
+            print(f"   新建分区 {len(created)} 个: {', '.join(created)}")
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        self.buffer.seek(0)
+        cursor = self.connection.cursor()
+        try:
+            if self.partitioned:
+                self.ensure_partitions(cursor)
+            cursor.copy_expert(self.copy_sql, self.buffer)
+            cursor.execute("SELECT pg_notify(%s, %s)", (STALE_CHANNEL, stale_payload(self.point_ids)))
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            cursor.close()
+        self.loaded += self.pending
+        self.pending = 0
+        self.point_ids.clear()
+        self.recorded_at.clear()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        elapsed = time.perf_counter() - self.started
+        print(f"   已写入 {self.loaded} 行，{self.loaded / elapsed:,.0f} 行/秒")
+
+def load_file(path: str, args, column_map, resolver, loader: CopyLoader) -> Dict[str, int]:
+    file_format = detect_format(path, args.format)
+    stats = {"read": 0, "skipped": 0}
+    with open_text(path) as handle:
+        for raw in iter_records(handle, file_format):
+            stats["read"] += 1
+            try:
+                values = convert_row(map_record(raw, column_map), resolver)
+            except RowError as e:
+                stats["skipped"] += 1
+                if stats["skipped"] <= args.max_reported_errors:
+                    print(f"   ⚠️  {path} 第 {stats['read']} 条记录已跳过: {e}")
+                continue
+            loader.add(values)
+    return stats
+
+def parse_args(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Bulk load historical environment data via COPY")
+    parser.add_argument("files", nargs="+", help="CSV / NDJSON files, optionally .gz compressed")
+    parser.add_argument("--format", choices=["auto", "csv", "ndjson"], default="auto")
+    parser.add_argument("--chunk-size", type=int, default=20000, help="rows per COPY / commit")
+    parser.add_argument("--map", action="append", metavar="LEGACY=field",
+                        help="extra legacy column mapping, may be repeated")
+    parser.add_argument("--max-reported-errors", type=int, default=20)
+    return parser.parse_args(argv)
+
+def main(argv: Optional[list] = None):
+    """主函数"""
+    args = parse_args(argv)
+    column_map = build_column_map(args.map)
+
+    connection = engine.raw_connection()
+    try:
+        resolver = MonitoringPointResolver(connection)
+        print(f"🚀 已加载 {len(resolver.ids)} 个监控点，开始导入...")
+        loader = CopyLoader(connection, args.chunk_size)
+        total_read = total_skipped = 0
+        for path in args.files:
+            print(f"📄 {path}")
+            stats = load_file(path, args, column_map, resolver, loader)
+            total_read += stats["read"]
+            total_skipped += stats["skipped"]
+        loader.flush()
+    except Exception as e:
+        print(f"❌ 导入失败: {e}")
+        sys.exit(1)
+    finally:
+        connection.close()
+
+    elapsed = time.perf_counter() - loader.started
+    rate = loader.loaded / elapsed if elapsed > 0 else 0
+    print(f"🎉 导入完成：读取 {total_read} 行，写入 {loader.loaded} 行，跳过 {total_skipped} 行，"
+          f"耗时 {elapsed:.1f} 秒（{rate:,.0f} 行/秒）")
+
+if __name__ == "__main__":
+    main()
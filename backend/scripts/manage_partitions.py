@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+environment_data 分区维护脚本
+预建未来分区、列出现有分区、删除超过保留期的分区
+
+用法:
+    python scripts/manage_partitions.py --list
+    python scripts/manage_partitions.py --ensure --ahead 8
+    python scripts/manage_partitions.py --ensure --since 2024-01-01
+    python scripts/manage_partitions.py --drop-older-than 180 --dry-run
+"""
+
+import argparse
+import sys
+from datetime import date
+from app.database import partitioning
+from app.database.database import engine
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="Maintain environment_data partitions")
+    parser.add_argument("--list", action="store_true", help="list existing partitions")
+    parser.add_argument("--ensure", action="store_true", help="create missing current/future partitions")
+    parser.add_argument("--ahead", type=int, default=None, help="number of future partitions to keep ready")
+    parser.add_argument("--since", "--from", dest="since", type=date.fromisoformat,
+                        help="also create partitions from this date (UTC) for backfills")
+    parser.add_argument("--drop-older-than", type=int, metavar="DAYS", help="detach and drop expired partitions")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    with engine.begin() as conn:
+        if not partitioning.is_partitioned(conn):
+            print("❌ environment_data 还不是分区表，请先执行 alembic upgrade head")
+            sys.exit(1)
+
+        if args.ensure:
+            created = partitioning.ensure_partitions(conn, since=args.since, ahead=args.ahead)
+            print(f"✅ 新建分区 {len(created)} 个: {', '.join(created) or '-'}")
+
+        if args.drop_older_than is not None:
+            dropped = partitioning.drop_expired_partitions(conn, args.drop_older_than, dry_run=args.dry_run)
+            action = "将删除" if args.dry_run else "已删除"
+            print(f"🗑️  {action}分区 {len(dropped)} 个: {', '.join(dropped) or '-'}")
+
+        if args.list or not (args.ensure or args.drop_older_than is not None):
+            for partition in partitioning.list_partitions(conn):
+                bounds = "DEFAULT" if partition["start"] is None else f"{partition['start']} ~ {partition['end']}"
+                print(f"   {partition['name']}: {bounds}")
+
+if __name__ == "__main__":
+    main()
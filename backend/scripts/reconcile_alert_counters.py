@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+报警计数校对脚本
+按 alerts 重新计算每个 (监控点, 严重程度, 状态) 的报警数，与 alert_counters 对比并输出偏差，
+默认写入修正；绕过应用直接改写 alerts 后（如手工 SQL、数据导入）应运行一次
+
+用法:
+    python scripts/reconcile_alert_counters.py --dry-run
+    python scripts/reconcile_alert_counters.py
+"""
+
+import argparse
+import json
+import sys
+from app.crud import alert_counter as crud_alert_counter
+from app.database.database import SessionLocal, engine
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="Rebuild alert counters from the alerts table and report drift")
+    parser.add_argument("--dry-run", action="store_true", help="only report drift, do not correct it")
+    args = parser.parse_args()
+
+    engine.echo = False
+    db = SessionLocal()
+    try:
+        result = crud_alert_counter.reconcile_alert_counters(db, fix=not args.dry_run)
+    finally:
+        db.close()
+
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    if result["drift"]:
+        print(f"⚠️  {len(result['drift'])} 个计数有偏差" + ("" if args.dry_run else "，已修正"))
+        if args.dry_run:
+            sys.exit(1)
+    else:
+        print("✅ 报警计数与 alerts 一致")
+
+if __name__ == "__main__":
+    main()
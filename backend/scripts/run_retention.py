@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+数据保留脚本
+按 retention_policies 把过期原始数据汇总到 1 分钟 / 1 小时表后分批删除，并清理过期汇总
+
+用法:
+    python scripts/run_retention.py --dry-run
+    python scripts/run_retention.py
+    python scripts/run_retention.py --runs 10
+"""
+
+import argparse
+import json
+import sys
+from app.crud import retention as crud_retention
+from app.database.database import SessionLocal, engine
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="Compact and delete expired environment data")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be compacted/deleted")
+    parser.add_argument("--runs", type=int, metavar="N", help="show the last N runs and exit")
+    args = parser.parse_args()
+
+    engine.echo = False
+    db = SessionLocal()
+    try:
+        if args.runs:
+            for run in crud_retention.get_retention_runs(db, args.runs):
+                print(f"#{run.id} {run.status:<9} {run.started_at:%Y-%m-%d %H:%M} "
+                      f"汇总 {run.raw_rows_compacted} 行，删除原始 {run.raw_rows_deleted} / "
+                      f"分钟 {run.minute_rollups_deleted} / 小时 {run.hour_rollups_deleted} 行")
+            return
+
+        if args.dry_run:
+            report = crud_retention.get_retention_report(db)
+            if not report["mines"]:
+                print("ℹ️  没有生效的保留策略")
+            print(json.dumps(report, indent=2, ensure_ascii=False, default=str))
+            return
+
+        run = crud_retention.run_retention(db)
+        print(json.dumps({
+            "run_id": run.id,
+            "status": run.status,
+            "raw_rows_compacted": run.raw_rows_compacted,
+            "raw_rows_deleted": run.raw_rows_deleted,
+            "minute_rollups_deleted": run.minute_rollups_deleted,
+            "hour_rollups_deleted": run.hour_rollups_deleted,
+            "details": run.details,
+            "error": run.error
+        }, indent=2, ensure_ascii=False))
+        if run.status != "completed":
+            sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
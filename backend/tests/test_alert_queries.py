@@ -0,0 +1,84 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.deps import get_current_active_user
+from app.core.query_counter import QueryCounter, install as install_query_counter
+from app.database.database import get_db
+from app.main import app
+from app.models.alert import Alert, AlertSeverity, AlertStatus, AlertType
+from app.models.mine import Mine
+from app.models.monitoring_point import MonitoringPoint
+from app.models.user import User
+
+def _get(path: str, query: str = ""):
+    """在当前线程里直接调用 ASGI 应用，请求中的查询计入当前的 QueryCounter"""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": query.encode(), "headers": [(b"host", b"testserver")],
+        "client": ("testclient", 50000), "server": ("testserver", 80),
+    }
+    asyncio.run(app(scope, receive, send))
+    status = next(message["status"] for message in messages if message["type"] == "http.response.start")
+    body = b"".join(message.get("body", b"") for message in messages if message["type"] == "http.response.body")
+    return status, json.loads(body)
+
+@pytest.fixture
+def alerts(db, db_engine):
+    install_query_counter(db_engine)
+    users = [
+        User(username=f"user{index}", email=f"user{index}@example.com", hashed_password="x")
+        for index in range(2)
+    ]
+    mine = Mine(name="测试煤矿")
+    db.add_all(users + [mine])
+    db.flush()
+    points = [MonitoringPoint(mine_id=mine.id, name=f"测点{index}") for index in range(3)]
+    db.add_all(points)
+    db.flush()
+
+    now = datetime.now(timezone.utc)
+    for index in range(60):
+        alert = Alert(
+            monitoring_point_id=points[index % len(points)].id,
+            alert_type=AlertType.DANGEROUS_ACTION,
+            severity=AlertSeverity.HIGH,
+            status=AlertStatus.ACTIVE,
+            title=f"报警 {index}",
+            detected_at=now - timedelta(minutes=index),
+        )
+        if index % 2:
+            alert.status = AlertStatus.RESOLVED
+            alert.acknowledged_by, alert.acknowledged_at = users[0].id, now
+            alert.resolved_by, alert.resolved_at = users[index % 4 // 2].id, now
+        db.add(alert)
+    db.commit()
+
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_active_user] = lambda: users[0]
+    yield
+    app.dependency_overrides.clear()
+
+def test_alert_list_query_count_does_not_grow_with_page_size(alerts):
+    counts = {}
+    for limit in (5, 50):
+        with QueryCounter() as counter:
+            status, body = _get("/api/v1/alerts/", f"limit={limit}")
+        assert status == 200
+        assert len(body) == limit
+        assert all(item["monitoring_point"]["mine_id"] for item in body)
+        assert any(item["resolved_by_user"] for item in body)
+        counts[limit] = counter.count
+
+    assert counts[5] == counts[50]
@@ -0,0 +1,39 @@
+import importlib.util
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import text
+
+from app.models.mine import Mine
+from app.models.monitoring_point import MonitoringPoint
+
+SCRIPT = Path(__file__).resolve().parents[1] / "scripts" / "load_environment_data.py"
+
+def _load_script():
+    spec = importlib.util.spec_from_file_location("load_environment_data", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def test_backfilled_rows_do_not_land_in_default_partition(db, tmp_path):
+    mine = Mine(name="测试煤矿")
+    db.add(mine)
+    db.flush()
+    point = MonitoringPoint(mine_id=mine.id, name="回填测点")
+    db.add(point)
+    db.commit()
+
+    # 远早于现有分区范围的历史数据，跨越多个分区
+    start = datetime.now(timezone.utc) - timedelta(days=400)
+    path = tmp_path / "backfill.csv"
+    lines = ["point_id,ch4,timestamp"]
+    for day in range(20):
+        lines.append(f"{point.id},0.{day % 10},{(start + timedelta(days=day)).isoformat()}")
+    path.write_text("\n".join(lines) + "\n")
+
+    _load_script().main([str(path), "--chunk-size", "7"])
+
+    total = db.execute(text("SELECT count(*) FROM environment_data")).scalar()
+    in_default = db.execute(text("SELECT count(*) FROM environment_data_default")).scalar()
+    assert total == 20
+    assert in_default == 0
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.alert import AlertSeverity
+from app.models.threshold_rule import RuleType
+from app.schemas.environment_data import EnvironmentData as EnvironmentDataSchema
+from app.services import ingest
+from app.services.latest_cache import LatestReadingCache
+from app.services.rule_engine import ThresholdRuleEngine
+
+POINT_ID = 1
+START = datetime(2024, 1, 1, 8, 0, tzinfo=timezone.utc)
+
+def _rate_rule(max_rate: float) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=1, monitoring_point_id=None, mine_id=None, rule_type=RuleType.RATE_OF_CHANGE,
+        field="methane_concentration", min_value=None, max_value=None, max_rate=max_rate,
+        conditions=None, severity=AlertSeverity.HIGH, hysteresis=None,
+        min_duration_seconds=None, suppress_seconds=None
+    )
+
+@pytest.fixture
+def cache(monkeypatch):
+    engine = ThresholdRuleEngine(reload_seconds=60)
+    engine.load([_rate_rule(max_rate=1.0)], {POINT_ID: 1}, signature=("test",))
+    cache = LatestReadingCache(ttl_seconds=5)
+    monkeypatch.setattr(ingest, "threshold_rule_engine", engine)
+    monkeypatch.setattr(ingest, "latest_reading_cache", cache)
+    return cache
+
+def _reading(seconds: float, methane: float) -> dict:
+    return {"monitoring_point_id": POINT_ID, "recorded_at": START + timedelta(seconds=seconds), "methane_concentration": methane}
+
+def test_rate_of_change_uses_cached_previous_reading_past_ttl(cache, monkeypatch):
+    cache.put(EnvironmentDataSchema(id=1, **_reading(0, 0.5)))
+    # 第二条读数 10 秒后到达，缓存条目已超过 5 秒 TTL
+    monkeypatch.setattr("app.services.latest_cache.time", SimpleNamespace(monotonic=lambda: float("inf")))
+    assert cache.get(POINT_ID) is None
+    monkeypatch.setattr(ingest, "get_readings_before", lambda db, before: pytest.fail("previous reading is cached"))
+
+    result = ingest.evaluate_readings(None, [_reading(10, 1.0)])
+
+    assert [candidate.direction for candidate in result.candidates] == ["rate"]
+    assert result.candidates[0].value == pytest.approx(3.0)
+
+def test_rate_of_change_loads_previous_reading_when_not_cached(cache, monkeypatch):
+    requested = {}
+
+    def get_readings_before(db, before):
+        requested.update(before)
+        return [EnvironmentDataSchema(id=1, **_reading(0, 0.5))]
+
+    monkeypatch.setattr(ingest, "get_readings_before", get_readings_before)
+
+    result = ingest.evaluate_readings(None, [_reading(10, 1.0)])
+
+    assert requested == {POINT_ID: START + timedelta(seconds=10)}
+    assert [candidate.direction for candidate in result.candidates] == ["rate"]
+
+def test_cached_reading_newer_than_batch_is_not_used_as_previous(cache, monkeypatch):
+    # 乱序补传：缓存里是更新的读数，前值要查本批之前的最近一条
+    cache.put(EnvironmentDataSchema(id=2, **_reading(60, 5.0)))
+    monkeypatch.setattr(
+        ingest, "get_readings_before", lambda db, before: [EnvironmentDataSchema(id=1, **_reading(0, 0.9))]
+    )
+
+    result = ingest.evaluate_readings(None, [_reading(10, 1.0)])
+
+    assert result.candidates == []